@@ -0,0 +1,319 @@
+"""
+Benchmark suite for the PROMETHEUS Waste-to-Fuel Simulator.
+This script times the calculation core, the chart builders and the simple
+Tk canvas charts over a range of input sizes with fixed seeds, reports
+throughput, latency percentiles and peak memory, and compares the results
+with a saved baseline.
+
+Usage:
+    python benchmarks/bench.py                          # quick sizes
+    python benchmarks/bench.py --full                   # up to 10^7 days and 10^6 rows
+    python benchmarks/bench.py --save baseline.json     # store a baseline
+    python benchmarks/bench.py --compare baseline.json  # exit 1 on regressions
+
+Only benchmarks with the same name and size are compared, and a result counts
+as a regression when its median time is more than --threshold slower than the
+baseline (20% by default). Tk benchmarks are skipped when there is no display.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import numpy as np
+
+SEED = 12345
+
+# Sizes for the quick run and for --full
+DAYS = {"quick": [10**2, 10**3, 10**4, 10**5], "full": [10**2, 10**3, 10**4, 10**5, 10**6, 10**7]}
+ROWS = {"quick": [1, 10**2, 10**4, 10**5], "full": [1, 10**2, 10**4, 10**5, 10**6]}
+CALLS = {"quick": [1, 10**2, 10**4], "full": [1, 10**2, 10**4, 10**5]}
+
+# Each benchmark is repeated until it has run for about this long (seconds)
+TARGET_SECONDS = 0.5
+MIN_REPEATS = 3
+MAX_REPEATS = 200
+
+
+def _scenarios(size, seed=SEED):
+    """
+    Random but reproducible (waste type, mass, method) inputs.
+    """
+    from data import WASTE_TYPES, CONVERSION_METHODS
+    rng = np.random.default_rng(seed)
+    waste_types = rng.choice(WASTE_TYPES, size)
+    masses = rng.uniform(1, 1000, size)
+    methods = rng.choice(CONVERSION_METHODS, size)
+    return waste_types, masses, methods
+
+
+def _time_series(days):
+    from converter import simulate_over_time
+    return simulate_over_time("Plastic", 200 / 365, "Plasma Gasification", days, seed=SEED)
+
+
+def bench_calculate_conversion(size):
+    from converter import calculate_conversion
+    waste_types, masses, methods = _scenarios(size)
+    scenarios = list(zip(waste_types.tolist(), masses.tolist(), methods.tolist()))
+    
+    def run():
+        for scenario in scenarios:
+            calculate_conversion(*scenario)
+    return run
+
+
+def bench_calculate_conversion_batch(size):
+    from converter import calculate_conversion_batch
+    waste_types, masses, methods = _scenarios(size)
+    return lambda: calculate_conversion_batch(waste_types, masses, methods)
+
+
+def bench_simulate_over_time(size):
+    from converter import simulate_over_time
+    return lambda: simulate_over_time("Plastic", 200 / 365, "Plasma Gasification", size, seed=SEED)
+
+
+def _render(figure):
+    """
+    Draw a figure off screen, as the embedded canvas would.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(figure).draw()
+
+
+def bench_energy_bar_chart(size):
+    from visualizer import create_energy_bar_chart
+    return lambda: _render(create_energy_bar_chart(1000.0, 4000.0))
+
+
+def bench_fuel_pie_chart(size):
+    from converter import calculate_conversion
+    from visualizer import create_fuel_pie_chart
+    fuel_produced = calculate_conversion("E-Waste", 200, "Plasma Gasification")["fuel_produced"]
+    return lambda: _render(create_fuel_pie_chart(fuel_produced))
+
+
+def bench_time_series_chart(size):
+    from visualizer import create_time_series_chart
+    time_data = _time_series(size)
+    return lambda: _render(create_time_series_chart(time_data))
+
+
+def _simple_canvas():
+    """
+    A SimpleCanvas in a hidden window, or None without a display.
+    """
+    import tkinter as tk
+    from gui_demo import SimpleCanvas
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    canvas = SimpleCanvas(root, width=400, height=300)
+    canvas.pack()
+    root.update()
+    return canvas
+
+
+def bench_simple_canvas_bar_chart(size):
+    canvas = _simple_canvas()
+    if canvas is None:
+        return None
+    data = {"Energy Required": 1000.0, "Energy Output": 4000.0, "Net Balance": 3000.0}
+    
+    def run():
+        canvas.draw_bar_chart(data, "Energy Balance (kWh)")
+        canvas.update_idletasks()
+    return run
+
+
+def bench_simple_canvas_pie_chart(size):
+    canvas = _simple_canvas()
+    if canvas is None:
+        return None
+    data = {"syngas": 45.0, "char": 25.0, "oil": 20.0, "metal": 10.0}
+    
+    def run():
+        canvas.draw_pie_chart(data, "Fuel Distribution (%)")
+        canvas.update_idletasks()
+    return run
+
+
+# Name, setup function and sizes for each benchmark. The setup function is
+# given a size and returns the function to time (or None to skip). Throughput
+# is reported in size units per second.
+BENCHMARKS = [
+    ("calculate_conversion", bench_calculate_conversion, CALLS, "calls"),
+    ("calculate_conversion_batch", bench_calculate_conversion_batch, ROWS, "rows"),
+    ("simulate_over_time", bench_simulate_over_time, DAYS, "days"),
+    ("create_energy_bar_chart", bench_energy_bar_chart, {"quick": [1], "full": [1]}, "charts"),
+    ("create_fuel_pie_chart", bench_fuel_pie_chart, {"quick": [1], "full": [1]}, "charts"),
+    ("create_time_series_chart", bench_time_series_chart, DAYS, "days"),
+    ("SimpleCanvas.draw_bar_chart", bench_simple_canvas_bar_chart, {"quick": [1], "full": [1]}, "charts"),
+    ("SimpleCanvas.draw_pie_chart", bench_simple_canvas_pie_chart, {"quick": [1], "full": [1]}, "charts")
+]
+
+
+def measure(run, size):
+    """
+    Time a function and measure its peak memory.
+    
+    The function is run once to warm up, then repeated until about
+    TARGET_SECONDS have passed, then once more under tracemalloc.
+    
+    Args:
+        run (callable): Function to time
+        size (int): Units of work per call, for the throughput
+    
+    Returns:
+        dict: Repeats, latency percentiles in seconds, throughput and peak memory in bytes
+    """
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    repeats = int(min(max(TARGET_SECONDS / max(first, 1e-9), MIN_REPEATS), MAX_REPEATS))
+    
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {
+        "repeats": repeats,
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "mean": statistics.fmean(timings),
+        "throughput": size / float(p50) if p50 > 0 else float("inf"),
+        "peak_memory": peak
+    }
+
+
+def run_benchmarks(profile="quick", select=None):
+    """
+    Run the benchmark suite.
+    
+    Args:
+        profile (str): "quick" or "full" sizes
+        select (str or None): Only run benchmarks whose name contains this text
+    
+    Returns:
+        list: One result dict per benchmark and size
+    """
+    results = []
+    for name, setup, sizes, unit in BENCHMARKS:
+        if select and select not in name:
+            continue
+        for size in sizes[profile]:
+            run = setup(size)
+            if run is None:
+                results.append({"name": name, "size": size, "unit": unit, "skipped": "no display"})
+                continue
+            results.append({"name": name, "size": size, "unit": unit, **measure(run, size)})
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Find results that are slower than the baseline by more than the threshold.
+    
+    Args:
+        results (list): Results from run_benchmarks
+        baseline (list): Results from an earlier run
+        threshold (float): Allowed slowdown, as a fraction of the baseline median
+    
+    Returns:
+        list: (result, baseline result, ratio) for each regression
+    """
+    previous = {(b["name"], b["size"]): b for b in baseline if "skipped" not in b}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["size"]))
+        if old is None or "skipped" in result:
+            continue
+        ratio = result["p50"] / old["p50"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + threshold:
+            regressions.append((result, old, ratio))
+    return regressions
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def print_report(results):
+    """
+    Print results as a table.
+    """
+    print(f"{'benchmark':<28} {'size':>9} {'p50':>10} {'p90':>10} {'p99':>10} {'throughput':>18} {'peak mem':>10} {'vs base':>8}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['name']:<28} {r['size']:>9} skipped ({r['skipped']})")
+            continue
+        ratio = f"{r['baseline_ratio']:.2f}x" if "baseline_ratio" in r else ""
+        print(f"{r['name']:<28} {r['size']:>9} {_format_seconds(r['p50']):>10} {_format_seconds(r['p90']):>10} "
+              f"{_format_seconds(r['p99']):>10} {r['throughput']:>12,.0f} {r['unit']:<5} "
+              f"{r['peak_memory'] / 2**20:>7.1f} MB {ratio:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulator benchmarks.")
+    parser.add_argument("--full", action="store_true", help="include the largest sizes (10^7 days, 10^6 rows)")
+    parser.add_argument("-k", dest="select", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a JSON baseline and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.2)")
+    args = parser.parse_args()
+    
+    results = run_benchmarks("full" if args.full else "quick", args.select)
+    
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    
+    print_report(results)
+    
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.platform(),
+                "seed": SEED,
+                "results": results
+            }, f, indent=2)
+    
+    for result, old, ratio in regressions:
+        print(f"REGRESSION {result['name']} size {result['size']}: {_format_seconds(result['p50'])} "
+              f"vs {_format_seconds(old['p50'])} baseline ({ratio:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Startup time budget for the PROMETHEUS Waste-to-Fuel Simulator.
+This script measures, in fresh interpreters, how long it takes to import the
+calculation core and the GUI module and to get the main window on screen,
+and checks the results against a fixed budget.
+
+Usage:
+    python benchmarks/startup.py [--repeat 5] [--json]
+
+Exits with status 1 if any median time is over budget or if importing the
+core loads pandas or matplotlib.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds allowed for each measurement
+BUDGETS = {
+    "import_converter": 0.30,
+    "import_main": 0.40,
+    "first_window": 1.50
+}
+
+# Modules that must only load when a chart or time series is needed
+HEAVY_MODULES = ["pandas", "matplotlib"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+WINDOW_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+import main
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(json.dumps({"skipped": "no display"}))
+    sys.exit()
+app = main.PrometheusApp(root)
+shown = []
+def on_map(event):
+    if not shown:
+        shown.append(time.perf_counter() - start)
+        root.after(0, root.destroy)
+root.bind("<Map>", on_map)
+root.after(10000, root.destroy)
+root.mainloop()
+print(json.dumps({"seconds": shown[0] if shown else None}))
+"""
+
+
+def run_script(script):
+    """
+    Run a measurement script in a fresh interpreter.
+    
+    Returns:
+        dict: The JSON the script printed
+    """
+    output = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(repeat=5):
+    """
+    Measure every startup step several times.
+    
+    Args:
+        repeat (int): Fresh interpreters per measurement
+    
+    Returns:
+        dict: Measurement name to median, min and max seconds, plus any heavy
+            modules loaded or the reason it was skipped
+    """
+    results = {}
+    for name, script in [("import_converter", IMPORT_SCRIPT.format(module="converter", heavy=HEAVY_MODULES)),
+                         ("import_main", IMPORT_SCRIPT.format(module="main", heavy=HEAVY_MODULES)),
+                         ("first_window", WINDOW_SCRIPT)]:
+        runs = [run_script(script) for _ in range(repeat)]
+        if "skipped" in runs[0]:
+            results[name] = {"skipped": runs[0]["skipped"]}
+            continue
+        seconds = [run["seconds"] for run in runs if run["seconds"] is not None]
+        results[name] = {
+            "median": statistics.median(seconds) if seconds else None,
+            "min": min(seconds, default=None),
+            "max": max(seconds, default=None),
+            "heavy_modules": sorted(set().union(*(run.get("heavy", []) for run in runs)))
+        }
+    return results
+
+
+def check_budget(results):
+    """
+    Compare measurements with BUDGETS.
+    
+    Returns:
+        list: Descriptions of every failed check
+    """
+    failures = []
+    for name, result in results.items():
+        if "skipped" in result:
+            continue
+        if result["median"] is None:
+            failures.append(f"{name}: no measurement")
+        elif result["median"] > BUDGETS[name]:
+            failures.append(f"{name}: median {result['median']:.3f} s is over the {BUDGETS[name]:.2f} s budget")
+        if result["heavy_modules"]:
+            failures.append(f"{name}: loaded {', '.join(result['heavy_modules'])}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check startup time against its budget.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement (default: 5)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    
+    results = measure(args.repeat)
+    failures = check_budget(results)
+    if args.json:
+        print(json.dumps({"results": results, "budgets": BUDGETS, "failures": failures}, indent=2))
+    else:
+        for name, result in results.items():
+            if "skipped" in result:
+                print(f"{name:<18} skipped ({result['skipped']})")
+            elif result["median"] is None:
+                print(f"{name:<18} no measurement")
+            else:
+                print(f"{name:<18} {result['median'] * 1000:8.1f} ms median "
+                      f"({result['min'] * 1000:.1f}-{result['max'] * 1000:.1f} ms), budget {BUDGETS[name] * 1000:.0f} ms")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+Command-line batch processing for the PROMETHEUS Waste-to-Fuel Simulator.
+This module reads (waste_type, mass, conversion_method[, days]) records from a
+file or standard input, converts them in chunks across a process pool and
+writes the results as JSON Lines, CSV or Parquet in input order.
+
+Example:
+    python cli.py scenarios.csv -o results.jsonl --days 365 --seed 42
+
+Exit codes:
+    0  every record was processed
+    1  some records were invalid (the rest were still written)
+    2  bad command-line usage
+    3  input or output could not be read or written
+    4  the input could not be processed at all (missing columns, unparseable
+       or empty input); no output is written
+    5  a required package, such as pyarrow for Parquet, is not installed
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from converter import calculate_conversion_batch
+from model import get_model
+from pipeline import DEFAULT_COLUMNS, ResultWriter, batch_to_frame, detect_format, read_manifest, validate_chunk
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_USAGE = 2
+EXIT_IO = 3
+EXIT_BAD_INPUT = 4
+EXIT_MISSING_DEPENDENCY = 5
+
+INPUT_FORMATS = ["csv", "jsonl", "parquet"]
+OUTPUT_FORMATS = ["jsonl", "csv", "parquet"]
+
+# Daily waste varies within ±10%, as in simulate_over_time
+DAILY_VARIATION = (0.9, 1.1)
+
+
+def read_records(path, chunksize=100000, input_format=None):
+    """
+    Read scenario records in chunks.
+    
+    Args:
+        path (str): CSV, JSON Lines or Parquet file, or "-" for standard input
+        chunksize (int): Records per chunk
+        input_format (str or None): Input format, detected from the extension if
+            None (standard input defaults to CSV)
+    
+    Yields:
+        pandas.DataFrame: Records. CSV and JSON Lines values are read as text,
+            so a column's type doesn't depend on which values a chunk holds.
+    """
+    if input_format is None and path == "-":
+        input_format = "csv"
+    input_format = detect_format(path, input_format, INPUT_FORMATS)
+    source = sys.stdin if path == "-" else path
+    if input_format == "csv":
+        with pd.read_csv(source, chunksize=chunksize, dtype=str) as reader:
+            yield from reader
+    elif input_format == "jsonl":
+        with pd.read_json(source, lines=True, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk.astype("string")
+    elif path == "-":
+        raise ValueError("Parquet input must be read from a file.")
+    else:
+        yield from read_manifest(path, chunksize, "parquet")
+
+
+def _variation_sums(rng, days, block=1 << 20):
+    """
+    Sum of each record's daily variation factors over its number of days.
+    
+    Factors are drawn at most ``block`` at a time, so memory use stays bounded
+    however many days the records ask for.
+    
+    Args:
+        rng (numpy.random.Generator): Random number generator
+        days (numpy.ndarray): Number of days for each record
+        block (int): Largest number of factors drawn at once
+    
+    Returns:
+        numpy.ndarray: Sum of the factors for each record
+    """
+    sums = np.zeros(len(days))
+    ends = np.cumsum(days)
+    i = 0
+    while i < len(days):
+        if days[i] > block:
+            # Very long simulation: add it up one block at a time
+            remaining = int(days[i])
+            while remaining:
+                n = min(remaining, block)
+                sums[i] += rng.uniform(*DAILY_VARIATION, n).sum()
+                remaining -= n
+            i += 1
+            continue
+        
+        # As many of the following records as fit in one block
+        base = ends[i - 1] if i else 0
+        stop = int(np.searchsorted(ends, base + block, side="right"))
+        counts = days[i:stop]
+        drawn = counts > 0
+        if drawn.any():
+            factors = rng.uniform(*DAILY_VARIATION, int(counts.sum()))
+            starts = np.cumsum(counts) - counts
+            sums[i:stop][drawn] = np.add.reduceat(factors, starts[drawn])
+        i = stop
+    return sums
+
+
+def _validate_days(valid, rejected, days_column, default_days):
+    """
+    Check the optional days column, filling in the default (or zero) where it is empty.
+    
+    Returns:
+        tuple: (valid rows, rejected rows, days for each valid row)
+    """
+    fill = default_days or 0
+    if days_column not in valid.columns:
+        return valid, rejected, np.full(len(valid), fill, dtype=np.int64)
+    
+    given = valid[days_column]
+    days = pd.to_numeric(given, errors="coerce")
+    empty = given.isna()
+    bad = ~empty & ~(np.isfinite(days) & (days >= 0) & (days == np.floor(days)))
+    if bad.any():
+        rejected = pd.concat([rejected, valid[bad].assign(error="days must be a whole number of zero or more")])
+        valid, days, empty = valid[~bad], days[~bad], empty[~bad]
+    return valid, rejected, days.where(~empty, fill).to_numpy(dtype=np.int64)
+
+
+def _process_chunk(task):
+    """
+    Convert one chunk of records.
+    
+    Args:
+        task (tuple): (chunk number, records, columns, simulate, days column, default days, seed entropy)
+    
+    Returns:
+        tuple: (results DataFrame, rejected records DataFrame)
+    """
+    index, chunk, columns, simulate, days_column, default_days, entropy = task
+    model = get_model()
+    valid, rejected = validate_chunk(chunk, columns, model)
+    if simulate:
+        valid, rejected, days = _validate_days(valid, rejected, days_column, default_days)
+    
+    batch = calculate_conversion_batch(valid[columns["waste_type"]].to_numpy(),
+                                       valid[columns["mass"]].to_numpy(),
+                                       valid[columns["conversion_method"]].to_numpy(),
+                                       model=model)
+    results = batch_to_frame(batch)
+    
+    if simulate:
+        # Each chunk has its own random stream, so results don't depend on the number of workers
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+        processed = batch["mass"] * _variation_sums(rng, days)
+        energy_required = processed * model.energy_input[batch["waste_code"], batch["method_code"]]
+        energy_output = processed * model.output_per_kg[batch["waste_code"], batch["method_code"]]
+        results["sim_days"] = days
+        results["sim_waste_processed"] = processed
+        results["sim_energy_required"] = energy_required
+        results["sim_energy_output"] = energy_output
+        results["sim_net_balance"] = energy_output - energy_required
+    
+    passthrough = valid.drop(columns=[c for c in [*columns.values(), days_column] if c in valid.columns])
+    return pd.concat([passthrough.reset_index(drop=True), results], axis=1), rejected
+
+
+def run_batch(input_path, output_path, chunksize=100000, input_format=None, output_format=None, columns=None,
+              days_column="days", default_days=None, seed=None, workers=None, rejects_path=None, progress=None):
+    """
+    Convert a stream of scenario records, writing results in input order.
+    
+    When the input has a days column, or ``default_days`` is given, every
+    record also gets totals for a day-by-day simulation over that many days
+    with ±10% variation in the daily mass, as in simulate_over_time. Records
+    without a value use ``default_days``, or zero days.
+    
+    Args:
+        input_path (str): CSV, JSON Lines or Parquet file, or "-" for standard input
+        output_path (str): JSON Lines, CSV or Parquet file, or "-" for standard output
+        chunksize (int): Records per chunk
+        input_format (str or None): Input format, detected from the extension if None
+        output_format (str or None): Output format, detected from the extension if None
+        columns (dict): Maps "waste_type", "mass" and "conversion_method" to column names
+        days_column (str): Column with the number of days to simulate
+        default_days (int or None): Days to simulate for records without a value
+        seed (int or None): Seed for the time simulation
+        workers (int or None): Worker processes, defaults to the number of CPUs
+        rejects_path (str or None): Optional CSV file for rejected records and their errors
+        progress (callable or None): Called with the running statistics after each chunk
+    
+    Returns:
+        dict: Records read, written and rejected, elapsed seconds and records per second
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    workers = workers or os.cpu_count() or 1
+    entropy = np.random.SeedSequence(seed).entropy
+    stats = {"rows_read": 0, "rows_written": 0, "rows_rejected": 0, "seconds": 0.0, "rows_per_second": 0.0}
+    start = time.perf_counter()
+    
+    def tasks():
+        simulate = default_days is not None
+        for index, chunk in enumerate(read_records(input_path, chunksize, input_format)):
+            # Decided on the first chunk so every chunk has the same output columns
+            if index == 0:
+                simulate = simulate or days_column in chunk.columns
+            yield index, chunk, columns, simulate, days_column, default_days, entropy
+    
+    def record(results, rejected):
+        writer.write(results)
+        if rejects and len(rejected):
+            rejects.write(rejected)
+        stats["rows_read"] += len(results) + len(rejected)
+        stats["rows_written"] += len(results)
+        stats["rows_rejected"] += len(rejected)
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = stats["rows_read"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        if progress:
+            progress(dict(stats))
+    
+    rejects = ResultWriter(rejects_path, "csv") if rejects_path else None
+    try:
+        with ResultWriter(output_path, output_format) as writer:
+            if workers == 1:
+                for task in tasks():
+                    record(*_process_chunk(task))
+            else:
+                # Keep a few chunks in flight per worker and write them back in order
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = collections.deque()
+                    for task in tasks():
+                        pending.append(executor.submit(_process_chunk, task))
+                        if len(pending) >= 2 * workers:
+                            record(*pending.popleft().result())
+                    while pending:
+                        record(*pending.popleft().result())
+    except BaseException:
+        if rejects:
+            rejects.abort()
+        raise
+    if rejects:
+        rejects.close()
+    
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows_read"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+
+def build_parser():
+    """
+    Command-line options.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert waste scenario records in bulk with the PROMETHEUS Waste-to-Fuel Simulator.",
+        epilog="Exit codes: 0 success, 1 invalid records, 2 usage error, 3 input/output error, "
+               "4 input could not be processed, 5 missing package."
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="CSV, JSON Lines or Parquet file of records (default: standard input)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file (default: JSON Lines on standard output)")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS,
+                        help="input format (default: from the file extension, CSV for standard input)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS,
+                        help="output format (default: from the file extension, JSON Lines for standard output)")
+    parser.add_argument("--days", type=int, help="days to simulate for records without a days value")
+    parser.add_argument("--seed", type=int, help="random seed for the time simulation")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: number of CPUs)")
+    parser.add_argument("--chunksize", type=int, default=100000, help="records per chunk (default: 100000)")
+    parser.add_argument("--rejects", help="CSV file for invalid records and their errors")
+    parser.add_argument("--waste-column", default="waste_type", help="column with the waste type")
+    parser.add_argument("--mass-column", default="mass", help="column with the mass in kg")
+    parser.add_argument("--method-column", default="conversion_method", help="column with the conversion method")
+    parser.add_argument("--days-column", default="days", help="column with the number of days to simulate")
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't print a summary to standard error")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the command-line tool.
+    
+    Args:
+        argv (list or None): Arguments, defaults to sys.argv[1:]
+    
+    Returns:
+        int: Exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.days is not None and args.days < 0:
+        parser.error("--days cannot be negative")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+    
+    output_format = args.output_format
+    if output_format is None and args.output == "-":
+        output_format = "jsonl"
+    try:
+        detect_format(args.input, args.input_format or ("csv" if args.input == "-" else None), INPUT_FORMATS)
+        detect_format(args.output, output_format, OUTPUT_FORMATS)
+    except ValueError as e:
+        parser.error(str(e))
+    columns = {"waste_type": args.waste_column, "mass": args.mass_column, "conversion_method": args.method_column}
+    
+    try:
+        stats = run_batch(args.input, args.output, chunksize=args.chunksize, input_format=args.input_format,
+                          output_format=output_format, columns=columns, days_column=args.days_column,
+                          default_days=args.days, seed=args.seed, workers=args.workers,
+                          rejects_path=args.rejects)
+    except ImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_MISSING_DEPENDENCY
+    except ValueError as e:
+        # Missing columns, or input that can't be parsed at all
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_BAD_INPUT
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_IO
+    
+    if not args.quiet:
+        print(f"{stats['rows_written']} records written, {stats['rows_rejected']} rejected "
+              f"in {stats['seconds']:.2f} s ({stats['rows_per_second']:,.0f} records/s)", file=sys.stderr)
+    return EXIT_INVALID if stats["rows_rejected"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
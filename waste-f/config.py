@@ -0,0 +1,355 @@
+"""
+External model configuration for the PROMETHEUS Waste-to-Fuel Simulator.
+This module loads the model tables from a JSON or TOML file instead of
+data.py, checks them, and caches the compiled arrays keyed by the file's
+content hash, so repeated runs with an unchanged file skip parsing,
+validation and compilation.
+
+A model file has the same top-level names as data.py. Entries left out of
+the file are taken from data.py, so a file can hold only what it changes:
+
+    [EFFICIENCY.Plastic]
+    Pyrolysis = 0.7
+    "Plasma Gasification" = 0.75
+    "Anaerobic Digestion" = 0.3
+
+ConfigWatcher notices when the file changes, and affected_pairs tells which
+(waste type, method) pairs need to be recomputed.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+import data
+
+TABLE_NAMES = ["WASTE_TYPES", "CONVERSION_METHODS", "EFFICIENCY", "FUEL_OUTPUT_FRACTIONS", "ENERGY_INPUT",
+               "ENERGY_CONTENT"]
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "prometheus", "models")
+
+# Bumped whenever the cached file layout or the compiled arrays change
+CACHE_VERSION = 1
+
+# Allowance for rounding when checking that fuel fractions add up to at most 1
+FRACTION_TOLERANCE = 1e-9
+
+
+def default_tables():
+    """
+    The tables from data.py, keyed by their names.
+    
+    Returns:
+        dict: Table name to table
+    """
+    return {name: getattr(data, name) for name in TABLE_NAMES}
+
+
+def _parse(path, content):
+    """
+    Parse the bytes of a model file by its extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        return json.loads(content.decode("utf-8"))
+    if extension == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("Reading TOML model files needs Python 3.11+ or the tomli package.") from None
+        return tomllib.loads(content.decode("utf-8"))
+    raise ValueError(f"Unsupported model file type: {extension or path}. Use .json or .toml.")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_tables(tables):
+    """
+    Check a complete set of model tables.
+    
+    Every problem found is reported at once, one per line of the error.
+    
+    Args:
+        tables (dict): Tables keyed like the names in data.py
+    
+    Raises:
+        ValueError: If any table is missing, malformed or out of range, any
+            (waste type, method) entry is missing, any fuel fractions add up
+            to more than 1 or any fuel has no ENERGY_CONTENT
+    """
+    errors = []
+    for name in ("WASTE_TYPES", "CONVERSION_METHODS"):
+        names = tables.get(name)
+        if not isinstance(names, list) or not names or not all(isinstance(n, str) and n for n in names):
+            errors.append(f"{name} must be a non-empty list of names.")
+        elif len(set(names)) != len(names):
+            errors.append(f"{name} has duplicate names.")
+    if errors:
+        # Nothing else can be checked without the names
+        raise ValueError("Invalid model tables:\n" + "\n".join(errors))
+    
+    unknown = [name for name in tables if name not in TABLE_NAMES]
+    if unknown:
+        errors.append(f"Unknown tables: {', '.join(map(str, unknown))}. Use {', '.join(TABLE_NAMES)}.")
+    
+    energy_content = tables.get("ENERGY_CONTENT")
+    if not isinstance(energy_content, dict) or not energy_content:
+        errors.append("ENERGY_CONTENT must map every fuel type to its energy content.")
+        energy_content = {}
+    for fuel_type, value in energy_content.items():
+        if not _is_number(value) or value < 0:
+            errors.append(f"ENERGY_CONTENT/{fuel_type} must be a number of at least 0, not {value!r}.")
+    
+    def entry(name, waste_type, method):
+        table = tables.get(name)
+        if not isinstance(table, dict) or not isinstance(table.get(waste_type), dict) \
+                or method not in table[waste_type]:
+            errors.append(f"{name}/{waste_type}/{method} is missing.")
+            return None
+        return table[waste_type][method]
+    
+    for waste_type in tables["WASTE_TYPES"]:
+        for method in tables["CONVERSION_METHODS"]:
+            where = f"{waste_type}/{method}"
+            efficiency = entry("EFFICIENCY", waste_type, method)
+            if efficiency is not None and (not _is_number(efficiency) or not 0 <= efficiency <= 1):
+                errors.append(f"EFFICIENCY/{where} must be between 0 and 1, not {efficiency!r}.")
+            energy_input = entry("ENERGY_INPUT", waste_type, method)
+            if energy_input is not None and (not _is_number(energy_input) or energy_input < 0):
+                errors.append(f"ENERGY_INPUT/{where} must be a number of at least 0, not {energy_input!r}.")
+            
+            fractions = entry("FUEL_OUTPUT_FRACTIONS", waste_type, method)
+            if fractions is None:
+                continue
+            if not isinstance(fractions, dict):
+                errors.append(f"FUEL_OUTPUT_FRACTIONS/{where} must map fuel types to fractions.")
+                continue
+            for fuel_type, fraction in fractions.items():
+                if fuel_type not in energy_content:
+                    errors.append(f"FUEL_OUTPUT_FRACTIONS/{where} produces {fuel_type}, "
+                                  f"which has no ENERGY_CONTENT.")
+                if not _is_number(fraction) or fraction < 0:
+                    errors.append(f"FUEL_OUTPUT_FRACTIONS/{where}/{fuel_type} must be a number of at least 0, "
+                                  f"not {fraction!r}.")
+            total = sum(f for f in fractions.values() if _is_number(f))
+            if total > 1 + FRACTION_TOLERANCE:
+                errors.append(f"FUEL_OUTPUT_FRACTIONS/{where} adds up to {total:g}, more than 1.")
+    
+    if errors:
+        raise ValueError("Invalid model tables:\n" + "\n".join(errors))
+
+
+def _merge(defaults, changes, path=()):
+    """
+    Nested copy of defaults with the entries in changes replacing theirs.
+    
+    A method's fuel fractions are replaced as a whole, as in
+    CompiledModel.with_overrides, so a file can drop a fuel.
+    """
+    merged = dict(defaults)
+    for key, value in changes.items():
+        whole = path[:1] == ("FUEL_OUTPUT_FRACTIONS",) and len(path) == 2
+        if isinstance(value, dict) and isinstance(merged.get(key), dict) and not whole:
+            merged[key] = _merge(merged[key], value, path + (key,))
+        else:
+            merged[key] = value
+    return merged
+
+
+def _complete_tables(path, content):
+    """
+    Parse a model file's bytes into complete tables, without checking them.
+    """
+    loaded = _parse(path, content)
+    if not isinstance(loaded, dict):
+        raise ValueError(f"Model file {path} must hold a table of named tables.")
+    return _merge(default_tables(), loaded)
+
+
+def load_tables(path):
+    """
+    Read and check the tables in a model file.
+    
+    Needs only the standard library, so it also serves the dependency-free demo.
+    
+    Args:
+        path (str): .json or .toml model file
+    
+    Returns:
+        dict: Complete tables, with entries missing from the file taken from data.py
+    """
+    with open(path, "rb") as f:
+        tables = _complete_tables(path, f.read())
+    validate_tables(tables)
+    return tables
+
+
+def content_hash(path, content):
+    """
+    Cache key of a model file: its bytes, its type and the data.py defaults it falls back on.
+    
+    Args:
+        path (str): Model file path, for the extension
+        content (bytes): File contents
+    
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256(f"prometheus-model-{CACHE_VERSION}".encode())
+    digest.update(os.path.splitext(path)[1].lower().encode())
+    digest.update(json.dumps(default_tables(), sort_keys=True).encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def load_model(path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """
+    Load, check and compile a model file, using the cache when possible.
+    
+    The compiled arrays and the checked tables are stored in cache_dir under
+    the hash of the file contents. A file that was loaded before is then read
+    straight from the cache without being parsed, checked or compiled again.
+    
+    Args:
+        path (str): .json or .toml model file
+        cache_dir (str): Directory of cached compiled models
+        use_cache (bool): Read and write the cache
+    
+    Returns:
+        CompiledModel: Compiled model, with ``source`` (the path) and
+            ``content_hash`` (the cache key) attributes
+    """
+    import numpy as np
+    from model import ARRAY_NAMES, CompiledModel
+    
+    with open(path, "rb") as f:
+        content = f.read()
+    key = content_hash(path, content)
+    cache_path = os.path.join(cache_dir, f"{key}.npz")
+    
+    model = None
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                tables = json.loads(str(cached["tables"]))
+                model = CompiledModel.from_arrays(tables, {name: cached[name] for name in ARRAY_NAMES})
+        except (OSError, ValueError, KeyError):
+            # A damaged cache entry is rebuilt below
+            model = None
+    
+    if model is None:
+        tables = _complete_tables(path, content)
+        validate_tables(tables)
+        model = CompiledModel.from_tables(tables)
+        if use_cache:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Written under a temporary name and renamed, so readers never see half a file
+                temp_path = os.path.join(cache_dir, f"{key}.{os.getpid()}.tmp.npz")
+                np.savez(temp_path, tables=np.array(json.dumps(tables)), **model.arrays())
+                os.replace(temp_path, cache_path)
+            except OSError:
+                pass
+    
+    model.source = path
+    model.content_hash = key
+    return model
+
+
+def pair_entry(tables, waste_type, conversion_method):
+    """
+    Every table value that the results of one (waste type, method) pair depend on.
+    
+    Two sets of tables give the same results for a pair exactly when its
+    entries are equal. CompiledModel.entry_fingerprint hashes this entry.
+    
+    Args:
+        tables (dict): Tables keyed like the names in data.py
+        waste_type (str): Type of waste
+        conversion_method (str): Method of conversion
+    
+    Returns:
+        list: Efficiency, fuel fractions, energy input and the energy content of each fuel
+    """
+    fractions = tables["FUEL_OUTPUT_FRACTIONS"][waste_type][conversion_method]
+    return [
+        tables["EFFICIENCY"][waste_type][conversion_method],
+        list(fractions.items()),
+        tables["ENERGY_INPUT"][waste_type][conversion_method],
+        [tables["ENERGY_CONTENT"][fuel_type] for fuel_type in fractions]
+    ]
+
+
+def affected_pairs(old, new):
+    """
+    The (waste type, method) pairs whose results differ between two sets of tables.
+    
+    Args:
+        old (dict or CompiledModel): Tables (or model) before the change
+        new (dict or CompiledModel): Tables (or model) after the change
+    
+    Returns:
+        set: (waste type, method) pairs of the new tables that were added or
+            whose entries changed
+    """
+    old = getattr(old, "tables", old)
+    new = getattr(new, "tables", new)
+    old_pairs = {(w, m) for w in old["WASTE_TYPES"] for m in old["CONVERSION_METHODS"]}
+    changed = set()
+    for waste_type in new["WASTE_TYPES"]:
+        for method in new["CONVERSION_METHODS"]:
+            pair = (waste_type, method)
+            if pair not in old_pairs or pair_entry(old, *pair) != pair_entry(new, *pair):
+                changed.add(pair)
+    return changed
+
+
+class ConfigWatcher:
+    """
+    Reloads a model file when it changes on disk.
+    
+    Call poll() regularly, e.g. from a GUI timer. It only looks at the file's
+    modification time and size, and reloads the file when they change.
+    """
+    def __init__(self, path, loader=load_model):
+        """
+        Start watching a model file.
+        
+        Args:
+            path (str): .json or .toml model file
+            loader (callable): Called with the path to load it, e.g. load_model
+                or load_tables
+        """
+        self.path = path
+        self.loader = loader
+        self._stamp = self._read_stamp()
+    
+    def _read_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def poll(self):
+        """
+        Reload the file if it changed since the last call.
+        
+        Returns:
+            object or None: What the loader returned, or None if the file did
+                not change (or is missing, e.g. while an editor replaces it)
+        
+        Raises:
+            ValueError: If the changed file is not valid. It is not retried
+                until it changes again.
+        """
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        return self.loader(self.path)
@@ -1,14 +1,18 @@
 """
 Core calculations for the PROMETHEUS Waste-to-Fuel Simulator.
 This module handles all the conversion calculations from waste to fuel.
+It does not import pandas until a simulation result is built as a DataFrame,
+so the calculations start quickly.
 """
 
-import pandas as pd
 import numpy as np
-from data import EFFICIENCY, FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT, ENERGY_CONTENT
+from model import get_model
+from instrument import count, span, traced
+from stats import SimulationSummary
 
 
-def calculate_conversion(waste_type, mass, conversion_method):
+@traced("calculate_conversion")
+def calculate_conversion(waste_type, mass, conversion_method, model=None):
     """
     Calculate the waste-to-fuel conversion results.
     
@@ -16,18 +20,21 @@ def calculate_conversion(waste_type, mass, conversion_method):
         waste_type (str): Type of waste (Plastic, Organic, Metal, E-Waste)
         mass (float): Mass of waste in kg
         conversion_method (str): Method of conversion (Pyrolysis, Plasma Gasification, Anaerobic Digestion)
-        
+        model (CompiledModel): Model whose tables to use, defaults to get_model()
+    
     Returns:
         dict: Dictionary containing all calculation results
     """
+    tables = (model or get_model()).tables
+    
     # Get efficiency for the given waste type and conversion method
-    efficiency = EFFICIENCY[waste_type][conversion_method]
+    efficiency = tables["EFFICIENCY"][waste_type][conversion_method]
     
     # Get fuel output fractions
-    fuel_fractions = FUEL_OUTPUT_FRACTIONS[waste_type][conversion_method]
+    fuel_fractions = tables["FUEL_OUTPUT_FRACTIONS"][waste_type][conversion_method]
     
     # Get energy input cost
-    energy_input_cost = ENERGY_INPUT[waste_type][conversion_method]
+    energy_input_cost = tables["ENERGY_INPUT"][waste_type][conversion_method]
     
     # Calculate energy required
     energy_required = mass * energy_input_cost
@@ -40,7 +47,7 @@ def calculate_conversion(waste_type, mass, conversion_method):
     # Calculate energy output for each fuel type
     fuel_energy_output = {}
     for fuel_type, fuel_mass in fuel_produced.items():
-        fuel_energy_output[fuel_type] = fuel_mass * ENERGY_CONTENT[fuel_type]
+        fuel_energy_output[fuel_type] = fuel_mass * tables["ENERGY_CONTENT"][fuel_type]
     
     # Calculate total energy output
     total_energy_output = sum(fuel_energy_output.values())
@@ -72,39 +79,395 @@ def calculate_conversion(waste_type, mass, conversion_method):
     return results
 
 
-def simulate_over_time(waste_type, daily_mass, conversion_method, days=1000):
+@traced("calculate_conversion_batch")
+def calculate_conversion_batch(waste_types, masses, conversion_methods, model=None):
+    """
+    Calculate waste-to-fuel conversion results for many scenarios at once.
+    
+    Produces the same numbers as calling calculate_conversion on every row,
+    using array gathers instead of per-row dict lookups. Scalars are broadcast
+    against the array arguments.
+    
+    Args:
+        waste_types (array-like): Waste type names or integer codes
+        masses (array-like): Masses of waste in kg
+        conversion_methods (array-like): Method names or integer codes
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: Columnar results with the same keys as calculate_conversion, plus
+            ``waste_code`` and ``method_code``. ``fuel_produced`` and
+            ``fuel_energy_output`` map every fuel in ``model.fuel_types`` to an array.
+    """
+    model = model or get_model()
+    waste_codes = model.encode_waste(waste_types)
+    method_codes = model.encode_method(conversion_methods)
+    masses = np.asarray(masses, dtype=float)
+    waste_codes, masses, method_codes = (a.ravel() for a in np.broadcast_arrays(waste_codes, masses, method_codes))
+    count("conversion.rows", len(masses))
+    
+    # Gather coefficients for every row
+    efficiency = model.efficiency[waste_codes, method_codes]
+    fractions = model.fractions[waste_codes, method_codes]
+    energy_required = masses * model.energy_input[waste_codes, method_codes]
+    
+    # Fuel mass and energy per fuel column; the extra zero column backs the padding in fuel_order
+    n_rows, n_fuel = fractions.shape
+    fuel_mass = np.zeros((n_rows, n_fuel))
+    fuel_energy = np.zeros((n_rows, n_fuel + 1))
+    for f in range(n_fuel):
+        fuel_mass[:, f] = masses * efficiency * fractions[:, f]
+        fuel_energy[:, f] = fuel_mass[:, f] * model.energy_content[f]
+    
+    # Sum in the same order as calculate_conversion so results match exactly
+    rows = np.arange(n_rows)
+    fuel_order = model.fuel_order[waste_codes, method_codes]
+    total_energy_output = np.zeros(n_rows)
+    for k in range(fuel_order.shape[1]):
+        total_energy_output += fuel_energy[rows, fuel_order[:, k]]
+    
+    net_energy_balance = total_energy_output - energy_required
+    
+    # Avoid division by zero
+    conversion_efficiency = np.zeros(n_rows)
+    positive = energy_required > 0
+    conversion_efficiency[positive] = (total_energy_output[positive] / energy_required[positive]) * 100
+    
+    return {
+        "waste_code": waste_codes,
+        "method_code": method_codes,
+        "waste_type": np.asarray(model.waste_types, dtype=object)[waste_codes],
+        "mass": masses,
+        "conversion_method": np.asarray(model.conversion_methods, dtype=object)[method_codes],
+        "efficiency": efficiency,
+        "energy_required": energy_required,
+        "fuel_produced": {fuel: fuel_mass[:, f] for f, fuel in enumerate(model.fuel_types)},
+        "fuel_energy_output": {fuel: fuel_energy[:, f] for f, fuel in enumerate(model.fuel_types)},
+        "total_energy_output": total_energy_output,
+        "net_energy_balance": net_energy_balance,
+        "conversion_efficiency": conversion_efficiency
+    }
+
+
+def batch_to_records(batch, model=None):
+    """
+    Split calculate_conversion_batch results into one dict per row.
+    
+    Each dict has the same keys and values as calculate_conversion gives for
+    that row, with ``fuel_produced`` and ``fuel_energy_output`` holding only
+    the fuels the method produces, in the same order.
+    
+    Args:
+        batch (dict): Results from calculate_conversion_batch
+        model (CompiledModel): Compiled tables the batch was computed with
+    
+    Returns:
+        list: Result dicts
+    """
+    model = model or get_model()
+    n_fuel = len(model.fuel_types)
+    columns = ["waste_type", "mass", "conversion_method", "efficiency", "energy_required",
+               "total_energy_output", "net_energy_balance", "conversion_efficiency"]
+    values = {key: np.asarray(batch[key]).tolist() for key in columns}
+    produced = {fuel: batch["fuel_produced"][fuel].tolist() for fuel in model.fuel_types}
+    energy = {fuel: batch["fuel_energy_output"][fuel].tolist() for fuel in model.fuel_types}
+    
+    # Fuels of each (waste type, method) pair in data.py order
+    fuels = {}
+    records = []
+    for i, pair in enumerate(zip(batch["waste_code"].tolist(), batch["method_code"].tolist())):
+        if pair not in fuels:
+            fuels[pair] = [model.fuel_types[f] for f in model.fuel_order[pair] if f < n_fuel]
+        records.append({
+            "waste_type": values["waste_type"][i],
+            "mass": values["mass"][i],
+            "conversion_method": values["conversion_method"][i],
+            "efficiency": values["efficiency"][i],
+            "energy_required": values["energy_required"][i],
+            "fuel_produced": {fuel: produced[fuel][i] for fuel in fuels[pair]},
+            "fuel_energy_output": {fuel: energy[fuel][i] for fuel in fuels[pair]},
+            "total_energy_output": values["total_energy_output"][i],
+            "net_energy_balance": values["net_energy_balance"][i],
+            "conversion_efficiency": values["conversion_efficiency"][i]
+        })
+    return records
+
+
+def _composition_array(compositions, model):
+    """
+    Convert blend compositions into an array with one column per waste type.
+    
+    Args:
+        compositions (array-like, dict or pandas.DataFrame): Mass fractions per
+            waste type, as an array with columns in ``model.waste_types`` order or
+            a mapping / DataFrame keyed by waste type name (missing types are 0)
+        model (CompiledModel): Compiled tables
+    
+    Returns:
+        numpy.ndarray: Fractions with shape (n_blends, n_waste_types)
+    """
+    if hasattr(compositions, "keys"):
+        unknown = [name for name in compositions.keys() if name not in model.waste_index]
+        if unknown:
+            raise ValueError(f"Unknown waste type: {', '.join(map(str, unknown))}")
+        columns = [np.asarray(compositions[name], dtype=float) if name in compositions else 0.0
+                   for name in model.waste_types]
+        compositions = np.stack(np.broadcast_arrays(*columns), axis=-1)
+    
+    compositions = np.atleast_2d(np.asarray(compositions, dtype=float))
+    if compositions.ndim != 2 or compositions.shape[1] != len(model.waste_types):
+        raise ValueError(f"Compositions must have one column per waste type ({len(model.waste_types)}).")
+    if (compositions < 0).any():
+        raise ValueError("Composition fractions cannot be negative.")
+    if not np.allclose(compositions.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("Composition fractions must add up to 1.")
+    return compositions
+
+
+def calculate_blend_batch(compositions, masses, conversion_methods, model=None):
+    """
+    Calculate conversion results for batches of mixed waste.
+    
+    Each blend is converted as the mass-weighted sum of its waste types, so a
+    batch of 60% plastic and 40% organic yields 0.6 and 0.4 times the pure
+    results. All blends are evaluated at once with one matrix product per
+    conversion method.
+    
+    Args:
+        compositions (array-like, dict or pandas.DataFrame): Mass fractions per waste
+            type for each blend (see _composition_array), each row adding up to 1
+        masses (array-like): Total mass of each blend in kg
+        conversion_methods (array-like): Method names or integer codes
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: Columnar results with the same keys as calculate_conversion_batch,
+            with ``composition`` in place of the waste type columns. ``efficiency``
+            is the mass-weighted efficiency of the blend.
+    """
+    model = model or get_model()
+    compositions = _composition_array(compositions, model)
+    method_codes = model.encode_method(conversion_methods)
+    masses = np.asarray(masses, dtype=float)
+    n_rows = np.broadcast_shapes(compositions.shape[:1], masses.shape, method_codes.shape)[0]
+    compositions = np.broadcast_to(compositions, (n_rows, compositions.shape[1]))
+    masses = np.broadcast_to(masses, n_rows)
+    method_codes = np.broadcast_to(method_codes, n_rows)
+    
+    # Per-kg figures of each blend, one matrix product per method
+    n_fuel = len(model.fuel_types)
+    efficiency = np.zeros(n_rows)
+    energy_input = np.zeros(n_rows)
+    yield_per_kg = np.zeros((n_rows, n_fuel))
+    for j in range(len(model.conversion_methods)):
+        rows = method_codes == j
+        if rows.any():
+            efficiency[rows] = compositions[rows] @ model.efficiency[:, j]
+            energy_input[rows] = compositions[rows] @ model.energy_input[:, j]
+            yield_per_kg[rows] = compositions[rows] @ model.yield_per_kg[:, j, :]
+    
+    fuel_mass = masses[:, None] * yield_per_kg
+    fuel_energy = fuel_mass * model.energy_content
+    energy_required = masses * energy_input
+    total_energy_output = fuel_energy.sum(axis=1)
+    net_energy_balance = total_energy_output - energy_required
+    
+    # Avoid division by zero
+    conversion_efficiency = np.zeros(n_rows)
+    positive = energy_required > 0
+    conversion_efficiency[positive] = (total_energy_output[positive] / energy_required[positive]) * 100
+    
+    return {
+        "composition": compositions,
+        "method_code": method_codes,
+        "mass": masses,
+        "conversion_method": np.asarray(model.conversion_methods, dtype=object)[method_codes],
+        "efficiency": efficiency,
+        "energy_required": energy_required,
+        "fuel_produced": {fuel: fuel_mass[:, f] for f, fuel in enumerate(model.fuel_types)},
+        "fuel_energy_output": {fuel: fuel_energy[:, f] for f, fuel in enumerate(model.fuel_types)},
+        "total_energy_output": total_energy_output,
+        "net_energy_balance": net_energy_balance,
+        "conversion_efficiency": conversion_efficiency
+    }
+
+
+def make_rng(seed):
+    """
+    Resolve a seed argument into a random number source.
+    
+    Args:
+        seed (int, numpy.random.Generator or None): Seed or generator. None uses
+            NumPy's global random state, matching the original day-by-day draws.
+    
+    Returns:
+        numpy.random.Generator or module: Object providing a ``uniform`` method
+    """
+    if seed is None:
+        return np.random
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def _daily_energy(waste_type, daily_waste, conversion_method):
+    """
+    Energy figures for an array of daily waste masses.
+    
+    Uses the same lookups and operation order as calculate_conversion, applied
+    to every day at once, so each day matches a scalar call exactly.
+    
+    Args:
+        waste_type (str): Type of waste
+        daily_waste (numpy.ndarray): Waste mass per day in kg
+        conversion_method (str): Method of conversion
+    
+    Returns:
+        tuple: (energy_required, energy_output, net_balance) arrays
+    """
+    tables = get_model().tables
+    efficiency = tables["EFFICIENCY"][waste_type][conversion_method]
+    fuel_fractions = tables["FUEL_OUTPUT_FRACTIONS"][waste_type][conversion_method]
+    energy_required = daily_waste * tables["ENERGY_INPUT"][waste_type][conversion_method]
+    
+    energy_output = np.zeros(len(daily_waste))
+    for fuel_type, fraction in fuel_fractions.items():
+        fuel_mass = daily_waste * efficiency * fraction
+        energy_output += fuel_mass * tables["ENERGY_CONTENT"][fuel_type]
+    
+    return energy_required, energy_output, energy_output - energy_required
+
+
+def _daily_waste(daily_mass, rng, start, size):
+    """
+    Waste mass for each of a range of days.
+    
+    Args:
+        daily_mass (float or generators.DailyMassModel): Base daily mass, or a
+            model that generates each day's mass
+        rng (numpy.random.Generator or module): Source of the default variation
+        start (int): First day of the range (0 is the first simulated day)
+        size (int): Number of days
+    
+    Returns:
+        numpy.ndarray: Waste mass per day in kg
+    """
+    if hasattr(daily_mass, "generate"):
+        return daily_mass.generate(start, size)
+    
+    # Add some random variation to daily waste (±10%)
+    return daily_mass * rng.uniform(0.9, 1.1, size=size)
+
+
+def iter_simulation_chunks(waste_type, daily_mass, conversion_method, days=1000, seed=None, chunk_days=100000):
+    """
+    Run the time simulation in chunks of days.
+    
+    Draws come from the random source in order, so joining the chunks gives
+    the same values as simulate_over_time with the same seed. Useful for
+    reporting progress or stopping a long run early.
+    
+    Args:
+        waste_type (str): Type of waste
+        daily_mass (float or generators.DailyMassModel): Daily mass of waste in kg,
+            or a model generating each day's mass
+        conversion_method (str): Method of conversion
+        days (int): Number of days to simulate
+        seed (int, numpy.random.Generator or None): Source of the daily variation
+            (not used with a DailyMassModel)
+        chunk_days (int): Days per chunk
+    
+    Yields:
+        dict: Arrays for 'day', 'energy_required', 'energy_output' and 'net_balance'
+    """
+    rng = make_rng(seed)
+    for start in range(0, days, chunk_days):
+        size = min(chunk_days, days - start)
+        with span("simulate.chunk", days=size):
+            daily_waste = _daily_waste(daily_mass, rng, start, size)
+            energy_required, energy_output, net_balance = _daily_energy(waste_type, daily_waste, conversion_method)
+        count("simulation.days", size)
+        yield {
+            'day': np.arange(start + 1, start + size + 1),
+            'energy_required': energy_required,
+            'energy_output': energy_output,
+            'net_balance': net_balance
+        }
+
+
+@traced("simulate_over_time")
+def simulate_over_time(waste_type, daily_mass, conversion_method, days=1000, seed=None):
     """
     Simulate waste conversion over a period of time.
     
+    All daily variations are drawn in a single call and the energy figures are
+    computed as whole-array operations, so time and memory grow linearly with
+    the number of days.
+    
     Args:
         waste_type (str): Type of waste
-        daily_mass (float): Daily mass of waste in kg
+        daily_mass (float or generators.DailyMassModel): Daily mass of waste in kg,
+            or a model generating each day's mass (seasonality, trends, ...)
         conversion_method (str): Method of conversion
         days (int): Number of days to simulate
-        
+        seed (int, numpy.random.Generator or None): Source of the daily variation.
+            None draws from NumPy's global random state. Not used with a DailyMassModel.
+    
     Returns:
         pandas.DataFrame: DataFrame with daily results
     """
-    # Create empty DataFrame to store results
-    columns = ['day', 'energy_required', 'energy_output', 'net_balance']
-    df = pd.DataFrame(columns=columns)
+    # Imported here so the calculations don't pay for loading pandas
+    with span("simulate.import_pandas"):
+        import pandas as pd
     
-    # Simulate for each day
-    for day in range(1, days + 1):
-        # Add some random variation to daily waste (±10%)
-        daily_variation = np.random.uniform(0.9, 1.1)
-        daily_waste = daily_mass * daily_variation
-        
-        # Calculate conversion for the day
-        result = calculate_conversion(waste_type, daily_waste, conversion_method)
-        
-        # Add to DataFrame
-        new_row = {
-            'day': day,
-            'energy_required': result['energy_required'],
-            'energy_output': result['total_energy_output'],
-            'net_balance': result['net_energy_balance']
-        }
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+    rng = make_rng(seed)
+    count("simulation.days", days)
+    
+    with span("simulate.draw"):
+        daily_waste = _daily_waste(daily_mass, rng, 0, days)
+    with span("simulate.energy"):
+        energy_required, energy_output, net_balance = _daily_energy(waste_type, daily_waste, conversion_method)
+    
+    # Build the DataFrame once at the end
+    with span("simulate.dataframe"):
+        return pd.DataFrame({
+            'day': np.arange(1, days + 1),
+            'energy_required': energy_required,
+            'energy_output': energy_output,
+            'net_balance': net_balance
+        })
+
+
+@traced("summarize_over_time")
+def summarize_over_time(waste_type, daily_mass, conversion_method, days=1000, seed=None, chunk_days=1000000,
+                        quantile_columns=("net_balance",), relative_accuracy=0.001, progress=None):
+    """
+    Simulate waste conversion over time, keeping only aggregates.
     
-    return df
\ No newline at end of file
+    Runs the same days as simulate_over_time with the same seed, chunk by
+    chunk, and folds each chunk into a SimulationSummary instead of keeping it,
+    so memory does not grow with the number of days.
+    
+    Args:
+        waste_type (str): Type of waste
+        daily_mass (float or generators.DailyMassModel): Daily mass of waste in kg,
+            or a model generating each day's mass
+        conversion_method (str): Method of conversion
+        days (int): Number of days to simulate
+        seed (int, numpy.random.Generator or None): Source of the daily variation
+        chunk_days (int): Days held in memory at a time
+        quantile_columns (tuple): Columns to keep quantile sketches for
+        relative_accuracy (float): Relative error bound of the quantiles
+        progress (callable or None): Called with (completed days, total days) after each chunk
+        
+    Returns:
+        SimulationSummary: Totals, running statistics, quantiles, negative day
+            count and cumulative net balance
+    """
+    summary = SimulationSummary(quantile_columns, relative_accuracy)
+    for chunk in iter_simulation_chunks(waste_type, daily_mass, conversion_method, days, seed, chunk_days):
+        with span("summarize.chunk"):
+            summary.update(chunk)
+        if progress:
+            progress(summary.days, days)
+    return summary
@@ -0,0 +1,67 @@
+"""
+Downsampling of long series for the PROMETHEUS Waste-to-Fuel Simulator charts.
+This module reduces a series to about as many points as there are pixels to
+draw it on, keeping its visual shape, so chart drawing time does not depend
+on the length of the simulation.
+"""
+
+import numpy as np
+
+
+def visible_slice(x, x_min, x_max):
+    """
+    Index range of the points needed to draw a sorted series between two x values.
+    
+    One extra point is kept on each side so lines run to the edges of the view.
+    
+    Args:
+        x (numpy.ndarray): Sorted x values
+        x_min (float): Left edge of the view
+        x_max (float): Right edge of the view
+    
+    Returns:
+        slice: Slice into x
+    """
+    start = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return slice(start, stop)
+
+
+def minmax_downsample(x, y, n_buckets):
+    """
+    Keep the smallest and largest point of each of n_buckets equal-sized buckets.
+    
+    Spikes and the overall envelope survive exactly, and the result has at most
+    2 * n_buckets points in their original order. Fully vectorized.
+    
+    Args:
+        x (numpy.ndarray): Sorted x values
+        y (numpy.ndarray): y values
+        n_buckets (int): Number of buckets, typically the plot width in pixels
+    
+    Returns:
+        tuple: (x, y) arrays of the kept points
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n_buckets < 1:
+        raise ValueError("Number of buckets must be at least 1.")
+    if n <= 2 * n_buckets:
+        return x, y
+    
+    # Pad to a whole number of buckets by repeating the last point
+    size = -(-n // n_buckets)
+    padded = np.empty(size * n_buckets, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    buckets = padded.reshape(n_buckets, size)
+    
+    offsets = np.arange(n_buckets) * size
+    low = np.minimum(buckets.argmin(axis=1) + offsets, n - 1)
+    high = np.minimum(buckets.argmax(axis=1) + offsets, n - 1)
+    
+    # Each bucket contributes its min and max in x order, once if they coincide
+    keep = np.stack([np.minimum(low, high), np.maximum(low, high)], axis=1).ravel()
+    keep = keep[np.concatenate(([True], keep[1:] != keep[:-1]))]
+    return x[keep], y[keep]
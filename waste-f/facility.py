@@ -0,0 +1,204 @@
+"""
+Facility simulation for the PROMETHEUS Waste-to-Fuel Simulator.
+This module models conversion plants with limited daily throughput, a waste
+backlog queue, scheduled maintenance, random outages and fuel storage tanks,
+stepping all facilities forward one day at a time with array operations.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+from converter import make_rng, calculate_conversion_batch
+from model import get_model
+
+# Settings used for any key a facility leaves out
+FACILITY_DEFAULTS = {
+    "name": None,
+    "capacity": math.inf,              # kg of waste processed per day
+    "storage_capacity": math.inf,      # kg of waste the backlog queue can hold
+    "fuel_tank_capacity": math.inf,    # kg of fuel that can be stored on site
+    "fuel_offtake": math.inf,          # kg of fuel shipped out per day
+    "maintenance_interval": 0,         # days between maintenance stops (0 for none)
+    "maintenance_duration": 0,         # days each maintenance stop lasts
+    "outage_rate": 0.0,                # chance per day of a random outage starting
+    "mean_outage_days": 1.0,           # average length of a random outage
+    "variation": 0.1                   # daily waste arrives within ±variation of daily_mass
+}
+
+REQUIRED_KEYS = ["waste_type", "conversion_method", "daily_mass"]
+
+# Outputs that are not fuel: they leave the plant as byproducts instead of going into the fuel tank
+BYPRODUCT_TYPES = ["metal", "compost"]
+
+
+def _facility_arrays(facilities):
+    """
+    Fill in defaults and turn a list of facility dicts into one array per setting.
+    
+    Args:
+        facilities (list): Facility dicts
+    
+    Returns:
+        dict: Setting name to list or array with one entry per facility
+    """
+    if not facilities:
+        raise ValueError("At least one facility is required.")
+    filled = []
+    for i, facility in enumerate(facilities):
+        missing = [key for key in REQUIRED_KEYS if key not in facility]
+        if missing:
+            raise ValueError(f"Facility {i} is missing: {', '.join(missing)}")
+        unknown = [key for key in facility if key not in FACILITY_DEFAULTS and key not in REQUIRED_KEYS]
+        if unknown:
+            raise ValueError(f"Facility {i} has unknown settings: {', '.join(unknown)}")
+        filled.append({**FACILITY_DEFAULTS, "name": f"Facility {i + 1}", **facility})
+    
+    arrays = {key: [f[key] for f in filled] for key in filled[0]}
+    for key in arrays:
+        if key not in ("name", "waste_type", "conversion_method"):
+            arrays[key] = np.asarray(arrays[key], dtype=float)
+    return arrays
+
+
+def _outage_mask(rng, days, outage_rate, mean_outage_days):
+    """
+    Draw random outages for every facility.
+    
+    Args:
+        rng (numpy.random.Generator): Random number generator
+        days (int): Number of days
+        outage_rate (numpy.ndarray): Chance per day of an outage starting, per facility
+        mean_outage_days (numpy.ndarray): Average outage length, per facility
+    
+    Returns:
+        numpy.ndarray: Boolean array (days, facilities), True while a facility is down
+    """
+    n_facilities = len(outage_rate)
+    starts = rng.random((days, n_facilities)) < outage_rate
+    start_day, facility = np.nonzero(starts)
+    lengths = rng.geometric(1.0 / np.maximum(mean_outage_days[facility], 1.0))
+    
+    # +1 where an outage starts and -1 where it ends; a positive running sum means down
+    change = np.zeros((days + 1, n_facilities), dtype=np.int64)
+    np.add.at(change, (start_day, facility), 1)
+    np.add.at(change, (np.minimum(start_day + lengths, days), facility), -1)
+    return np.cumsum(change[:-1], axis=0) > 0
+
+
+def _maintenance_mask(days, interval, duration):
+    """
+    Mark scheduled maintenance days, held at the end of every interval.
+    
+    Returns:
+        numpy.ndarray: Boolean array (days, facilities), True during maintenance
+    """
+    day_index = np.arange(days)[:, None]
+    scheduled = interval > 0
+    position = np.where(scheduled, day_index % np.where(scheduled, interval, 1), 0)
+    return scheduled & (position >= interval - duration)
+
+
+def simulate_facilities(facilities, days=365, seed=None, model=None):
+    """
+    Simulate a set of conversion facilities day by day.
+    
+    Each day, waste arrives (with random variation) and joins the facility's
+    backlog, anything beyond the storage capacity is turned away, and the
+    facility processes as much of the backlog as its capacity allows unless it
+    is down for maintenance or an outage. Processing also stops when the fuel
+    tank is full. Fuel is then shipped out at the offtake rate.
+    
+    Only fuels go into the tank. Recovered metal and compost (BYPRODUCT_TYPES)
+    are reported separately and never hold up processing.
+    
+    All facilities are advanced together with array operations, and outages,
+    maintenance and arrivals are drawn up front, so the only Python loop is
+    over days.
+    
+    Args:
+        facilities (list): Facility dicts with ``waste_type``, ``conversion_method``
+            and ``daily_mass`` (kg/day), plus any settings in FACILITY_DEFAULTS
+        days (int): Number of days to simulate
+        seed (int, numpy.random.Generator or None): Source of arrivals and outages
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        pandas.DataFrame: One row per day and facility with processed mass,
+            backlog, turned-away waste, fuel stored and shipped, byproducts
+            (``metal_produced``, ``compost_produced``), availability and energy
+            balances
+    """
+    if days <= 0:
+        raise ValueError("Days must be greater than zero.")
+    model = model or get_model()
+    settings = _facility_arrays(facilities)
+    rng = make_rng(seed)
+    n_facilities = len(settings["name"])
+    
+    waste_codes = model.encode_waste(settings["waste_type"])
+    method_codes = model.encode_method(settings["conversion_method"])
+    yield_per_kg = model.yield_per_kg[waste_codes, method_codes]
+    is_fuel = np.array([fuel_type not in BYPRODUCT_TYPES for fuel_type in model.fuel_types])
+    fuel_per_kg = yield_per_kg[:, is_fuel].sum(axis=1)
+    
+    # Everything random or scheduled is drawn before stepping
+    variation = settings["variation"]
+    arrivals = settings["daily_mass"] * rng.uniform(1 - variation, 1 + variation, (days, n_facilities))
+    down = _maintenance_mask(days, settings["maintenance_interval"], settings["maintenance_duration"])
+    down |= _outage_mask(rng, days, settings["outage_rate"], settings["mean_outage_days"])
+    daily_capacity = np.where(down, 0.0, settings["capacity"])
+    
+    processed = np.zeros((days, n_facilities))
+    backlog = np.zeros((days, n_facilities))
+    turned_away = np.zeros((days, n_facilities))
+    fuel_stored = np.zeros((days, n_facilities))
+    fuel_shipped = np.zeros((days, n_facilities))
+    
+    queue = np.zeros(n_facilities)
+    tank = np.zeros(n_facilities)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for day in range(days):
+            queue += arrivals[day]
+            overflow = np.maximum(queue - settings["storage_capacity"], 0.0)
+            queue -= overflow
+            
+            # Don't make more fuel than the tank can hold
+            tank_limit = np.where(fuel_per_kg > 0, (settings["fuel_tank_capacity"] - tank) / fuel_per_kg, np.inf)
+            done = np.minimum(np.minimum(queue, daily_capacity[day]), tank_limit)
+            queue -= done
+            tank += done * fuel_per_kg
+            shipped = np.minimum(tank, settings["fuel_offtake"])
+            tank -= shipped
+            
+            processed[day] = done
+            backlog[day] = queue
+            turned_away[day] = overflow
+            fuel_stored[day] = tank
+            fuel_shipped[day] = shipped
+    
+    def byproduct_per_kg(byproduct):
+        # A model file may leave a byproduct out
+        index = model.fuel_index.get(byproduct)
+        return yield_per_kg[:, index] if index is not None else np.zeros(n_facilities)
+    
+    # Energy figures for every processed day, in one batch
+    results = calculate_conversion_batch(np.tile(waste_codes, days), processed.ravel(),
+                                         np.tile(method_codes, days), model=model)
+    
+    return pd.DataFrame({
+        "day": np.repeat(np.arange(1, days + 1), n_facilities),
+        "facility": np.tile(np.asarray(settings["name"], dtype=object), days),
+        "arrived_mass": arrivals.ravel(),
+        "processed_mass": processed.ravel(),
+        "backlog": backlog.ravel(),
+        "turned_away": turned_away.ravel(),
+        "fuel_stored": fuel_stored.ravel(),
+        "fuel_shipped": fuel_shipped.ravel(),
+        **{f"{byproduct}_produced": (processed * byproduct_per_kg(byproduct)).ravel()
+           for byproduct in BYPRODUCT_TYPES},
+        "available": ~down.ravel(),
+        "energy_required": results["energy_required"],
+        "energy_output": results["total_energy_output"],
+        "net_balance": results["net_energy_balance"]
+    })
@@ -0,0 +1,316 @@
+"""
+Daily waste generation models for the PROMETHEUS Waste-to-Fuel Simulator.
+This module builds daily waste masses from a base mass and a set of
+components - seasonality, weekly cycles, trends, random noise, autocorrelated
+AR(1) noise and replayed historical series - each computed for a whole range
+of days at once.
+
+Random numbers are drawn in fixed blocks of days, each block from its own
+seeded stream, so any range of days gives the same values whether it is
+generated in one call or split into pieces across workers.
+
+Example:
+    model = DailyMassModel(200 / 365, [Seasonal(0.2, peak_day=200), Weekly([1.2, 1, 1, 1, 1, 0.8, 0.6]),
+                                       Trend(0.03), AR1(0.9, 0.05)], seed=42)
+    simulate_over_time("Plastic", model, "Pyrolysis", days=3650)
+"""
+
+import math
+
+import numpy as np
+
+# Days per random number block
+BLOCK_DAYS = 1 << 16
+
+# Random streams start this many days before day 0, so AR(1) noise can be
+# warmed up from history instead of starting at zero
+HISTORY_DAYS = 1 << 20
+
+
+class DailyMassModel:
+    """
+    Daily waste mass as a base mass multiplied by a list of components.
+    
+    A model can be passed as the daily_mass of simulate_over_time and
+    iter_simulation_chunks, which then use it instead of the built-in ±10%
+    variation (their seed argument is not used; the model has its own).
+    """
+    def __init__(self, daily_mass, components=(), seed=None):
+        """
+        Create a model.
+        
+        Args:
+            daily_mass (float): Base daily mass of waste in kg
+            components (list): Components whose daily factors multiply the base mass
+            seed (int or None): Seed for the random components. None picks a fresh
+                seed, which is kept in ``self.seed`` so the run can be repeated.
+        """
+        if daily_mass < 0:
+            raise ValueError("Daily mass cannot be negative.")
+        self.daily_mass = float(daily_mass)
+        self.components = list(components)
+        self.seed = np.random.SeedSequence(seed).entropy
+    
+    def __repr__(self):
+        components = ", ".join(repr(c) for c in self.components)
+        return f"DailyMassModel({self.daily_mass}, [{components}], seed={self.seed})"
+    
+    def __call__(self, days):
+        """
+        Daily masses for days 0 to days - 1.
+        """
+        return self.generate(0, days)
+    
+    def generate(self, start, size):
+        """
+        Daily masses for a range of days.
+        
+        Args:
+            start (int): First day (0 is the first simulated day)
+            size (int): Number of days
+        
+        Returns:
+            numpy.ndarray: Waste mass per day in kg, never negative
+        """
+        if start < 0 or size < 0:
+            raise ValueError("Days cannot be negative.")
+        mass = np.full(size, self.daily_mass)
+        for index, component in enumerate(self.components):
+            mass *= component.factors(start, size, _NoiseStream(self.seed, index))
+        return np.maximum(mass, 0.0, out=mass)
+
+
+class _NoiseStream:
+    """
+    Random numbers for one component, addressed by day.
+    
+    Day d always gets the same value: it is drawn from block
+    (d + HISTORY_DAYS) // BLOCK_DAYS, which has its own SeedSequence spawn key.
+    """
+    __slots__ = ("entropy", "index")
+    
+    def __init__(self, entropy, index):
+        self.entropy = entropy
+        self.index = index
+    
+    def _draw(self, start, size, kind):
+        if start < -HISTORY_DAYS:
+            raise ValueError(f"Noise is only defined from {HISTORY_DAYS} days before day 0.")
+        values = np.empty(size)
+        first = (start + HISTORY_DAYS) // BLOCK_DAYS
+        last = (start + size - 1 + HISTORY_DAYS) // BLOCK_DAYS
+        for block in range(first, last + 1):
+            rng = np.random.default_rng(np.random.SeedSequence(self.entropy, spawn_key=(self.index, block)))
+            draw = rng.standard_normal if kind == "normal" else rng.random
+            block_start = block * BLOCK_DAYS - HISTORY_DAYS
+            lo = max(start, block_start)
+            hi = min(start + size, block_start + BLOCK_DAYS)
+            if hi - lo == BLOCK_DAYS:
+                # Whole blocks are drawn straight into the output
+                draw(out=values[lo - start:hi - start])
+            else:
+                values[lo - start:hi - start] = draw(BLOCK_DAYS)[lo - block_start:hi - block_start]
+        return values
+    
+    def normal(self, start, size):
+        """
+        Standard normal values for days start to start + size - 1.
+        """
+        return self._draw(start, size, "normal")
+    
+    def uniform(self, start, size):
+        """
+        Uniform values in [0, 1) for days start to start + size - 1.
+        """
+        return self._draw(start, size, "uniform")
+
+
+def _days(start, size):
+    return np.arange(start, start + size, dtype=float)
+
+
+class Seasonal:
+    """
+    Yearly (or other period) cosine cycle around 1.
+    """
+    def __init__(self, amplitude, period=365.25, peak_day=0):
+        """
+        Args:
+            amplitude (float): Relative swing, e.g. 0.2 for ±20%
+            period (float): Length of the cycle in days
+            peak_day (float): Day of the cycle with the highest factor
+        """
+        if not 0 <= amplitude <= 1:
+            raise ValueError("Amplitude must be between 0 and 1.")
+        self.amplitude = amplitude
+        self.period = period
+        self.peak_day = peak_day
+    
+    def __repr__(self):
+        return f"Seasonal({self.amplitude}, period={self.period}, peak_day={self.peak_day})"
+    
+    def factors(self, start, size, noise):
+        angle = _days(start, size)
+        angle -= self.peak_day
+        angle *= 2 * math.pi / self.period
+        factors = np.cos(angle, out=angle)
+        factors *= self.amplitude
+        factors += 1
+        return factors
+
+
+class Weekly:
+    """
+    Factor per day of the week, repeated every 7 days.
+    """
+    def __init__(self, factors, first_weekday=0):
+        """
+        Args:
+            factors (list): Seven factors, Monday first
+            first_weekday (int): Day of the week of day 0 (0 is Monday)
+        """
+        if len(factors) != 7:
+            raise ValueError("Weekly needs exactly 7 factors.")
+        self.week = np.asarray(factors, dtype=float)
+        self.first_weekday = first_weekday
+    
+    def __repr__(self):
+        return f"Weekly({self.week.tolist()}, first_weekday={self.first_weekday})"
+    
+    def factors(self, start, size, noise):
+        week = np.roll(self.week, -((start + self.first_weekday) % 7))
+        return np.tile(week, size // 7 + 1)[:size]
+
+
+class Trend:
+    """
+    Growth (or decline) over time, starting from 1 on day 0.
+    """
+    def __init__(self, rate, kind="exponential"):
+        """
+        Args:
+            rate (float): Change per year, e.g. 0.03 for 3%
+            kind (str): "exponential" for compound growth or "linear"
+        """
+        if kind not in ("exponential", "linear"):
+            raise ValueError("kind must be 'exponential' or 'linear'.")
+        self.rate = rate
+        self.kind = kind
+    
+    def __repr__(self):
+        return f"Trend({self.rate}, kind={self.kind!r})"
+    
+    def factors(self, start, size, noise):
+        years = _days(start, size) / 365.25
+        if self.kind == "linear":
+            return 1 + self.rate * years
+        return np.exp(math.log1p(self.rate) * years)
+
+
+class UniformNoise:
+    """
+    Independent daily factors drawn evenly between low and high.
+    
+    UniformNoise() gives the same ±10% variation as the default simulation,
+    though not the same values for a given seed.
+    """
+    def __init__(self, low=0.9, high=1.1):
+        """
+        Args:
+            low (float): Smallest factor
+            high (float): Largest factor
+        """
+        if low > high:
+            raise ValueError("low must not be greater than high.")
+        self.low = low
+        self.high = high
+    
+    def __repr__(self):
+        return f"UniformNoise({self.low}, {self.high})"
+    
+    def factors(self, start, size, noise):
+        factors = noise.uniform(start, size)
+        factors *= self.high - self.low
+        factors += self.low
+        return factors
+
+
+class AR1:
+    """
+    Autocorrelated noise: 1 + x, where x[d] = phi * x[d - 1] + innovation.
+    
+    The process is stationary with standard deviation sigma from day 0 on. Each
+    day is computed as a sum over the innovations of the days before it, cut
+    off once phi ** lag is below double precision, so a range of days can be
+    computed on its own with a scan over the preceding history.
+    """
+    def __init__(self, phi, sigma):
+        """
+        Args:
+            phi (float): Correlation between consecutive days, -0.9999 to 0.9999
+            sigma (float): Standard deviation of the factor around 1
+        """
+        if not abs(phi) <= 0.9999:
+            raise ValueError("phi must be between -0.9999 and 0.9999.")
+        if sigma < 0:
+            raise ValueError("sigma cannot be negative.")
+        self.phi = phi
+        self.sigma = sigma
+        
+        # Power of two number of lags after which phi ** lag no longer matters
+        self.lags = 1
+        while abs(phi) ** self.lags > 2.0 ** -53:
+            self.lags *= 2
+    
+    def __repr__(self):
+        return f"AR1({self.phi}, {self.sigma})"
+    
+    def factors(self, start, size, noise):
+        lags = self.lags
+        x = noise.normal(start - lags, size + lags) * (self.sigma * math.sqrt(1 - self.phi ** 2))
+        
+        # Hillis-Steele scan: after the pass with step k every value holds the
+        # innovations of its last 2k days. The first `lags` values are history
+        # and are dropped, so every kept day sums exactly the same terms.
+        step = 1
+        weight = self.phi
+        scaled = np.empty_like(x)
+        while step < lags:
+            np.multiply(x[:-step], weight, out=scaled[step:])
+            x[step:] += scaled[step:]
+            weight *= weight
+            step *= 2
+        x = x[lags:]
+        x += 1
+        return x
+
+
+class Replay:
+    """
+    Historical daily series, repeated from the start when it runs out.
+    """
+    def __init__(self, series, normalize=True):
+        """
+        Args:
+            series (array-like): Past daily values
+            normalize (bool): Divide by the mean so the factors average 1 and the
+                model's daily_mass sets the level. Use False with a daily_mass of
+                1 to replay the masses as they are.
+        """
+        series = np.asarray(series, dtype=float)
+        if series.ndim != 1 or not len(series):
+            raise ValueError("Series must be a non-empty list of daily values.")
+        if np.any(series < 0) or not np.all(np.isfinite(series)):
+            raise ValueError("Series values must be finite and not negative.")
+        if normalize:
+            mean = series.mean()
+            if mean == 0:
+                raise ValueError("Cannot normalize a series of zeros.")
+            series = series / mean
+        self.series = series
+    
+    def __repr__(self):
+        return f"Replay(<{len(self.series)} days>)"
+    
+    def factors(self, start, size, noise):
+        return self.series[np.arange(start, start + size) % len(self.series)]
@@ -1,11 +1,16 @@
 """Graphical version of the PROMETHEUS Waste-to-Fuel Simulator.
 This version uses Tkinter which comes with standard Python installations.
+Pass a JSON or TOML model file as the first argument to use its tables; the
+file is reloaded whenever it is saved.
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
+import os
+import sys
 from data import WASTE_TYPES, CONVERSION_METHODS, EFFICIENCY, FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT, ENERGY_CONTENT
+from config import ConfigWatcher, affected_pairs, default_tables, load_tables
 
 # Import calculation functions from simple_demo.py
 from simple_demo import calculate_conversion, format_number, format_energy, format_mass, format_percentage
@@ -151,14 +156,33 @@ class SimpleCanvas(tk.Canvas):
 class WasteToFuelSimulator(tk.Tk):
     """Main application window for the Waste-to-Fuel Simulator."""
     
-    def __init__(self):
+    # Milliseconds between checks of the model file for changes
+    MODEL_CHECK_INTERVAL = 1000
+    
+    def __init__(self, model_path=None):
         super().__init__()
         
         self.title("PROMETHEUS Waste-to-Fuel Simulator")
         self.geometry("800x600")
         self.minsize(800, 600)
         
+        # Model tables from a file (or PROMETHEUS_MODEL), reloaded when it changes
+        model_path = model_path or os.environ.get("PROMETHEUS_MODEL")
+        self.tables = None
+        self.model_watcher = None
+        model_error = None
+        if model_path:
+            self.model_watcher = ConfigWatcher(model_path, loader=load_tables)
+            try:
+                self.tables = load_tables(model_path)
+            except (OSError, ValueError, ImportError) as e:
+                # Keep the data.py tables until the file is fixed
+                model_error = f"Model file not loaded: {str(e).splitlines()[0]}"
+            self.after(self.MODEL_CHECK_INTERVAL, self.check_model_file)
+        
         self.create_widgets()
+        if model_error:
+            self.status_var.set(model_error)
         self.results = None
         
         # Run initial simulation with default values
@@ -181,11 +205,12 @@ class WasteToFuelSimulator(tk.Tk):
         
         # Waste type selection
         ttk.Label(input_frame, text="Waste Type:").grid(row=0, column=0, sticky=tk.W, pady=5)
-        self.waste_type_var = tk.StringVar(value=WASTE_TYPES[0])
-        waste_type_combo = ttk.Combobox(input_frame, textvariable=self.waste_type_var, 
-                                      values=WASTE_TYPES, state="readonly")
-        waste_type_combo.grid(row=0, column=1, sticky=tk.W, pady=5)
-        waste_type_combo.bind("<<ComboboxSelected>>", lambda e: self.run_simulation())
+        waste_types = self.tables["WASTE_TYPES"] if self.tables else WASTE_TYPES
+        self.waste_type_var = tk.StringVar(value=waste_types[0])
+        self.waste_type_combo = ttk.Combobox(input_frame, textvariable=self.waste_type_var, 
+                                           values=waste_types, state="readonly")
+        self.waste_type_combo.grid(row=0, column=1, sticky=tk.W, pady=5)
+        self.waste_type_combo.bind("<<ComboboxSelected>>", lambda e: self.run_simulation())
         
         # Mass input
         ttk.Label(input_frame, text="Mass (kg):").grid(row=1, column=0, sticky=tk.W, pady=5)
@@ -196,10 +221,11 @@ class WasteToFuelSimulator(tk.Tk):
         
         # Conversion method selection
         ttk.Label(input_frame, text="Conversion Method:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        self.conversion_method_var = tk.StringVar(value=CONVERSION_METHODS[0])
+        conversion_methods = self.tables["CONVERSION_METHODS"] if self.tables else CONVERSION_METHODS
+        self.conversion_method_var = tk.StringVar(value=conversion_methods[0])
         
         # Create radio buttons for conversion methods
-        for i, method in enumerate(CONVERSION_METHODS):
+        for i, method in enumerate(conversion_methods):
             rb = ttk.Radiobutton(input_frame, text=method, value=method, 
                                variable=self.conversion_method_var,
                                command=self.run_simulation)
@@ -209,6 +235,10 @@ class WasteToFuelSimulator(tk.Tk):
         run_button = ttk.Button(input_frame, text="Run Simulation", command=self.run_simulation)
         run_button.grid(row=5, column=0, columnspan=2, pady=10)
         
+        # Model file status
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(input_frame, textvariable=self.status_var, wraplength=200).grid(row=6, column=0, columnspan=2, sticky=tk.W)
+        
         # Output frame (right side)
         output_frame = ttk.Frame(main_frame)
         output_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -254,7 +284,7 @@ class WasteToFuelSimulator(tk.Tk):
                 return
             
             # Run calculation
-            self.results = calculate_conversion(waste_type, mass, conversion_method)
+            self.results = calculate_conversion(waste_type, mass, conversion_method, self.tables)
             
             # Update results display
             self.update_results_display()
@@ -264,6 +294,24 @@ class WasteToFuelSimulator(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
+    def check_model_file(self):
+        """Reload the model file if it changed, rerunning only if the shown waste type and method changed."""
+        try:
+            tables = self.model_watcher.poll()
+        except (OSError, ValueError, ImportError) as e:
+            self.status_var.set(f"Model file not loaded: {str(e).splitlines()[0]}")
+            tables = None
+        
+        if tables is not None:
+            changed = affected_pairs(self.tables or default_tables(), tables)
+            self.tables = tables
+            self.waste_type_combo.config(values=tables["WASTE_TYPES"])
+            self.status_var.set(f"Model reloaded ({len(changed)} pairs changed)")
+            if (self.waste_type_var.get(), self.conversion_method_var.get()) in changed:
+                self.run_simulation()
+        
+        self.after(self.MODEL_CHECK_INTERVAL, self.check_model_file)
+    
     def update_results_display(self):
         """Update the results display with current simulation results."""
         if not self.results:
@@ -345,7 +393,7 @@ class WasteToFuelSimulator(tk.Tk):
 
 def main():
     """Run the application."""
-    app = WasteToFuelSimulator()
+    app = WasteToFuelSimulator(sys.argv[1] if len(sys.argv) > 1 else None)
     app.mainloop()
 
 if __name__ == "__main__":
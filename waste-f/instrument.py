@@ -0,0 +1,271 @@
+"""
+Timing instrumentation for the PROMETHEUS Waste-to-Fuel Simulator.
+This module records timing spans and counters around the calculation,
+charting and summary functions, and exports them as a Chrome trace
+(chrome://tracing or https://ui.perfetto.dev) or a JSON summary.
+
+Recording is off by default and costs one flag check per instrumented call.
+Turn it on with enable() or by setting the PROMETHEUS_TRACE environment
+variable to 1.
+"""
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+# Oldest events are dropped beyond this many
+MAX_EVENTS = 1000000
+
+_enabled = os.environ.get("PROMETHEUS_TRACE", "").lower() not in ("", "0", "false", "no")
+_lock = threading.Lock()
+_events = collections.deque(maxlen=MAX_EVENTS)
+_sequence = 0
+_origin = time.perf_counter_ns()
+
+
+def enable(on=True):
+    """
+    Turn recording on (or off with enable(False)).
+    """
+    global _enabled
+    _enabled = bool(on)
+
+
+def disable():
+    """
+    Turn recording off. Recorded events are kept.
+    """
+    enable(False)
+
+
+def is_enabled():
+    """
+    Whether spans and counters are being recorded.
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Discard every recorded event.
+    """
+    with _lock:
+        _events.clear()
+
+
+def mark():
+    """
+    Position in the event log, for summarizing only what is recorded after it.
+    
+    Returns:
+        int: Sequence number of the next event
+    """
+    return _sequence
+
+
+def _record(name, start_ns, duration_ns, args):
+    """
+    Store one event. Counters have a duration of None and their increment in args.
+    """
+    global _sequence
+    with _lock:
+        _events.append((_sequence, name, start_ns, duration_ns, threading.get_ident(), args))
+        _sequence += 1
+
+
+class _Span:
+    """
+    Context manager that records the time spent inside it.
+    """
+    __slots__ = ("name", "args", "start")
+    
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class _NullSpan:
+    """
+    Stand-in for _Span while recording is off.
+    """
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """
+    Time a block of code.
+    
+    Example:
+        with span("simulate.dataframe", days=days):
+            ...
+    
+    Args:
+        name (str): Span name
+        **args: Extra details shown with the span in the Chrome trace
+    
+    Returns:
+        Context manager
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+
+def traced(name=None):
+    """
+    Decorator that records a span for every call of a function.
+    
+    Args:
+        name (str or None): Span name, defaults to the function's qualified name
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(label, start, time.perf_counter_ns() - start, None)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """
+    Add to a counter, such as the number of rows or days processed.
+    
+    Args:
+        name (str): Counter name
+        value (int or float): Amount to add
+    """
+    if _enabled:
+        _record(name, time.perf_counter_ns(), None, value)
+
+
+def _snapshot(since):
+    with _lock:
+        return [event for event in _events if event[0] >= since]
+
+
+def summary(since=0):
+    """
+    Totals per span and counter.
+    
+    Args:
+        since (int): Only include events recorded after this mark()
+    
+    Returns:
+        dict: ``spans`` maps each span name to its call count and total, mean,
+            min and max seconds (slowest total first); ``counters`` maps each
+            counter name to its total
+    """
+    spans = {}
+    counters = {}
+    for _, name, _, duration, _, args in _snapshot(since):
+        if duration is None:
+            counters[name] = counters.get(name, 0) + args
+            continue
+        entry = spans.setdefault(name, {"count": 0, "total_seconds": 0.0, "min_seconds": float("inf"),
+                                        "max_seconds": 0.0})
+        seconds = duration / 1e9
+        entry["count"] += 1
+        entry["total_seconds"] += seconds
+        entry["min_seconds"] = min(entry["min_seconds"], seconds)
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+    for entry in spans.values():
+        entry["mean_seconds"] = entry["total_seconds"] / entry["count"]
+    spans = dict(sorted(spans.items(), key=lambda item: -item[1]["total_seconds"]))
+    return {"spans": spans, "counters": counters}
+
+
+def format_summary(since=0):
+    """
+    Summary as a text table, slowest total first.
+    
+    Args:
+        since (int): Only include events recorded after this mark()
+    
+    Returns:
+        str: Table of spans and counters
+    """
+    data = summary(since)
+    if not data["spans"] and not data["counters"]:
+        return "No timings recorded." if _enabled else "Timing is off."
+    lines = [f"{'Span':<34} {'Calls':>7} {'Total ms':>10} {'Mean ms':>10} {'Max ms':>10}"]
+    for name, entry in data["spans"].items():
+        lines.append(f"{name:<34} {entry['count']:>7} {entry['total_seconds'] * 1000:>10.2f} "
+                     f"{entry['mean_seconds'] * 1000:>10.3f} {entry['max_seconds'] * 1000:>10.2f}")
+    if data["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<34} {'Total':>18}")
+        for name, total in data["counters"].items():
+            lines.append(f"{name:<34} {total:>18,}")
+    return "\n".join(lines)
+
+
+def chrome_trace(since=0):
+    """
+    Recorded events in the Chrome trace event format.
+    
+    Args:
+        since (int): Only include events recorded after this mark()
+    
+    Returns:
+        dict: Trace with a ``traceEvents`` list
+    """
+    pid = os.getpid()
+    totals = {}
+    trace_events = []
+    for _, name, start, duration, tid, args in _snapshot(since):
+        timestamp = (start - _origin) / 1000
+        if duration is None:
+            totals[name] = totals.get(name, 0) + args
+            trace_events.append({"name": name, "ph": "C", "ts": timestamp, "pid": pid, "tid": tid,
+                                 "args": {name: totals[name]}})
+        else:
+            event = {"name": name, "ph": "X", "ts": timestamp, "dur": duration / 1000, "pid": pid, "tid": tid}
+            if args:
+                event["args"] = args
+            trace_events.append(event)
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path, since=0):
+    """
+    Save recorded events as a Chrome trace JSON file.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(since), f)
+
+
+def write_summary(path, since=0):
+    """
+    Save the summary() of recorded events as JSON.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary(since), f, indent=2)
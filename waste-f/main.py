@@ -1,32 +1,58 @@
 """
 Main module for the PROMETHEUS Waste-to-Fuel Simulator.
 Handles UI and program flow.
+
+matplotlib (through visualizer) and pandas are imported the first time a
+chart or time series is needed, so the window opens without waiting for them.
+
+Run with --model path/to/model.toml (or set PROMETHEUS_MODEL) to use model
+tables from a file; the file is reloaded whenever it is saved.
 """
 
+import argparse
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
+from tkinter import ttk, scrolledtext, filedialog
 import numpy as np
 
 # Import project modules
+import instrument
 from data import WASTE_TYPES, CONVERSION_METHODS
-from converter import calculate_conversion, simulate_over_time
-from visualizer import create_energy_bar_chart, create_fuel_pie_chart, create_time_series_chart, embed_figure_in_tkinter
+from config import ConfigWatcher, affected_pairs, load_model
+from converter import calculate_conversion, iter_simulation_chunks
+from model import MODEL_ENV, get_model, set_model
 from utils import create_summary_text
 
 
 class PrometheusApp:
     """
     Main application class for the PROMETHEUS Waste-to-Fuel Simulator.
+    
+    Simulations run in a worker thread and post their results to a queue,
+    which the Tk loop polls, so the window stays responsive during long runs.
     """
-    def __init__(self, root):
+    # Milliseconds between checks for worker results (about 60 per second)
+    POLL_INTERVAL = 16
+    
+    # Days simulated between progress updates and cancellation checks
+    CHUNK_DAYS = 50000
+    
+    # Most front plans listed in the Pareto explorer table
+    PARETO_TABLE_ROWS = 1000
+    
+    # Milliseconds between checks of the model file for changes
+    MODEL_CHECK_INTERVAL = 1000
+    
+    def __init__(self, root, model_path=None):
         """
         Initialize the application.
         
         Args:
             root (tk.Tk): Root window
+            model_path (str or None): JSON or TOML model file to use and watch,
+                defaults to the PROMETHEUS_MODEL environment variable
         """
         self.root = root
         self.root.title("PROMETHEUS Waste-to-Fuel Simulator")
@@ -38,6 +64,30 @@ class PrometheusApp:
         self.accent_color = "#3a7ca5"
         self.root.configure(bg=self.bg_color)
         
+        # Background simulation state
+        self.result_queue = queue.Queue()
+        self.job_id = 0
+        self.cancel_event = None
+        self.current_job = None
+        self.polling = False
+        self.rerun_pending = None
+        
+        # Timing diagnostics for the last run
+        self.run_mark = instrument.mark()
+        self.diagnostics_window = None
+        
+        # Pareto explorer window and its last results
+        self.pareto_window = None
+        self.pareto_plans = None
+        
+        # Model file, reloaded when it changes
+        model_path = model_path or os.environ.get(MODEL_ENV)
+        self.model_watcher = None
+        if model_path:
+            set_model(load_model(model_path))
+            self.model_watcher = ConfigWatcher(model_path)
+            self.root.after(self.MODEL_CHECK_INTERVAL, self.check_model_file)
+        
         # Create main frames
         self.create_frames()
         
@@ -47,13 +97,13 @@ class PrometheusApp:
         # Create output panel
         self.create_output_panel()
         
-        # Initialize chart canvases
-        self.energy_chart_canvas = None
-        self.fuel_chart_canvas = None
-        self.time_chart_canvas = None
+        # Charts are created on first use and then updated in place
+        self.energy_chart = None
+        self.fuel_chart = None
+        self.time_chart = None
         
-        # Run a sample simulation for demo purposes
-        self.run_sample_simulation()
+        # Run a sample simulation for demo purposes once the window is up
+        self.root.after_idle(self.run_sample_simulation)
     
     def create_frames(self):
         """
@@ -97,9 +147,10 @@ class PrometheusApp:
         """
         # Waste Type selection
         ttk.Label(self.left_frame, text="Waste Type:").pack(anchor="w", padx=10, pady=(10, 5))
-        self.waste_type_var = tk.StringVar(value=WASTE_TYPES[0])
-        waste_type_combo = ttk.Combobox(self.left_frame, textvariable=self.waste_type_var, values=WASTE_TYPES, state="readonly", width=20)
-        waste_type_combo.pack(fill="x", padx=10, pady=(0, 10))
+        waste_types = get_model().waste_types if self.model_watcher else WASTE_TYPES
+        self.waste_type_var = tk.StringVar(value=waste_types[0])
+        self.waste_type_combo = ttk.Combobox(self.left_frame, textvariable=self.waste_type_var, values=waste_types, state="readonly", width=20)
+        self.waste_type_combo.pack(fill="x", padx=10, pady=(0, 10))
         
         # Mass input
         ttk.Label(self.left_frame, text="Mass (kg):").pack(anchor="w", padx=10, pady=(10, 5))
@@ -109,10 +160,11 @@ class PrometheusApp:
         
         # Conversion Method selection
         ttk.Label(self.left_frame, text="Conversion Method:").pack(anchor="w", padx=10, pady=(10, 5))
-        self.conversion_method_var = tk.StringVar(value=CONVERSION_METHODS[0])
+        conversion_methods = get_model().conversion_methods if self.model_watcher else CONVERSION_METHODS
+        self.conversion_method_var = tk.StringVar(value=conversion_methods[0])
         
         # Create radio buttons for conversion methods
-        for method in CONVERSION_METHODS:
+        for method in conversion_methods:
             ttk.Radiobutton(self.left_frame, text=method, variable=self.conversion_method_var, value=method).pack(anchor="w", padx=20, pady=2)
         
         # Add some space
@@ -131,6 +183,27 @@ class PrometheusApp:
         self.days_var = tk.StringVar(value="1000")
         days_entry = ttk.Entry(self.left_frame, textvariable=self.days_var, width=10)
         days_entry.pack(anchor="w", padx=10, pady=(0, 10))
+        
+        # Progress of the running simulation
+        self.progress_var = tk.DoubleVar(value=0)
+        progress_bar = ttk.Progressbar(self.left_frame, variable=self.progress_var, maximum=100)
+        progress_bar.pack(fill="x", padx=10, pady=(10, 5))
+        self.status_var = tk.StringVar(value="Ready")
+        ttk.Label(self.left_frame, textvariable=self.status_var).pack(anchor="w", padx=10)
+        
+        # Cancel button, enabled while a simulation is running
+        self.cancel_button = ttk.Button(self.left_frame, text="Cancel", command=self.cancel_simulation, state="disabled")
+        self.cancel_button.pack(fill="x", padx=10, pady=10)
+        
+        # Timing breakdown of the last run
+        ttk.Button(self.left_frame, text="Diagnostics", command=self.show_diagnostics).pack(fill="x", padx=10, pady=(0, 10))
+        
+        # Compare every waste type and method on several objectives
+        ttk.Button(self.left_frame, text="Pareto Explorer", command=self.show_pareto).pack(fill="x", padx=10, pady=(0, 10))
+        
+        # Restart a running simulation when the inputs change
+        for var in (self.waste_type_var, self.mass_var, self.conversion_method_var, self.time_sim_var, self.days_var):
+            var.trace_add("write", self.on_input_changed)
     
     def create_output_panel(self):
         """
@@ -144,6 +217,9 @@ class PrometheusApp:
     def run_simulation(self):
         """
         Run the simulation with the current input values.
+        
+        Inputs are validated here; the calculations run in a worker thread.
+        Any simulation that is still running is superseded.
         """
         try:
             # Get input values
@@ -154,39 +230,421 @@ class PrometheusApp:
             # Validate inputs
             if mass <= 0:
                 raise ValueError("Mass must be greater than zero.")
-            
-            # Calculate conversion
-            results = calculate_conversion(waste_type, mass, conversion_method)
-            
-            # Update text results
-            summary_text = create_summary_text(results)
+        except ValueError as e:
             self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(tk.END, summary_text)
+            self.results_text.insert(tk.END, f"Error: {str(e)}\n\nPlease check your inputs and try again.")
+            return
+        
+        # Time simulation settings, if selected
+        days = None
+        days_error = None
+        if self.time_sim_var.get():
+            try:
+                days = int(self.days_var.get())
+                if days <= 0:
+                    raise ValueError("Days must be greater than zero.")
+            except ValueError as e:
+                days = None
+                days_error = str(e)
+        
+        job = {
+            "waste_type": waste_type,
+            "mass": mass,
+            "conversion_method": conversion_method,
+            "days": days,
+            "days_error": days_error
+        }
+        
+        # Supersede any job that is still running
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.run_mark = instrument.mark()
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        self.current_job = job
+        worker = threading.Thread(target=self.run_job, args=(self.job_id, self.cancel_event, job), daemon=True)
+        worker.start()
+        
+        self.progress_var.set(0)
+        self.status_var.set("Running...")
+        self.cancel_button.config(state="normal")
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_INTERVAL, self.poll_results)
+    
+    def run_job(self, job_id, cancel_event, job):
+        """
+        Run one simulation job. Called in a worker thread.
+        
+        Results are never applied to widgets here; they are posted to the
+        result queue as (job_id, kind, payload) messages for the Tk loop.
+        
+        Args:
+            job_id (int): Identifier of the job
+            cancel_event (threading.Event): Set when the job is cancelled or superseded
+            job (dict): Validated inputs
+        """
+        def post(kind, payload=None):
+            self.result_queue.put((job_id, kind, payload))
+        
+        try:
+            # Calculate conversion
+            post("conversion", calculate_conversion(job["waste_type"], job["mass"], job["conversion_method"]))
             
-            # Create and display charts
-            self.update_charts(results)
+            # Run time simulation in chunks so it can report progress and stop early
+            if job["days"]:
+                columns = {}
+                days_done = 0
+                for chunk in iter_simulation_chunks(job["waste_type"], job["mass"]/365, job["conversion_method"],
+                                                    job["days"], chunk_days=self.CHUNK_DAYS):
+                    if cancel_event.is_set():
+                        post("cancelled")
+                        return
+                    for name, values in chunk.items():
+                        columns.setdefault(name, []).append(values)
+                    days_done += len(chunk["day"])
+                    post("progress", days_done / job["days"])
+                
+                # Loaded on first use, in this thread so the window doesn't wait
+                import pandas as pd
+                with instrument.span("job.time_series_frame"):
+                    time_data = pd.DataFrame({name: np.concatenate(parts) for name, parts in columns.items()})
+                post("time_series", time_data)
             
-            # Run time simulation if selected
-            if self.time_sim_var.get():
-                try:
-                    days = int(self.days_var.get())
-                    if days <= 0:
-                        raise ValueError("Days must be greater than zero.")
-                    
-                    # Run time simulation
-                    time_data = simulate_over_time(waste_type, mass/365, conversion_method, days)
+            post("done")
+        except Exception as e:
+            post("error", e)
+    
+    def poll_results(self):
+        """
+        Apply messages from the worker thread to the UI.
+        
+        Messages from superseded jobs are dropped. Polling stops once no job is running.
+        """
+        try:
+            while True:
+                job_id, kind, payload = self.result_queue.get_nowait()
+                if job_id != self.job_id:
+                    continue
+                
+                if kind == "conversion":
+                    # Update text results
+                    summary_text = create_summary_text(payload)
+                    with instrument.span("ui.results_text"):
+                        self.results_text.delete(1.0, tk.END)
+                        self.results_text.insert(tk.END, summary_text)
+                        if self.current_job["days_error"]:
+                            self.results_text.insert(tk.END, f"\n\nError in time simulation: {self.current_job['days_error']}")
                     
-                    # Create and display time chart
-                    self.update_time_chart(time_data)
-                except ValueError as e:
-                    self.results_text.insert(tk.END, f"\n\nError in time simulation: {str(e)}")
+                    # Create and display charts
+                    self.update_charts(payload)
+                elif kind == "progress":
+                    self.progress_var.set(payload * 100)
+                    self.status_var.set(f"Simulating... {payload:.0%}")
+                elif kind == "time_series":
+                    self.update_time_chart(payload)
+                elif kind == "done":
+                    self.finish_job("Done")
+                elif kind == "cancelled":
+                    self.finish_job("Cancelled")
+                elif kind == "error":
+                    self.results_text.delete(1.0, tk.END)
+                    self.results_text.insert(tk.END, f"An unexpected error occurred: {str(payload)}\n\nPlease check your inputs and try again.")
+                    self.finish_job("Error")
+        except queue.Empty:
+            pass
+        
+        if self.cancel_event is None:
+            self.polling = False
+        else:
+            self.root.after(self.POLL_INTERVAL, self.poll_results)
+    
+    def finish_job(self, status):
+        """
+        Reset the progress controls after a job ends.
+        
+        Args:
+            status (str): Text shown in the status line
+        """
+        self.cancel_event = None
+        self.cancel_button.config(state="disabled")
+        self.status_var.set(status)
+        if status == "Done":
+            self.progress_var.set(100)
+        self.refresh_diagnostics()
+    
+    def cancel_simulation(self):
+        """
+        Cancel the running simulation.
+        """
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.status_var.set("Cancelling...")
+    
+    def on_input_changed(self, *args):
+        """
+        Supersede a running simulation when an input changes.
+        
+        The replacement run starts once the inputs have been still for a moment,
+        so typing a number doesn't start a job per keystroke.
+        """
+        if self.cancel_event is None:
+            return
+        if self.rerun_pending is not None:
+            self.root.after_cancel(self.rerun_pending)
+        self.rerun_pending = self.root.after(300, self.rerun_simulation)
+    
+    def rerun_simulation(self):
+        """
+        Start the replacement run scheduled by on_input_changed.
+        """
+        self.rerun_pending = None
+        if self.cancel_event is not None:
+            self.run_simulation()
+    
+    def check_model_file(self):
+        """
+        Reload the model file if it changed and rerun what its changes affect.
+        
+        The simulation shown is only rerun if the entries of its waste type and
+        method changed, and the Pareto front only if any entry changed. An
+        invalid file is reported in the status line and the last good model is
+        kept.
+        """
+        try:
+            model = self.model_watcher.poll()
+        except (OSError, ValueError, ImportError) as e:
+            self.status_var.set(f"Model file not loaded: {str(e).splitlines()[0]}")
+            model = None
+        
+        if model is not None:
+            changed = affected_pairs(get_model(), model)
+            set_model(model)
+            self.waste_type_combo.config(values=model.waste_types)
+            self.status_var.set(f"Model reloaded ({len(changed)} pairs changed)")
             
+            job = self.current_job
+            if job is not None and (job["waste_type"], job["conversion_method"]) in changed:
+                self.run_simulation()
+            if changed and self.pareto_plans is not None:
+                self.run_pareto()
+        
+        self.root.after(self.MODEL_CHECK_INTERVAL, self.check_model_file)
+    
+    def show_diagnostics(self):
+        """
+        Open the diagnostics window with the timing breakdown of the last run.
+        """
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.lift()
+            self.refresh_diagnostics()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("640x420")
+        window.protocol("WM_DELETE_WINDOW", self.close_diagnostics)
+        self.diagnostics_window = window
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill="x", padx=10, pady=(10, 5))
+        self.trace_var = tk.BooleanVar(value=instrument.is_enabled())
+        ttk.Checkbutton(controls, text="Record timings", variable=self.trace_var,
+                        command=lambda: instrument.enable(self.trace_var.get())).pack(side="left")
+        ttk.Button(controls, text="Export Summary...", command=self.export_summary).pack(side="right")
+        ttk.Button(controls, text="Export Chrome Trace...", command=self.export_trace).pack(side="right", padx=5)
+        ttk.Button(controls, text="Refresh", command=self.refresh_diagnostics).pack(side="right")
+        
+        self.diagnostics_text = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Consolas", 10))
+        self.diagnostics_text.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.refresh_diagnostics()
+    
+    def close_diagnostics(self):
+        """
+        Close the diagnostics window.
+        """
+        self.diagnostics_window.destroy()
+        self.diagnostics_window = None
+    
+    def refresh_diagnostics(self):
+        """
+        Show the timings recorded since the last run started, if the window is open.
+        """
+        if self.diagnostics_window is None:
+            return
+        text = instrument.format_summary(self.run_mark)
+        if not instrument.is_enabled():
+            text += "\n\nTurn on \"Record timings\" and run a simulation to see where the time goes."
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, text)
+    
+    def export_trace(self):
+        """
+        Save the last run's timings as a Chrome trace.
+        """
+        path = filedialog.asksaveasfilename(parent=self.diagnostics_window, defaultextension=".json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            instrument.write_chrome_trace(path, self.run_mark)
+    
+    def export_summary(self):
+        """
+        Save the last run's timing summary as JSON.
+        """
+        path = filedialog.asksaveasfilename(parent=self.diagnostics_window, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            instrument.write_summary(path, self.run_mark)
+    
+    def show_pareto(self):
+        """
+        Open the Pareto explorer, which compares every waste type (or mix),
+        mass and method on the chosen objectives.
+        """
+        if self.pareto_window is not None:
+            self.pareto_window.lift()
+            return
+        
+        from pareto import OBJECTIVES
+        
+        window = tk.Toplevel(self.root)
+        window.title("Pareto Explorer")
+        window.geometry("1100x650")
+        window.protocol("WM_DELETE_WINDOW", self.close_pareto)
+        self.pareto_window = window
+        
+        controls = ttk.Frame(window)
+        controls.pack(side="left", fill="y", padx=10, pady=10)
+        
+        # Objectives to compare
+        ttk.Label(controls, text="Objectives:").pack(anchor="w", pady=(0, 5))
+        self.pareto_objective_vars = {}
+        for name in list(OBJECTIVES) + get_model().fuel_types:
+            var = tk.BooleanVar(value=name in ("net_energy", "metal", "compost"))
+            ttk.Checkbutton(controls, text=name, variable=var).pack(anchor="w", padx=10)
+            self.pareto_objective_vars[name] = var
+        
+        ttk.Label(controls, text="Masses (kg), e.g. 100, 200 or 50:1000:20:").pack(anchor="w", pady=(10, 0))
+        self.pareto_masses_var = tk.StringVar(value="100")
+        ttk.Entry(controls, textvariable=self.pareto_masses_var, width=24).pack(anchor="w")
+        
+        ttk.Label(controls, text="Mix step (blank for pure waste only):").pack(anchor="w", pady=(10, 0))
+        self.pareto_mix_var = tk.StringVar(value="0.1")
+        ttk.Entry(controls, textvariable=self.pareto_mix_var, width=10).pack(anchor="w")
+        
+        ttk.Button(controls, text="Find Pareto Front", command=self.run_pareto).pack(fill="x", pady=10)
+        
+        # Objectives on the chart axes
+        ttk.Label(controls, text="X axis:").pack(anchor="w")
+        self.pareto_x_var = tk.StringVar()
+        self.pareto_x_combo = ttk.Combobox(controls, textvariable=self.pareto_x_var, state="readonly", width=20)
+        self.pareto_x_combo.pack(anchor="w")
+        ttk.Label(controls, text="Y axis:").pack(anchor="w", pady=(5, 0))
+        self.pareto_y_var = tk.StringVar()
+        self.pareto_y_combo = ttk.Combobox(controls, textvariable=self.pareto_y_var, state="readonly", width=20)
+        self.pareto_y_combo.pack(anchor="w")
+        for combo in (self.pareto_x_combo, self.pareto_y_combo):
+            combo.bind("<<ComboboxSelected>>", lambda event: self.update_pareto_chart())
+        
+        self.pareto_status_var = tk.StringVar(value="Choose objectives and press Find Pareto Front.")
+        ttk.Label(controls, textvariable=self.pareto_status_var, wraplength=220).pack(anchor="w", pady=10)
+        
+        # Chart above the list of front plans
+        output = ttk.Frame(window)
+        output.pack(side="right", fill="both", expand=True, padx=10, pady=10)
+        chart_frame = ttk.Frame(output)
+        chart_frame.pack(fill="both", expand=True)
+        from visualizer import ParetoChart
+        self.pareto_chart = ParetoChart(chart_frame)
+        
+        self.pareto_table = ttk.Treeview(output, show="headings", height=8)
+        self.pareto_table.pack(fill="x", pady=(5, 0))
+    
+    def close_pareto(self):
+        """
+        Close the Pareto explorer.
+        """
+        self.pareto_window.destroy()
+        self.pareto_window = None
+        self.pareto_plans = None
+    
+    def run_pareto(self):
+        """
+        Evaluate every plan in a worker thread and show the front when it is done.
+        """
+        objectives = [name for name, var in self.pareto_objective_vars.items() if var.get()]
+        try:
+            if len(objectives) < 2:
+                raise ValueError("Choose at least two objectives.")
+            masses = self.pareto_masses_var.get().strip()
+            if masses.count(":") == 2:
+                start, stop, steps = masses.split(":")
+                masses = np.linspace(float(start), float(stop), int(steps))
+            else:
+                masses = [float(m) for m in masses.replace(",", " ").split()]
+            mix_step = float(self.pareto_mix_var.get()) if self.pareto_mix_var.get().strip() else None
         except ValueError as e:
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(tk.END, f"Error: {str(e)}\n\nPlease check your inputs and try again.")
-        except Exception as e:
-            self.results_text.delete(1.0, tk.END)
-            self.results_text.insert(tk.END, f"An unexpected error occurred: {str(e)}\n\nPlease check your inputs and try again.")
+            self.pareto_status_var.set(f"Invalid input: {e}")
+            return
+        
+        self.pareto_status_var.set("Evaluating plans...")
+        result = {}
+        
+        def work():
+            # Any failure (e.g. MemoryError on a very large grid) is reported in the window
+            try:
+                from pareto import explore
+                result["plans"] = explore(objectives, masses=masses, mix_step=mix_step)
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+        
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        self.root.after(self.POLL_INTERVAL, self.poll_pareto, thread, result, objectives)
+    
+    def poll_pareto(self, thread, result, objectives):
+        """
+        Wait for the Pareto worker thread, then update the chart and table.
+        """
+        if self.pareto_window is None:
+            return
+        if thread.is_alive():
+            self.root.after(self.POLL_INTERVAL, self.poll_pareto, thread, result, objectives)
+            return
+        if "error" in result:
+            self.pareto_status_var.set(f"Error: {result['error']}")
+            return
+        
+        plans = result["plans"]
+        self.pareto_plans = plans
+        first = objectives[0]
+        front = plans[plans["on_front"]].sort_values(first, ascending=plans.attrs["objectives"][first] == "min")
+        self.pareto_status_var.set(f"{len(front):,} of {len(plans):,} plans are on the Pareto front.")
+        
+        self.pareto_x_combo["values"] = objectives
+        self.pareto_y_combo["values"] = objectives
+        if self.pareto_x_var.get() not in objectives:
+            self.pareto_x_var.set(objectives[0])
+        if self.pareto_y_var.get() not in objectives:
+            self.pareto_y_var.set(objectives[1])
+        self.update_pareto_chart()
+        
+        columns = ["plan", "mass", "conversion_method"] + objectives
+        self.pareto_table.delete(*self.pareto_table.get_children())
+        self.pareto_table["columns"] = columns
+        for column in columns:
+            self.pareto_table.heading(column, text=column)
+            self.pareto_table.column(column, width=200 if column == "plan" else 110, anchor="w")
+        # The chart shows the whole front; the table lists the best plans first
+        for row in front[columns].head(self.PARETO_TABLE_ROWS).itertuples(index=False):
+            self.pareto_table.insert("", tk.END, values=[v if isinstance(v, str) else f"{v:,.4g}" for v in row])
+    
+    def update_pareto_chart(self):
+        """
+        Redraw the Pareto chart for the chosen axes.
+        """
+        if self.pareto_plans is not None:
+            self.pareto_chart.update(self.pareto_plans, self.pareto_x_var.get(), self.pareto_y_var.get())
     
     def update_charts(self, results):
         """
@@ -195,20 +653,17 @@ class PrometheusApp:
         Args:
             results (dict): Dictionary containing simulation results
         """
-        # Clear existing charts if they exist
-        if self.energy_chart_canvas:
-            self.energy_chart_canvas.get_tk_widget().destroy()
-        
-        if self.fuel_chart_canvas:
-            self.fuel_chart_canvas.get_tk_widget().destroy()
+        # Create the charts the first time, then update them in place
+        if self.energy_chart is None:
+            from visualizer import EnergyBarChart, FuelPieChart
+            self.energy_chart = EnergyBarChart(self.energy_chart_frame)
+            self.fuel_chart = FuelPieChart(self.fuel_chart_frame)
         
-        # Create energy balance bar chart
-        energy_fig = create_energy_bar_chart(results['energy_required'], results['total_energy_output'])
-        self.energy_chart_canvas = embed_figure_in_tkinter(energy_fig, self.energy_chart_frame)
+        # Update energy balance bar chart
+        self.energy_chart.update(results['energy_required'], results['total_energy_output'])
         
-        # Create fuel distribution pie chart
-        fuel_fig = create_fuel_pie_chart(results['fuel_produced'])
-        self.fuel_chart_canvas = embed_figure_in_tkinter(fuel_fig, self.fuel_chart_frame)
+        # Update fuel distribution pie chart
+        self.fuel_chart.update(results['fuel_produced'])
     
     def update_time_chart(self, time_data):
         """
@@ -217,13 +672,12 @@ class PrometheusApp:
         Args:
             time_data (pandas.DataFrame): DataFrame with time simulation results
         """
-        # Clear existing time chart if it exists
-        if self.time_chart_canvas:
-            self.time_chart_canvas.get_tk_widget().destroy()
+        # Create the time chart the first time, then update it in place
+        if self.time_chart is None:
+            from visualizer import TimeSeriesChart
+            self.time_chart = TimeSeriesChart(self.time_chart_frame)
         
-        # Create time series chart
-        time_fig = create_time_series_chart(time_data)
-        self.time_chart_canvas = embed_figure_in_tkinter(time_fig, self.time_chart_frame)
+        self.time_chart.update(time_data)
     
     def run_sample_simulation(self):
         """
@@ -243,8 +697,12 @@ def main():
     """
     Main function to start the application.
     """
+    parser = argparse.ArgumentParser(description="PROMETHEUS Waste-to-Fuel Simulator")
+    parser.add_argument("--model", help="JSON or TOML model file, reloaded whenever it changes")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = PrometheusApp(root)
+    app = PrometheusApp(root, model_path=args.model)
     root.mainloop()
 
 
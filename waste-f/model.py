@@ -0,0 +1,322 @@
+"""
+Compiled form of the PROMETHEUS Waste-to-Fuel model tables.
+This module turns the nested lookup dicts from data.py into dense NumPy arrays
+indexed by waste type, conversion method and fuel type.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+from enum import IntEnum
+
+import numpy as np
+from config import pair_entry
+from data import WASTE_TYPES, CONVERSION_METHODS, EFFICIENCY, FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT, ENERGY_CONTENT
+
+
+def _make_enum(class_name, names):
+    """
+    Create an IntEnum whose values are the positions of the given names.
+    
+    Args:
+        class_name (str): Name of the enum class
+        names (list): Display names, e.g. "Plasma Gasification"
+    
+    Returns:
+        IntEnum: Enum with members such as PLASMA_GASIFICATION = 1
+    """
+    members = [(re.sub(r"\W+", "_", name).strip("_").upper(), i) for i, name in enumerate(names)]
+    return IntEnum(class_name, members)
+
+
+# Stable integer codes for the default tables in data.py
+WasteType = _make_enum("WasteType", WASTE_TYPES)
+ConversionMethod = _make_enum("ConversionMethod", CONVERSION_METHODS)
+FuelType = _make_enum("FuelType", list(ENERGY_CONTENT))
+
+# Arrays that make up a compiled model, in the order they are stored
+ARRAY_NAMES = ("efficiency", "energy_input", "fractions", "fuel_mask", "fuel_order", "energy_content",
+               "yield_per_kg", "energy_per_kg", "output_per_kg", "net_per_kg")
+
+
+class CompiledModel:
+    """
+    Dense array form of the conversion model tables.
+    
+    Arrays are indexed ``[waste, method]`` or ``[waste, method, fuel]`` using the
+    positions of the names in ``waste_types``, ``conversion_methods`` and
+    ``fuel_types``. The original dicts are kept in ``tables``.
+    """
+    def __init__(self, waste_types, conversion_methods, efficiency, fuel_output_fractions, energy_input, energy_content):
+        """
+        Compile the model tables.
+        
+        Args:
+            waste_types (list): Waste type names
+            conversion_methods (list): Conversion method names
+            efficiency (dict): Efficiency by waste type and method (0-1)
+            fuel_output_fractions (dict): Fuel fractions by waste type and method
+            energy_input (dict): Energy input cost (kWh/kg) by waste type and method
+            energy_content (dict): Energy content per fuel type (kWh/kg)
+        """
+        self._set_tables({
+            "WASTE_TYPES": list(waste_types),
+            "CONVERSION_METHODS": list(conversion_methods),
+            "EFFICIENCY": efficiency,
+            "FUEL_OUTPUT_FRACTIONS": fuel_output_fractions,
+            "ENERGY_INPUT": energy_input,
+            "ENERGY_CONTENT": energy_content
+        })
+        
+        n_waste, n_method, n_fuel = len(self.waste_types), len(self.conversion_methods), len(self.fuel_types)
+        max_fuels = max(len(fuel_output_fractions[w][m]) for w in self.waste_types for m in self.conversion_methods)
+        
+        self.efficiency = np.zeros((n_waste, n_method))
+        self.energy_input = np.zeros((n_waste, n_method))
+        self.fractions = np.zeros((n_waste, n_method, n_fuel))
+        self.fuel_mask = np.zeros((n_waste, n_method, n_fuel), dtype=bool)
+        # Fuel indices in the order calculate_conversion sums them; padded with n_fuel,
+        # which callers can point at an always-zero column
+        self.fuel_order = np.full((n_waste, n_method, max_fuels), n_fuel, dtype=np.intp)
+        self.energy_content = np.array([energy_content[f] for f in self.fuel_types], dtype=float)
+        
+        for i, waste_type in enumerate(self.waste_types):
+            for j, method in enumerate(self.conversion_methods):
+                self.efficiency[i, j] = efficiency[waste_type][method]
+                self.energy_input[i, j] = energy_input[waste_type][method]
+                for k, (fuel_type, fraction) in enumerate(fuel_output_fractions[waste_type][method].items()):
+                    f = self.fuel_index[fuel_type]
+                    self.fractions[i, j, f] = fraction
+                    self.fuel_mask[i, j, f] = True
+                    self.fuel_order[i, j, k] = f
+        
+        # Per-kg tables: a full conversion becomes mass * table[waste, method]
+        self.yield_per_kg = self.efficiency[:, :, None] * self.fractions
+        self.energy_per_kg = self.yield_per_kg * self.energy_content
+        self.output_per_kg = self.energy_per_kg.sum(axis=2)
+        self.net_per_kg = self.output_per_kg - self.energy_input
+        
+        for name in ARRAY_NAMES:
+            getattr(self, name).setflags(write=False)
+    
+    def _set_tables(self, tables):
+        """
+        Keep the tables and build the name lookups.
+        """
+        self.tables = tables
+        self.waste_types = list(tables["WASTE_TYPES"])
+        self.conversion_methods = list(tables["CONVERSION_METHODS"])
+        self.fuel_types = list(tables["ENERGY_CONTENT"])
+        
+        self.waste_index = {name: i for i, name in enumerate(self.waste_types)}
+        self.method_index = {name: i for i, name in enumerate(self.conversion_methods)}
+        self.fuel_index = {name: i for i, name in enumerate(self.fuel_types)}
+    
+    def arrays(self):
+        """
+        The compiled arrays by name, as stored by from_arrays.
+        
+        Returns:
+            dict: Attribute name to array, for every name in ARRAY_NAMES
+        """
+        return {name: getattr(self, name) for name in ARRAY_NAMES}
+    
+    @classmethod
+    def from_arrays(cls, tables, arrays):
+        """
+        Rebuild a model from its tables and previously compiled arrays.
+        
+        Nothing is recompiled, so this is how cached models are loaded. The
+        arrays must come from arrays() of a model compiled from the same tables.
+        
+        Args:
+            tables (dict): Tables keyed like the names in data.py
+            arrays (dict): Array for every name in ARRAY_NAMES
+        
+        Returns:
+            CompiledModel: Compiled model
+        """
+        model = cls.__new__(cls)
+        model._set_tables(tables)
+        for name in ARRAY_NAMES:
+            array = np.array(arrays[name])
+            array.setflags(write=False)
+            setattr(model, name, array)
+        return model
+    
+    @classmethod
+    def from_data(cls):
+        """
+        Compile the default tables from data.py.
+        
+        Returns:
+            CompiledModel: Compiled model
+        """
+        return cls(WASTE_TYPES, CONVERSION_METHODS, EFFICIENCY, FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT, ENERGY_CONTENT)
+    
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Compile a model from a dict of tables keyed like the names in data.py.
+        
+        Args:
+            tables (dict): WASTE_TYPES, CONVERSION_METHODS, EFFICIENCY,
+                FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT and ENERGY_CONTENT
+        
+        Returns:
+            CompiledModel: Compiled model
+        """
+        return cls(tables["WASTE_TYPES"], tables["CONVERSION_METHODS"], tables["EFFICIENCY"],
+                   tables["FUEL_OUTPUT_FRACTIONS"], tables["ENERGY_INPUT"], tables["ENERGY_CONTENT"])
+    
+    def with_overrides(self, overrides):
+        """
+        Compile a copy of this model with some table entries replaced.
+        
+        Args:
+            overrides (dict): Nested values to replace, keyed like ``tables``, e.g.
+                {"EFFICIENCY": {"Plastic": {"Pyrolysis": 0.7}}}
+        
+        Returns:
+            CompiledModel: New compiled model
+        """
+        tables = copy.deepcopy(self.tables)
+        
+        def merge(target, changes, path):
+            for key, value in changes.items():
+                if key not in target:
+                    raise ValueError(f"Unknown table entry: {'/'.join(path + [str(key)])}")
+                # A method's fuel fractions are replaced as a whole
+                replace = path[:1] == ["FUEL_OUTPUT_FRACTIONS"] and len(path) == 2
+                if isinstance(value, dict) and isinstance(target[key], dict) and not replace:
+                    merge(target[key], value, path + [key])
+                else:
+                    target[key] = copy.deepcopy(value)
+        
+        merge(tables, overrides, [])
+        return CompiledModel.from_tables(tables)
+    
+    def entry_fingerprint(self, waste_type, conversion_method):
+        """
+        Hash of every table entry that affects one (waste type, method) pair.
+        
+        Args:
+            waste_type (str): Type of waste
+            conversion_method (str): Method of conversion
+        
+        Returns:
+            str: Hex digest that changes whenever any of those entries changes
+        """
+        entry = pair_entry(self.tables, waste_type, conversion_method)
+        return hashlib.sha256(json.dumps(entry).encode()).hexdigest()
+    
+    def encode_waste(self, values):
+        """
+        Convert waste type names or codes into integer codes.
+        
+        Args:
+            values (array-like): Names (str) or codes (int)
+        
+        Returns:
+            numpy.ndarray: Integer codes into waste_types
+        """
+        return _encode(values, self.waste_index, "waste type")
+    
+    def encode_method(self, values):
+        """
+        Convert conversion method names or codes into integer codes.
+        
+        Args:
+            values (array-like): Names (str) or codes (int)
+        
+        Returns:
+            numpy.ndarray: Integer codes into conversion_methods
+        """
+        return _encode(values, self.method_index, "conversion method")
+    
+    def quick_balance(self, waste_codes, masses, method_codes):
+        """
+        Compute energy figures with one multiply per quantity using the per-kg tables.
+        
+        Results agree with calculate_conversion up to floating-point rounding.
+        
+        Args:
+            waste_codes (array-like): Integer waste codes
+            masses (array-like): Masses of waste in kg
+            method_codes (array-like): Integer method codes
+        
+        Returns:
+            tuple: (energy_required, total_energy_output, net_energy_balance) arrays
+        """
+        masses = np.asarray(masses, dtype=float)
+        energy_required = masses * self.energy_input[waste_codes, method_codes]
+        energy_output = masses * self.output_per_kg[waste_codes, method_codes]
+        return energy_required, energy_output, energy_output - energy_required
+
+
+def _encode(values, index, label):
+    """
+    Convert an array of names or integer codes into integer codes.
+    
+    Args:
+        values (array-like): Names (str) or codes (int)
+        index (dict): Mapping of valid names to codes
+        label (str): Description used in error messages
+    
+    Returns:
+        numpy.ndarray: Integer codes
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        if values.size and (values.min() < 0 or values.max() >= len(index)):
+            raise ValueError(f"{label} codes must be between 0 and {len(index) - 1}")
+        return values.astype(np.intp)
+    
+    # Look up each distinct name once, then gather
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    unknown = [u for u in uniques if u not in index]
+    if unknown:
+        raise ValueError(f"Unknown {label}: {', '.join(unknown)}")
+    lookup = np.array([index[u] for u in uniques], dtype=np.intp)
+    return lookup[inverse].reshape(values.shape)
+
+
+_DEFAULT_MODEL = None
+
+# Environment variable naming a JSON or TOML model file to use instead of data.py
+MODEL_ENV = "PROMETHEUS_MODEL"
+
+
+def get_model():
+    """
+    Return the compiled default model, building it on first use.
+    
+    If the PROMETHEUS_MODEL environment variable names a model file, the
+    tables are loaded from it (see config.load_model) instead of data.py.
+    
+    Returns:
+        CompiledModel: Default model
+    """
+    global _DEFAULT_MODEL
+    if _DEFAULT_MODEL is None:
+        path = os.environ.get(MODEL_ENV)
+        if path:
+            from config import load_model
+            _DEFAULT_MODEL = load_model(path)
+        else:
+            _DEFAULT_MODEL = CompiledModel.from_data()
+    return _DEFAULT_MODEL
+
+
+def set_model(model):
+    """
+    Replace the default model returned by get_model.
+    
+    Args:
+        model (CompiledModel or None): New default model, or None to go back to
+            data.py (or PROMETHEUS_MODEL) on the next get_model call
+    """
+    global _DEFAULT_MODEL
+    _DEFAULT_MODEL = model
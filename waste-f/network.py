@@ -0,0 +1,406 @@
+"""
+Multi-site network simulation for the PROMETHEUS Waste-to-Fuel Simulator.
+This module models many collection sites (sources) feeding several conversion
+plants over transport links. Every day each source's waste is routed to the
+plants it is linked to, paying a transport energy cost per kg and km, and
+each plant converts what it receives with its conversion method.
+
+Sites that are not linked, directly or through shared plants, cannot affect
+each other, so the network is split into its connected parts and those are
+simulated in parallel, a range of days at a time.
+
+Example:
+    sources = [{"name": "North", "waste_type": "Plastic", "daily_mass": 500},
+               {"name": "South", "waste_type": "Organic", "daily_mass": 800}]
+    plants = [{"name": "Plant A", "conversion_method": "Pyrolysis", "capacity": 1000},
+              {"name": "Plant B", "conversion_method": "Anaerobic Digestion"}]
+    edges = [("North", "Plant A", 12), ("South", "Plant A", 30), ("South", "Plant B", 8)]
+    result = simulate_network(sources, plants, edges, days=3650, seed=42)
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from converter import calculate_conversion_batch
+from model import get_model
+
+# Energy to move 1 kg of waste 1 km by road (kWh), about 1 MJ per tonne-km for a diesel truck
+DEFAULT_TRANSPORT_COST = 0.0003
+
+# Settings used for any key a source, plant or edge leaves out
+SOURCE_DEFAULTS = {
+    "name": None,
+    "variation": 0.1                   # daily waste within ±variation of daily_mass
+}
+PLANT_DEFAULTS = {
+    "name": None,
+    "capacity": math.inf               # kg of waste converted per day
+}
+EDGE_DEFAULTS = {
+    "transport_cost": None             # kWh per kg·km, defaults to the network-wide cost
+}
+
+SOURCE_KEYS = ["waste_type", "daily_mass"]
+PLANT_KEYS = ["conversion_method"]
+EDGE_KEYS = ["source", "plant", "distance"]
+
+DAILY_COLUMNS = ["waste_generated", "waste_processed", "unrouted", "energy_required", "transport_energy",
+                 "energy_output"]
+
+
+def _fill(items, required, defaults, label):
+    """
+    Fill in defaults and check the keys of a list of source, plant or edge dicts.
+    
+    Edges may also be given as (source, plant, distance) tuples.
+    
+    Returns:
+        list: Complete dicts
+    """
+    filled = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            item = dict(zip(required, item))
+        missing = [key for key in required if key not in item]
+        if missing:
+            raise ValueError(f"{label} {i} is missing: {', '.join(missing)}")
+        unknown = [key for key in item if key not in defaults and key not in required]
+        if unknown:
+            raise ValueError(f"{label} {i} has unknown settings: {', '.join(unknown)}")
+        filled.append({**defaults, **item})
+        if "name" in defaults and filled[-1]["name"] is None:
+            filled[-1]["name"] = f"{label} {i + 1}"
+    
+    if "name" in defaults:
+        names = [item["name"] for item in filled]
+        if len(set(names)) != len(names):
+            raise ValueError(f"{label} names must be unique.")
+    return filled
+
+
+def connected_components(n_nodes, links):
+    """
+    Label the connected parts of a graph.
+    
+    Args:
+        n_nodes (int): Number of nodes
+        links (list): (node, node) pairs
+    
+    Returns:
+        numpy.ndarray: Component number of every node, numbered in order of
+            each component's first node
+    """
+    parent = list(range(n_nodes))
+    
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+    
+    for a, b in links:
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    
+    roots = np.array([root(node) for node in range(n_nodes)], dtype=np.intp)
+    _, labels = np.unique(roots, return_inverse=True)
+    return labels.reshape(-1)
+
+
+def _route(supply, capacity, edge_source, edge_plant):
+    """
+    Greedy routing of each day's waste over edges already sorted best first.
+    
+    Every edge in turn takes as much as its source has left and its plant can
+    still accept that day. The loop is over edges, with all days at once.
+    
+    Args:
+        supply (numpy.ndarray): Waste per day and source, shape (days, sources); used up in place
+        capacity (numpy.ndarray): Plant capacity per day, shape (plants,)
+        edge_source (numpy.ndarray): Source of each edge
+        edge_plant (numpy.ndarray): Plant of each edge
+    
+    Returns:
+        numpy.ndarray: Mass sent over each edge per day, shape (days, edges)
+    """
+    days = len(supply)
+    room = np.broadcast_to(capacity, (days, len(capacity))).copy()
+    flow = np.empty((days, len(edge_source)))
+    for e, (s, p) in enumerate(zip(edge_source, edge_plant)):
+        np.minimum(supply[:, s], room[:, p], out=flow[:, e])
+        supply[:, s] -= flow[:, e]
+        room[:, p] -= flow[:, e]
+    return flow
+
+
+def _simulate_part(task):
+    """
+    Simulate one connected part of the network over a range of days.
+    
+    Runs in worker processes, so it receives plain arrays and returns totals
+    per node and edge and per day, never flows per day and edge.
+    
+    Args:
+        task (dict): Settings of the part, its range of days and seed sequence
+    
+    Returns:
+        dict: Daily totals of the part and totals per source, plant and edge
+    """
+    model = task["model"]
+    start, size = task["start"], task["size"]
+    rng = np.random.default_rng(task["seed_sequence"])
+    
+    # Each source's waste per day, from its own mass model or with ±variation
+    supply = np.empty((size, len(task["daily_mass"])))
+    for s, (daily_mass, variation) in enumerate(zip(task["daily_mass"], task["variation"])):
+        if hasattr(daily_mass, "generate"):
+            supply[:, s] = daily_mass.generate(start, size)
+        else:
+            supply[:, s] = daily_mass * rng.uniform(1 - variation, 1 + variation, size)
+    generated = supply.sum(axis=1)
+    source_generated = supply.sum(axis=0)
+    
+    flow = _route(supply, task["capacity"], task["edge_source"], task["edge_plant"])
+    transport = flow * task["transport_per_kg"]
+    
+    # Mass each plant receives of each waste type per day, converted with calculate_conversion_batch
+    n_inflows = len(task["inflow_waste"])
+    edge_to_inflow = np.zeros((len(task["edge_inflow"]), n_inflows))
+    edge_to_inflow[np.arange(len(task["edge_inflow"])), task["edge_inflow"]] = 1.0
+    inflow = flow @ edge_to_inflow
+    results = calculate_conversion_batch(np.tile(task["inflow_waste"], size), inflow.ravel(),
+                                         np.tile(task["inflow_method"], size), model=model)
+    required = results["energy_required"].reshape(size, n_inflows)
+    output = results["total_energy_output"].reshape(size, n_inflows)
+    fuel = np.stack([results["fuel_produced"][f].reshape(size, n_inflows).sum(axis=0) for f in model.fuel_types],
+                    axis=1)
+    
+    n_plants = len(task["capacity"])
+    plant_totals = {}
+    for name, values in (("processed_mass", inflow.sum(axis=0)), ("energy_required", required.sum(axis=0)),
+                         ("energy_output", output.sum(axis=0))):
+        plant_totals[name] = np.bincount(task["inflow_plant"], weights=values, minlength=n_plants)
+    plant_totals["fuel_produced"] = np.zeros((n_plants, len(model.fuel_types)))
+    np.add.at(plant_totals["fuel_produced"], task["inflow_plant"], fuel)
+    
+    return {
+        "daily": {
+            "waste_generated": generated,
+            "waste_processed": inflow.sum(axis=1),
+            "unrouted": supply.sum(axis=1),
+            "energy_required": required.sum(axis=1),
+            "transport_energy": transport.sum(axis=1),
+            "energy_output": output.sum(axis=1)
+        },
+        "source_generated": source_generated,
+        "source_unrouted": supply.sum(axis=0),
+        "edge_flow": flow.sum(axis=0),
+        "edge_transport": transport.sum(axis=0),
+        "plants": plant_totals
+    }
+
+
+def simulate_network(sources, plants, edges, days=365, seed=None, transport_cost=DEFAULT_TRANSPORT_COST,
+                     skip_unprofitable=False, chunk_days=1000, workers=None, model=None):
+    """
+    Simulate waste collection, transport and conversion across a network of sites.
+    
+    Edges are ranked by net energy per kg delivered: the plant's net energy
+    for the source's waste type less the transport energy. Each day, waste is
+    sent over the best edges first until the sources are empty or the plants
+    are full, and whatever no plant can take is reported as unrouted. There is
+    no storage between days, so days are independent and the network is
+    simulated in parts (each connected part, a chunk of days at a time) across
+    worker processes.
+    
+    Each part has its own child of the seed, so results do not depend on the
+    number of workers, only on the seed and chunk_days.
+    
+    Args:
+        sources (list): Source dicts with ``waste_type`` and ``daily_mass``
+            (kg/day, or a generators.DailyMassModel), plus any settings in SOURCE_DEFAULTS
+        plants (list): Plant dicts with ``conversion_method``, plus any settings in PLANT_DEFAULTS
+        edges (list): Edge dicts with ``source`` and ``plant`` names and ``distance``
+            (km), or (source, plant, distance) tuples. An edge dict may set its own
+            ``transport_cost``.
+        days (int): Number of days to simulate
+        seed (int or None): Seed for the daily variation
+        transport_cost (float): Energy to move 1 kg over 1 km (kWh)
+        skip_unprofitable (bool): Leave waste unrouted rather than send it over
+            an edge that loses energy
+        chunk_days (int): Days simulated per task
+        workers (int or None): Worker processes, defaults to the number of CPUs.
+            Use 1 to run in the current process.
+        model (CompiledModel): Compiled tables to use, defaults to get_model()
+    
+    Returns:
+        dict: ``daily`` (DataFrame of network totals per day), ``sources``,
+            ``plants`` and ``edges`` (DataFrames of totals over the run) and
+            ``totals`` (network-wide energy balance)
+    """
+    import pandas as pd
+    if days <= 0:
+        raise ValueError("Days must be greater than zero.")
+    if chunk_days <= 0:
+        raise ValueError("chunk_days must be greater than zero.")
+    model = model or get_model()
+    sources = _fill(sources, SOURCE_KEYS, SOURCE_DEFAULTS, "Source")
+    plants = _fill(plants, PLANT_KEYS, PLANT_DEFAULTS, "Plant")
+    edges = _fill(edges, EDGE_KEYS, EDGE_DEFAULTS, "Edge")
+    if not sources or not plants:
+        raise ValueError("At least one source and one plant are required.")
+    
+    source_index = {source["name"]: i for i, source in enumerate(sources)}
+    plant_index = {plant["name"]: i for i, plant in enumerate(plants)}
+    source_waste = model.encode_waste([source["waste_type"] for source in sources])
+    plant_method = model.encode_method([plant["conversion_method"] for plant in plants])
+    capacity = np.array([plant["capacity"] for plant in plants], dtype=float)
+    if (capacity < 0).any():
+        raise ValueError("Plant capacity cannot be negative.")
+    for source in sources:
+        if not hasattr(source["daily_mass"], "generate") and source["daily_mass"] < 0:
+            raise ValueError(f"Daily mass of {source['name']} cannot be negative.")
+    
+    edge_source = np.empty(len(edges), dtype=np.intp)
+    edge_plant = np.empty(len(edges), dtype=np.intp)
+    distance = np.empty(len(edges))
+    edge_cost = np.empty(len(edges))
+    for e, edge in enumerate(edges):
+        if edge["source"] not in source_index:
+            raise ValueError(f"Edge {e} starts at an unknown source: {edge['source']}")
+        if edge["plant"] not in plant_index:
+            raise ValueError(f"Edge {e} ends at an unknown plant: {edge['plant']}")
+        edge_source[e] = source_index[edge["source"]]
+        edge_plant[e] = plant_index[edge["plant"]]
+        distance[e] = edge["distance"]
+        edge_cost[e] = transport_cost if edge["transport_cost"] is None else edge["transport_cost"]
+    if (distance < 0).any() or (edge_cost < 0).any():
+        raise ValueError("Distances and transport costs cannot be negative.")
+    
+    # Net energy per kg delivered over each edge, which sets the routing order
+    transport_per_kg = distance * edge_cost
+    edge_value = model.net_per_kg[source_waste[edge_source], plant_method[edge_plant]] - transport_per_kg
+    usable = edge_value > 0 if skip_unprofitable else np.ones(len(edges), dtype=bool)
+    
+    # Connected parts of the network; sources are nodes 0..S-1 and plants S..S+P-1
+    n_sources = len(sources)
+    labels = connected_components(n_sources + len(plants),
+                                  zip(edge_source[usable], edge_plant[usable] + n_sources))
+    
+    n_chunks = math.ceil(days / chunk_days)
+    entropy = np.random.SeedSequence(seed).entropy
+    parts = []
+    tasks = []
+    for part in range(labels.max() + 1):
+        part_sources = np.flatnonzero(labels[:n_sources] == part)
+        part_plants = np.flatnonzero(labels[n_sources:] == part)
+        if not len(part_sources):
+            continue
+        
+        # Edges of this part, best first (ties keep the order they were given in)
+        part_edges = np.flatnonzero(usable & (labels[edge_source] == part))
+        part_edges = part_edges[np.argsort(-edge_value[part_edges], kind="stable")]
+        local_source = np.searchsorted(part_sources, edge_source[part_edges])
+        local_plant = np.searchsorted(part_plants, edge_plant[part_edges])
+        
+        # Each (plant, waste type) pair that receives waste is converted as one stream
+        pairs = local_plant * len(model.waste_types) + source_waste[edge_source[part_edges]]
+        unique_pairs, edge_inflow = np.unique(pairs, return_inverse=True)
+        inflow_plant = unique_pairs // len(model.waste_types)
+        
+        parts.append((part_sources, part_plants, part_edges))
+        settings = {
+            "model": model,
+            "daily_mass": [sources[s]["daily_mass"] for s in part_sources],
+            "variation": [sources[s]["variation"] for s in part_sources],
+            "capacity": capacity[part_plants],
+            "edge_source": local_source,
+            "edge_plant": local_plant,
+            "transport_per_kg": transport_per_kg[part_edges],
+            "edge_inflow": edge_inflow.reshape(-1),
+            "inflow_plant": inflow_plant,
+            "inflow_waste": unique_pairs % len(model.waste_types),
+            "inflow_method": plant_method[part_plants][inflow_plant]
+        }
+        for chunk in range(n_chunks):
+            start = chunk * chunk_days
+            tasks.append({**settings, "part": len(parts) - 1, "start": start, "size": min(chunk_days, days - start),
+                          "seed_sequence": np.random.SeedSequence(entropy, spawn_key=(part, chunk))})
+    
+    daily = {column: np.zeros(days) for column in DAILY_COLUMNS}
+    source_generated = np.zeros(n_sources)
+    source_unrouted = np.zeros(n_sources)
+    edge_flow = np.zeros(len(edges))
+    edge_transport = np.zeros(len(edges))
+    plant_totals = {name: np.zeros(len(plants)) for name in ("processed_mass", "energy_required", "energy_output")}
+    plant_totals["fuel_produced"] = np.zeros((len(plants), len(model.fuel_types)))
+    
+    def merge(results):
+        for task, result in zip(tasks, results):
+            part_sources, part_plants, part_edges = parts[task["part"]]
+            days_slice = slice(task["start"], task["start"] + task["size"])
+            for column in DAILY_COLUMNS:
+                daily[column][days_slice] += result["daily"][column]
+            source_generated[part_sources] += result["source_generated"]
+            source_unrouted[part_sources] += result["source_unrouted"]
+            edge_flow[part_edges] += result["edge_flow"]
+            edge_transport[part_edges] += result["edge_transport"]
+            for name, values in result["plants"].items():
+                plant_totals[name][part_plants] += values
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        merge(map(_simulate_part, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            merge(executor.map(_simulate_part, tasks))
+    
+    daily["net_balance"] = daily["energy_output"] - daily["energy_required"] - daily["transport_energy"]
+    daily_frame = pd.DataFrame({"day": np.arange(1, days + 1), **daily})
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.where(capacity > 0, plant_totals["processed_mass"] / (capacity * days), 0.0)
+    plant_frame = pd.DataFrame({
+        "plant": [plant["name"] for plant in plants],
+        "conversion_method": [plant["conversion_method"] for plant in plants],
+        "capacity": capacity,
+        "processed_mass": plant_totals["processed_mass"],
+        "utilization": utilization,
+        "energy_required": plant_totals["energy_required"],
+        "energy_output": plant_totals["energy_output"],
+        "net_balance": plant_totals["energy_output"] - plant_totals["energy_required"],
+        **{fuel: plant_totals["fuel_produced"][:, f] for f, fuel in enumerate(model.fuel_types)}
+    })
+    
+    # Transport is paid by the source that sends the waste
+    source_transport = np.bincount(edge_source, weights=edge_transport, minlength=n_sources)
+    source_frame = pd.DataFrame({
+        "source": [source["name"] for source in sources],
+        "waste_type": [source["waste_type"] for source in sources],
+        "generated": source_generated,
+        "routed": source_generated - source_unrouted,
+        "unrouted": source_unrouted,
+        "transport_energy": source_transport
+    })
+    
+    edge_frame = pd.DataFrame({
+        "source": [edge["source"] for edge in edges],
+        "plant": [edge["plant"] for edge in edges],
+        "distance": distance,
+        "net_per_kg": edge_value,
+        "flow": edge_flow,
+        "transport_energy": edge_transport
+    })
+    
+    totals = {column: float(values.sum()) for column, values in daily.items()}
+    totals["parts"] = len(parts)
+    return {
+        "daily": daily_frame,
+        "sources": source_frame,
+        "plants": plant_frame,
+        "edges": edge_frame,
+        "totals": totals
+    }
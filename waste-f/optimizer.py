@@ -0,0 +1,147 @@
+"""
+Allocation of waste streams to conversion methods for the PROMETHEUS Waste-to-Fuel Simulator.
+This module chooses how much of each waste stream to send to each conversion
+method so that total net energy (or the output of one fuel, such as recovered
+metal) is as large as possible within plant capacity and energy budget limits.
+"""
+
+import math
+
+import numpy as np
+from model import get_model
+
+# Objectives besides the fuel names in the model
+OBJECTIVES = ["net_energy", "energy_output"]
+
+
+def _require_linprog():
+    """
+    Import the linear programming solver.
+    """
+    try:
+        from scipy.optimize import linprog
+    except ImportError as e:
+        raise ImportError("The allocation optimizer requires scipy: pip install scipy") from e
+    return linprog
+
+
+def _objective_per_kg(objective, model):
+    """
+    Objective value per kg of waste for every (waste type, method) pair.
+    
+    Args:
+        objective (str): "net_energy", "energy_output" or a fuel name such as "metal"
+        model (CompiledModel): Compiled tables
+    
+    Returns:
+        numpy.ndarray: Array with shape (n_waste_types, n_methods)
+    """
+    if objective == "net_energy":
+        return model.net_per_kg
+    if objective == "energy_output":
+        return model.output_per_kg
+    if objective in model.fuel_index:
+        return model.yield_per_kg[:, :, model.fuel_index[objective]]
+    choices = OBJECTIVES + model.fuel_types
+    raise ValueError(f"Unknown objective: {objective}. Choose from {', '.join(choices)}.")
+
+
+def optimize_allocation(waste_types, masses, capacities=None, objective="net_energy", energy_budget=None,
+                        process_all=False, model=None):
+    """
+    Assign waste streams, or fractions of them, to conversion methods.
+    
+    Every kg of a given waste type behaves the same under the model, so the
+    problem is solved as a small linear program over (waste type, method)
+    totals and then split back over the streams in proportion to their mass.
+    Its size does not depend on the number of streams.
+    
+    Args:
+        waste_types (array-like): Waste type name or code of each stream
+        masses (array-like): Mass of each stream in kg
+        capacities (dict or None): Maximum kg per conversion method; methods that
+            are left out (or None) have no limit
+        objective (str): "net_energy", "energy_output" or a fuel name such as
+            "metal" to maximize the mass of that fuel. Ties are broken by net energy.
+        energy_budget (float or None): Maximum total energy required in kWh
+        process_all (bool): Require every stream to be fully processed. Otherwise
+            waste that would lower the objective, or doesn't fit, is left unprocessed.
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: Allocation in kg per stream and method, totals and the objective value
+    """
+    linprog = _require_linprog()
+    model = model or get_model()
+    waste_codes = model.encode_waste(waste_types).ravel()
+    masses = np.broadcast_to(np.asarray(masses, dtype=float), waste_codes.shape)
+    if (masses < 0).any():
+        raise ValueError("Stream masses cannot be negative.")
+    capacities = capacities or {}
+    unknown = [name for name in capacities if name not in model.method_index]
+    if unknown:
+        raise ValueError(f"Unknown conversion method: {', '.join(unknown)}")
+    
+    n_waste, n_method = len(model.waste_types), len(model.conversion_methods)
+    waste_totals = np.bincount(waste_codes, weights=masses, minlength=n_waste)
+    gain = _objective_per_kg(objective, model)
+    
+    # Variables are the kg of waste type w sent to method m, flattened as w * n_method + m
+    n_vars = n_waste * n_method
+    supply = np.kron(np.eye(n_waste), np.ones(n_method))
+    rows, bounds = [], []
+    for j, method in enumerate(model.conversion_methods):
+        limit = capacities.get(method)
+        if limit is not None and math.isfinite(limit):
+            row = np.zeros(n_vars)
+            row[j::n_method] = 1
+            rows.append(row)
+            bounds.append(limit)
+    if energy_budget is not None:
+        rows.append(model.energy_input.ravel())
+        bounds.append(energy_budget)
+    
+    if not process_all:
+        rows.extend(supply)
+        bounds.extend(waste_totals)
+    
+    def solve(costs, rows, bounds):
+        return linprog(costs, A_ub=np.array(rows) if rows else None, b_ub=np.array(bounds) if rows else None,
+                       A_eq=supply if process_all else None, b_eq=waste_totals if process_all else None,
+                       bounds=(0, None), method="highs")
+    
+    result = solve(-gain.ravel(), rows, bounds)
+    if result.status != 0:
+        raise ValueError(f"No feasible allocation: {result.message}")
+    
+    # Among equally good allocations, prefer the one with the best net energy
+    if objective != "net_energy":
+        best = -result.fun
+        tie_bound = -best + 1e-9 * max(abs(best), 1.0)
+        tie_result = solve(-model.net_per_kg.ravel(), rows + [-gain.ravel()], bounds + [tie_bound])
+        if tie_result.status == 0:
+            result = tie_result
+    
+    totals = np.clip(result.x.reshape(n_waste, n_method), 0, None)
+    
+    # Split each waste type's totals over its streams in proportion to stream mass
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(waste_totals[:, None] > 0, totals / waste_totals[:, None], 0.0)
+    allocation = masses[:, None] * share[waste_codes]
+    
+    energy_required = float((totals * model.energy_input).sum())
+    energy_output = float((totals * model.output_per_kg).sum())
+    return {
+        "allocation": allocation,
+        "conversion_methods": list(model.conversion_methods),
+        "objective": objective,
+        "objective_value": float((totals * gain).sum()),
+        "type_allocation": {w: dict(zip(model.conversion_methods, totals[i].tolist()))
+                            for i, w in enumerate(model.waste_types)},
+        "method_load": dict(zip(model.conversion_methods, totals.sum(axis=0).tolist())),
+        "unprocessed": masses - allocation.sum(axis=1),
+        "energy_required": energy_required,
+        "energy_output": energy_output,
+        "net_energy_balance": energy_output - energy_required,
+        "fuel_produced": dict(zip(model.fuel_types, np.einsum("wm,wmf->f", totals, model.yield_per_kg).tolist()))
+    }
@@ -0,0 +1,248 @@
+"""
+Multi-objective comparison of conversion plans for the PROMETHEUS Waste-to-Fuel Simulator.
+This module evaluates every combination of waste type (or mix of waste
+types), mass and conversion method on several objectives at once, such as
+net energy, recovered metal and compost, and finds the Pareto front: the
+plans that no other plan beats on every objective.
+"""
+
+import itertools
+
+import numpy as np
+from converter import calculate_blend_batch
+from model import get_model
+
+# Objectives besides the fuel names in the model (fuel output is maximized)
+OBJECTIVES = {
+    "net_energy": "max",
+    "energy_output": "max",
+    "energy_required": "min",
+    "conversion_efficiency": "max"
+}
+
+# Comparisons made at a time by the k-objective sort, to bound memory
+BLOCK_SIZE = 1024
+COMPARE_LIMIT = 1 << 22
+
+
+def _front_2d(points):
+    """
+    Non-dominated mask for two objectives, larger is better.
+    
+    After sorting by the first objective (descending, ties by the second), a
+    point is dominated exactly when a point before its run of identical points
+    has at least its second objective, so one running maximum finds the front
+    in O(n log n).
+    """
+    order = np.lexsort((-points[:, 1], -points[:, 0]))
+    ordered = points[order]
+    second = ordered[:, 1]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], second[:-1])))
+    
+    # Compare each point with what came before the first of its identical copies
+    first_copy = np.ones(len(ordered), dtype=bool)
+    first_copy[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    run_start = np.maximum.accumulate(np.where(first_copy, np.arange(len(ordered)), 0))
+    
+    mask = np.zeros(len(points), dtype=bool)
+    mask[order] = second > best_before[run_start]
+    return mask
+
+
+def _dominated_by(points, front):
+    """
+    Mask of the points that some row of front dominates, in slices of bounded size.
+    """
+    result = np.zeros(len(points), dtype=bool)
+    step = max(1, COMPARE_LIMIT // max(len(front), 1))
+    for start in range(0, len(points), step):
+        part = points[start:start + step]
+        at_least = np.ones((len(part), len(front)), dtype=bool)
+        better = np.zeros((len(part), len(front)), dtype=bool)
+        for c in range(points.shape[1]):
+            at_least &= front[None, :, c] >= part[:, None, c]
+            better |= front[None, :, c] > part[:, None, c]
+        result[start:start + step] = (at_least & better).any(axis=1)
+    return result
+
+
+def _front_nd(points):
+    """
+    Non-dominated mask for any number of objectives, larger is better.
+    
+    Points are taken in order of decreasing sum (ties broken by the objectives
+    in turn), so a point can only be dominated by one before it. The front of
+    the next block of points is found among themselves, and every later point
+    that it dominates is dropped at once. Most points fall to the first few
+    blocks, so the cost stays far below comparing every pair.
+    """
+    order = np.lexsort([-points[:, c] for c in reversed(range(points.shape[1]))] + [-points.sum(axis=1)])
+    remaining = order
+    front_index = []
+    while len(remaining):
+        head, remaining = remaining[:BLOCK_SIZE], remaining[BLOCK_SIZE:]
+        head = head[~_dominated_by(points[head], points[head])]
+        front_index.append(head)
+        if len(remaining):
+            remaining = remaining[~_dominated_by(points[remaining], points[head])]
+    
+    mask = np.zeros(len(points), dtype=bool)
+    mask[np.concatenate(front_index)] = True
+    return mask
+
+
+def non_dominated(values, maximize=True):
+    """
+    Find the rows that no other row beats on every objective.
+    
+    A row dominates another when it is at least as good on every objective and
+    better on at least one. Identical rows do not dominate each other, so they
+    are either all on the front or all off it.
+    
+    Args:
+        values (array-like): Objective values, shape (n, objectives)
+        maximize (bool or list): Whether larger is better, for all objectives or per objective
+    
+    Returns:
+        numpy.ndarray: Boolean mask, True for rows on the Pareto front
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("Values must have one row per candidate and one column per objective.")
+    if np.isnan(values).any():
+        raise ValueError("Values cannot be NaN.")
+    n, k = values.shape
+    if n == 0 or k == 0:
+        return np.ones(n, dtype=bool)
+    
+    sign = np.where(np.broadcast_to(np.asarray(maximize, dtype=bool), k), 1.0, -1.0)
+    points = values * sign
+    if k == 1:
+        return points[:, 0] == points[:, 0].max()
+    if k == 2:
+        return _front_2d(points)
+    return _front_nd(points)
+
+
+def mix_compositions(n_types, step):
+    """
+    Every mix of n_types waste types in multiples of step.
+    
+    Args:
+        n_types (int): Number of waste types
+        step (float): Fraction step, e.g. 0.1 for 0%, 10%, ..., 100%
+    
+    Returns:
+        numpy.ndarray: Fractions, shape (mixes, n_types), each row adding up to 1
+    """
+    parts = round(1 / step)
+    if parts < 1 or not np.isclose(parts * step, 1.0):
+        raise ValueError("Step must divide 1 into a whole number of parts, e.g. 0.1 or 0.25.")
+    # Stars and bars: the positions of n_types - 1 dividers among parts + n_types - 1 slots
+    dividers = np.array(list(itertools.combinations(range(parts + n_types - 1), n_types - 1)), dtype=np.int64)
+    dividers = dividers.reshape(-1, n_types - 1)
+    edges = np.concatenate([np.full((len(dividers), 1), -1), dividers,
+                            np.full((len(dividers), 1), parts + n_types - 1)], axis=1)
+    return (np.diff(edges, axis=1) - 1) / parts
+
+
+def _plan_label(composition, waste_types):
+    """
+    Readable name of a composition, e.g. "Plastic" or "60% Plastic + 40% Organic".
+    """
+    present = [(fraction, name) for fraction, name in zip(composition, waste_types) if fraction > 0]
+    if len(present) == 1:
+        return present[0][1]
+    return " + ".join(f"{fraction * 100:.4g}% {name}" for fraction, name in present)
+
+
+def explore(objectives=("net_energy", "metal", "compost"), waste_types=None, conversion_methods=None,
+            masses=(100.0,), mix_step=None, model=None):
+    """
+    Evaluate every plan and mark the Pareto front.
+    
+    A plan is a waste type (or mix), a mass and a conversion method. Results
+    per kg are computed once per composition and method and then scaled by
+    each mass, so 10^6 plans take about a second.
+    
+    Args:
+        objectives (list): Names from OBJECTIVES or fuel names such as "metal"
+        waste_types (list or None): Waste types to include, defaults to all
+        conversion_methods (list or None): Methods to include, defaults to all
+        masses (list): Masses in kg
+        mix_step (float or None): Also include every mix of the waste types in
+            steps of this fraction (e.g. 0.1). None compares pure waste types only.
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        pandas.DataFrame: One row per plan with ``plan``, ``mass``,
+            ``conversion_method``, a column per objective and ``on_front``.
+            ``attrs["objectives"]`` maps each objective to "max" or "min".
+    """
+    import pandas as pd
+    model = model or get_model()
+    objectives = list(objectives)
+    if not objectives:
+        raise ValueError("Choose at least one objective.")
+    senses = {}
+    for name in objectives:
+        if name in OBJECTIVES:
+            senses[name] = OBJECTIVES[name]
+        elif name in model.fuel_index:
+            senses[name] = "max"
+        else:
+            choices = list(OBJECTIVES) + model.fuel_types
+            raise ValueError(f"Unknown objective: {name}. Choose from {', '.join(choices)}.")
+    
+    waste_types = list(waste_types or model.waste_types)
+    conversion_methods = list(conversion_methods or model.conversion_methods)
+    masses = np.asarray(masses, dtype=float)
+    if masses.ndim != 1 or len(masses) == 0 or (masses <= 0).any():
+        raise ValueError("Masses must be a list of positive values.")
+    
+    unknown = [w for w in waste_types if w not in model.waste_index]
+    if unknown:
+        raise ValueError(f"Unknown waste type: {', '.join(map(str, unknown))}")
+    
+    # Compositions over the chosen waste types, as fractions of every model waste type
+    columns = [model.waste_index[w] for w in waste_types]
+    if mix_step:
+        chosen = mix_compositions(len(columns), mix_step)
+    else:
+        chosen = np.eye(len(columns))
+    compositions = np.zeros((len(chosen), len(model.waste_types)))
+    compositions[:, columns] = chosen
+    labels = [_plan_label(c, model.waste_types) for c in compositions]
+    
+    # Per-kg results for every composition and method
+    n_comp, n_method = len(compositions), len(conversion_methods)
+    per_kg = calculate_blend_batch(np.repeat(compositions, n_method, axis=0), 1.0,
+                                   np.tile(model.encode_method(conversion_methods), n_comp), model=model)
+    per_kg_values = {
+        "net_energy": per_kg["net_energy_balance"],
+        "energy_output": per_kg["total_energy_output"],
+        "energy_required": per_kg["energy_required"],
+        **per_kg["fuel_produced"]
+    }
+    
+    # Every (composition, method) pair at every mass
+    n_masses = len(masses)
+    pair = np.repeat(np.arange(n_comp * n_method), n_masses)
+    mass = np.tile(masses, n_comp * n_method)
+    data = {
+        "plan": pd.Categorical.from_codes(pair // n_method, categories=labels),
+        "mass": mass,
+        "conversion_method": pd.Categorical.from_codes(model.encode_method(conversion_methods)[pair % n_method],
+                                                       categories=model.conversion_methods)
+    }
+    for name in objectives:
+        if name == "conversion_efficiency":
+            data[name] = per_kg["conversion_efficiency"][pair]
+        else:
+            data[name] = per_kg_values[name][pair] * mass
+    
+    values = np.column_stack([data[name] for name in objectives])
+    data["on_front"] = non_dominated(values, [senses[name] == "max" for name in objectives])
+    frame = pd.DataFrame(data)
+    frame.attrs["objectives"] = senses
+    return frame
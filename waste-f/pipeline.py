@@ -0,0 +1,336 @@
+"""
+Streaming manifest ingestion for the PROMETHEUS Waste-to-Fuel Simulator.
+This module reads waste manifests (CSV or Parquet) in chunks, validates and
+converts each chunk, and writes the results incrementally (CSV, Parquet or
+JSON Lines), so memory use does not grow with the size of the manifest.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from converter import calculate_conversion_batch
+from model import get_model
+
+INPUT_FORMATS = ["csv", "parquet"]
+OUTPUT_FORMATS = ["csv", "parquet", "jsonl"]
+
+# Manifest columns read by default
+DEFAULT_COLUMNS = {"waste_type": "waste_type", "mass": "mass", "conversion_method": "conversion_method"}
+
+
+def detect_format(path, fmt, choices):
+    """
+    Work out a file format from an explicit value or the file extension.
+    
+    Args:
+        path (str): File path
+        fmt (str or None): Explicit format
+        choices (list): Supported formats
+    
+    Returns:
+        str: File format
+    """
+    if fmt is None:
+        extension = os.path.splitext(str(path))[1].lower().lstrip(".")
+        fmt = {"pq": "parquet", "ndjson": "jsonl", "json": "jsonl"}.get(extension, extension)
+    if fmt not in choices:
+        raise ValueError(f"Unsupported format: {fmt}. Choose from {', '.join(choices)}.")
+    return fmt
+
+
+def _require_pyarrow():
+    """
+    Import pyarrow for Parquet support.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet support requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def read_manifest(path, chunksize=100000, input_format=None):
+    """
+    Read a waste manifest in chunks.
+    
+    Args:
+        path (str): CSV or Parquet file
+        chunksize (int): Rows per chunk
+        input_format (str or None): "csv" or "parquet", detected from the extension if None
+    
+    Yields:
+        pandas.DataFrame: Manifest rows. CSV columns are read as text, so a
+            column's type doesn't depend on which values a chunk happens to hold.
+    """
+    input_format = detect_format(path, input_format, INPUT_FORMATS)
+    if input_format == "csv":
+        with pd.read_csv(path, chunksize=chunksize, dtype=str) as reader:
+            yield from reader
+    else:
+        pyarrow = _require_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+
+def validate_chunk(chunk, columns=None, model=None):
+    """
+    Split a manifest chunk into valid and rejected rows.
+    
+    Args:
+        chunk (pandas.DataFrame): Manifest rows
+        columns (dict): Maps "waste_type", "mass" and "conversion_method" to column names
+        model (CompiledModel): Compiled tables to validate against
+    
+    Returns:
+        tuple: (valid rows, rejected rows with an "error" column)
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    model = model or get_model()
+    missing = [name for name in columns.values() if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Manifest is missing columns: {', '.join(missing)}")
+    
+    mass = pd.to_numeric(chunk[columns["mass"]], errors="coerce")
+    checks = [
+        (~chunk[columns["waste_type"]].isin(model.waste_types), "unknown waste type"),
+        (~chunk[columns["conversion_method"]].isin(model.conversion_methods), "unknown conversion method"),
+        (~(np.isfinite(mass) & (mass > 0)), "mass must be a number greater than zero")
+    ]
+    
+    # Report the first failing check for each row
+    error = pd.Series(None, index=chunk.index, dtype=object)
+    for failed, message in reversed(checks):
+        error[failed] = message
+    invalid = error.notna()
+    
+    valid = chunk[~invalid].copy()
+    valid[columns["mass"]] = mass[~invalid]
+    rejected = chunk[invalid].assign(error=error[invalid])
+    return valid, rejected
+
+
+def batch_to_frame(batch):
+    """
+    Flatten calculate_conversion_batch results into a DataFrame.
+    
+    Args:
+        batch (dict): Results from calculate_conversion_batch
+    
+    Returns:
+        pandas.DataFrame: One row per scenario with a mass and energy column per fuel
+    """
+    columns = {
+        "waste_type": batch["waste_type"],
+        "mass": batch["mass"],
+        "conversion_method": batch["conversion_method"],
+        "efficiency": batch["efficiency"],
+        "energy_required": batch["energy_required"]
+    }
+    for fuel_type, amount in batch["fuel_produced"].items():
+        columns[f"{fuel_type}_produced"] = amount
+    for fuel_type, energy in batch["fuel_energy_output"].items():
+        columns[f"{fuel_type}_energy"] = energy
+    columns["total_energy_output"] = batch["total_energy_output"]
+    columns["net_energy_balance"] = batch["net_energy_balance"]
+    columns["conversion_efficiency"] = batch["conversion_efficiency"]
+    return pd.DataFrame(columns)
+
+
+def _json_value(value):
+    """
+    A frame value as a JSON value, with missing and non-finite numbers as null.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and not math.isfinite(value)):
+        return None
+    return value
+
+
+def _json_lines(frame):
+    """
+    Encode a frame as JSON Lines with the standard json module.
+    
+    Floats are written by repr, so every value reads back exactly as written.
+    """
+    columns = [str(name) for name in frame.columns]
+    return "".join(json.dumps(dict(zip(columns, map(_json_value, row))), separators=(",", ":")) + "\n"
+                   for row in frame.astype(object).itertuples(index=False, name=None))
+
+
+class ResultWriter:
+    """
+    Incremental writer for result chunks in CSV, Parquet or JSON Lines format.
+    
+    Chunks go to a temporary file next to the output, which replaces the
+    output only when the writer is closed. If writing stops with an error,
+    the temporary file is removed, so no half-written output is left behind.
+    """
+    def __init__(self, path, output_format=None):
+        """
+        Open the output file.
+        
+        Args:
+            path (str): Output file, or "-" for standard output (CSV and JSON Lines only)
+            output_format (str or None): "csv", "parquet" or "jsonl", detected from the extension if None
+        """
+        self.path = path
+        self.format = detect_format(path, output_format, OUTPUT_FORMATS)
+        self.rows_written = 0
+        self._header_written = False
+        self._parquet_writer = None
+        self._file = None
+        self._temp_path = None
+        if self.format == "parquet":
+            if path == "-":
+                raise ValueError("Parquet output must be written to a file.")
+            self._pyarrow = _require_pyarrow()
+        elif path == "-":
+            self._file = sys.stdout
+        if path != "-":
+            self._temp_path = os.path.join(os.path.dirname(os.path.abspath(path)),
+                                           f".{os.path.basename(path)}.{os.getpid()}.tmp")
+            if self.format != "parquet":
+                self._file = open(self._temp_path, "w", newline="", encoding="utf-8")
+    
+    def write(self, frame):
+        """
+        Append a chunk of results.
+        
+        Args:
+            frame (pandas.DataFrame): Results to write
+        """
+        if self.format == "csv":
+            frame.to_csv(self._file, header=not self._header_written, index=False)
+            self._header_written = True
+        elif self.format == "jsonl":
+            self._file.write(_json_lines(frame))
+        else:
+            table = self._pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                # Columns that are empty in the first chunk are text columns that may fill in later
+                pa = self._pyarrow
+                schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in table.schema], metadata=table.schema.metadata)
+                table = table.cast(schema)
+                self._parquet_writer = pa.parquet.ParquetWriter(self._temp_path, schema)
+            else:
+                # Later chunks may infer different types for passthrough columns
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        self.rows_written += len(frame)
+    
+    def _close_file(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        elif self._file is not None:
+            self._file.flush()
+            if self._file is not sys.stdout:
+                self._file.close()
+            self._file = None
+    
+    def close(self):
+        """
+        Flush and close the output file, replacing any earlier file at the path.
+        """
+        self._close_file()
+        # A Parquet writer only creates its file with the first chunk
+        if self._temp_path is not None and os.path.exists(self._temp_path):
+            os.replace(self._temp_path, self.path)
+            self._temp_path = None
+    
+    def abort(self):
+        """
+        Close the writer and delete what was written, leaving any earlier file at the path as it was.
+        """
+        self._close_file()
+        if self._temp_path is not None:
+            if os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+            self._temp_path = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def run_pipeline(input_path, output_path, chunksize=100000, input_format=None, output_format=None,
+                 columns=None, on_invalid="skip", rejects_path=None, model=None, progress=None):
+    """
+    Convert a waste manifest into results, one chunk at a time.
+    
+    Columns other than the waste type, mass and method are passed through to
+    the output unchanged.
+    
+    Args:
+        input_path (str): CSV or Parquet manifest
+        output_path (str): Output file (CSV, Parquet or JSON Lines)
+        chunksize (int): Rows per chunk
+        input_format (str or None): Input format, detected from the extension if None
+        output_format (str or None): Output format, detected from the extension if None
+        columns (dict): Maps "waste_type", "mass" and "conversion_method" to manifest column names
+        on_invalid (str): "skip" to drop invalid rows, "raise" to stop at the first one
+        rejects_path (str or None): Optional CSV file for rejected rows and their errors
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+        progress (callable or None): Called with the running statistics after each chunk
+    
+    Returns:
+        dict: Rows read, written and rejected, elapsed seconds and rows per second
+    """
+    if on_invalid not in ("skip", "raise"):
+        raise ValueError("on_invalid must be 'skip' or 'raise'.")
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    model = model or get_model()
+    stats = {"rows_read": 0, "rows_written": 0, "rows_rejected": 0, "seconds": 0.0, "rows_per_second": 0.0}
+    start = time.perf_counter()
+    
+    rejects = ResultWriter(rejects_path, "csv") if rejects_path else None
+    try:
+        with ResultWriter(output_path, output_format) as writer:
+            for chunk in read_manifest(input_path, chunksize, input_format):
+                valid, rejected = validate_chunk(chunk, columns, model)
+                if len(rejected):
+                    if on_invalid == "raise":
+                        row = stats["rows_read"] + chunk.index.get_loc(rejected.index[0]) + 1
+                        raise ValueError(f"Invalid manifest row {row}: {rejected['error'].iloc[0]}")
+                    if rejects:
+                        rejects.write(rejected)
+                
+                batch = calculate_conversion_batch(valid[columns["waste_type"]].to_numpy(),
+                                                   valid[columns["mass"]].to_numpy(),
+                                                   valid[columns["conversion_method"]].to_numpy(),
+                                                   model=model)
+                results = batch_to_frame(batch)
+                passthrough = valid.drop(columns=list(columns.values())).reset_index(drop=True)
+                writer.write(pd.concat([passthrough, results], axis=1))
+                
+                stats["rows_read"] += len(chunk)
+                stats["rows_written"] += len(valid)
+                stats["rows_rejected"] += len(rejected)
+                stats["seconds"] = time.perf_counter() - start
+                stats["rows_per_second"] = stats["rows_read"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+                if progress:
+                    progress(dict(stats))
+    except BaseException:
+        if rejects:
+            rejects.abort()
+        raise
+    if rejects:
+        rejects.close()
+    
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows_read"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
@@ -0,0 +1,296 @@
+"""
+Compact storage of conversion results for the PROMETHEUS Waste-to-Fuel Simulator.
+This module keeps large collections of results as one NumPy array per
+quantity (with a fixed column per fuel) instead of one dict per result,
+which takes a fraction of the memory and can be sliced, aggregated and
+handed to pandas or Arrow without copying.
+"""
+
+import numpy as np
+from converter import calculate_conversion_batch
+from model import get_model
+
+# One value per result, besides the waste type and method codes
+SCALAR_FIELDS = ["mass", "efficiency", "energy_required", "total_energy_output", "net_energy_balance",
+                 "conversion_efficiency"]
+
+# Fields that add up across results
+SUM_FIELDS = ["mass", "energy_required", "total_energy_output", "net_energy_balance"]
+
+
+class ConversionResults:
+    """
+    Conversion results for many scenarios, stored column by column.
+    
+    ``fuel_produced`` and ``fuel_energy_output`` are arrays with one row per
+    fuel in ``model.fuel_types`` and one column per result, so each fuel is a
+    contiguous array. Fuels a method doesn't produce hold zero.
+    
+    Indexing with an integer gives that result as a calculate_conversion
+    dict, which create_summary_text and the chart functions accept. Indexing
+    with a slice, mask or index array gives another ConversionResults
+    (slices share memory with the original).
+    """
+    __slots__ = ("model", "waste_code", "method_code") + tuple(SCALAR_FIELDS) + ("fuel_produced", "fuel_energy_output")
+    
+    def __init__(self, waste_code, method_code, mass, efficiency, energy_required, fuel_produced,
+                 fuel_energy_output, total_energy_output, net_energy_balance, conversion_efficiency, model=None):
+        """
+        Wrap existing arrays. Use from_batch or compute to build results from inputs.
+        
+        Args:
+            waste_code, method_code (numpy.ndarray): Integer codes, shape (n,)
+            mass, efficiency, energy_required, total_energy_output, net_energy_balance,
+                conversion_efficiency (numpy.ndarray): Values, shape (n,)
+            fuel_produced, fuel_energy_output (numpy.ndarray): Per-fuel values, shape (n_fuels, n)
+            model (CompiledModel): Tables the results were computed with
+        """
+        self.model = model or get_model()
+        self.waste_code = waste_code
+        self.method_code = method_code
+        self.mass = mass
+        self.efficiency = efficiency
+        self.energy_required = energy_required
+        self.fuel_produced = fuel_produced
+        self.fuel_energy_output = fuel_energy_output
+        self.total_energy_output = total_energy_output
+        self.net_energy_balance = net_energy_balance
+        self.conversion_efficiency = conversion_efficiency
+    
+    @classmethod
+    def from_batch(cls, batch, model=None):
+        """
+        Build from calculate_conversion_batch results.
+        
+        Args:
+            batch (dict): Results from calculate_conversion_batch
+            model (CompiledModel): Tables the batch was computed with
+        
+        Returns:
+            ConversionResults: Results
+        """
+        model = model or get_model()
+        code_type = np.min_scalar_type(max(len(model.waste_types), len(model.conversion_methods)) - 1)
+        return cls(
+            waste_code=batch["waste_code"].astype(code_type),
+            method_code=batch["method_code"].astype(code_type),
+            mass=batch["mass"],
+            efficiency=batch["efficiency"],
+            energy_required=batch["energy_required"],
+            fuel_produced=np.stack([batch["fuel_produced"][fuel] for fuel in model.fuel_types]),
+            fuel_energy_output=np.stack([batch["fuel_energy_output"][fuel] for fuel in model.fuel_types]),
+            total_energy_output=batch["total_energy_output"],
+            net_energy_balance=batch["net_energy_balance"],
+            conversion_efficiency=batch["conversion_efficiency"],
+            model=model
+        )
+    
+    @classmethod
+    def compute(cls, waste_types, masses, conversion_methods, model=None):
+        """
+        Run calculate_conversion_batch and store the results.
+        
+        Args:
+            waste_types (array-like): Waste type names or integer codes
+            masses (array-like): Masses of waste in kg
+            conversion_methods (array-like): Method names or integer codes
+            model (CompiledModel): Compiled tables to use, defaults to the data.py model
+        
+        Returns:
+            ConversionResults: Results
+        """
+        model = model or get_model()
+        return cls.from_batch(calculate_conversion_batch(waste_types, masses, conversion_methods, model=model), model)
+    
+    @classmethod
+    def concat(cls, parts):
+        """
+        Join several ConversionResults computed with the same tables.
+        
+        Args:
+            parts (list): ConversionResults to join, in order
+        
+        Returns:
+            ConversionResults: All results
+        """
+        parts = list(parts)
+        if not parts:
+            raise ValueError("Nothing to concatenate.")
+        arrays = {name: np.concatenate([getattr(p, name) for p in parts], axis=-1)
+                  for name in ("waste_code", "method_code", *SCALAR_FIELDS, "fuel_produced", "fuel_energy_output")}
+        return cls(**arrays, model=parts[0].model)
+    
+    def __len__(self):
+        return len(self.mass)
+    
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.row(key)
+        key = np.asarray(key) if isinstance(key, list) else key
+        return ConversionResults(
+            waste_code=self.waste_code[key],
+            method_code=self.method_code[key],
+            mass=self.mass[key],
+            efficiency=self.efficiency[key],
+            energy_required=self.energy_required[key],
+            fuel_produced=self.fuel_produced[:, key],
+            fuel_energy_output=self.fuel_energy_output[:, key],
+            total_energy_output=self.total_energy_output[key],
+            net_energy_balance=self.net_energy_balance[key],
+            conversion_efficiency=self.conversion_efficiency[key],
+            model=self.model
+        )
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+    
+    def __repr__(self):
+        return f"<ConversionResults: {len(self)} results, {self.nbytes / 2**20:.1f} MB>"
+    
+    @property
+    def fuel_types(self):
+        return self.model.fuel_types
+    
+    @property
+    def waste_type(self):
+        """
+        Waste type name of every result.
+        """
+        return np.asarray(self.model.waste_types, dtype=object)[self.waste_code]
+    
+    @property
+    def conversion_method(self):
+        """
+        Conversion method name of every result.
+        """
+        return np.asarray(self.model.conversion_methods, dtype=object)[self.method_code]
+    
+    @property
+    def nbytes(self):
+        """
+        Memory used by the arrays, in bytes.
+        """
+        return sum(getattr(self, name).nbytes for name in self.__slots__ if name != "model")
+    
+    def row(self, i):
+        """
+        One result in the same form as calculate_conversion.
+        
+        Args:
+            i (int): Position of the result (negative counts from the end)
+        
+        Returns:
+            dict: Result with ``fuel_produced`` and ``fuel_energy_output`` holding
+                the fuels the method produces, in data.py order
+        """
+        w, m = int(self.waste_code[i]), int(self.method_code[i])
+        fuels = [f for f in self.model.fuel_order[w, m] if f < len(self.model.fuel_types)]
+        return {
+            "waste_type": self.model.waste_types[w],
+            "mass": float(self.mass[i]),
+            "conversion_method": self.model.conversion_methods[m],
+            "efficiency": float(self.efficiency[i]),
+            "energy_required": float(self.energy_required[i]),
+            "fuel_produced": {self.model.fuel_types[f]: float(self.fuel_produced[f, i]) for f in fuels},
+            "fuel_energy_output": {self.model.fuel_types[f]: float(self.fuel_energy_output[f, i]) for f in fuels},
+            "total_energy_output": float(self.total_energy_output[i]),
+            "net_energy_balance": float(self.net_energy_balance[i]),
+            "conversion_efficiency": float(self.conversion_efficiency[i])
+        }
+    
+    def totals(self, by=None):
+        """
+        Add up mass, energy and fuel over the results.
+        
+        Args:
+            by (str or None): None for overall totals, or "waste_type" or
+                "conversion_method" for totals per group
+        
+        Returns:
+            dict: Totals with ``count``, the SUM_FIELDS and ``fuel_produced``
+                per fuel. Grouped totals map each group name to such a dict.
+        """
+        if by is None:
+            result = {"count": len(self)}
+            result.update({name: float(getattr(self, name).sum()) for name in SUM_FIELDS})
+            result["fuel_produced"] = dict(zip(self.model.fuel_types, self.fuel_produced.sum(axis=1).tolist()))
+            return result
+        
+        if by == "waste_type":
+            codes, names = self.waste_code, self.model.waste_types
+        elif by == "conversion_method":
+            codes, names = self.method_code, self.model.conversion_methods
+        else:
+            raise ValueError("by must be None, 'waste_type' or 'conversion_method'.")
+        
+        counts = np.bincount(codes, minlength=len(names))
+        sums = {name: np.bincount(codes, weights=getattr(self, name), minlength=len(names)) for name in SUM_FIELDS}
+        fuel = np.stack([np.bincount(codes, weights=row, minlength=len(names)) for row in self.fuel_produced], axis=1) \
+            if len(self.model.fuel_types) else np.zeros((len(names), 0))
+        groups = {}
+        for g, group in enumerate(names):
+            if counts[g]:
+                groups[group] = {"count": int(counts[g]), **{name: float(sums[name][g]) for name in SUM_FIELDS},
+                                 "fuel_produced": dict(zip(self.model.fuel_types, fuel[g].tolist()))}
+        return groups
+    
+    def columns(self):
+        """
+        Every quantity as a flat array, with ``<fuel>_produced`` and
+        ``<fuel>_energy`` columns per fuel. The arrays are views, not copies.
+        
+        Returns:
+            dict: Column name to array
+        """
+        columns = {"mass": self.mass, "efficiency": self.efficiency, "energy_required": self.energy_required}
+        for f, fuel in enumerate(self.model.fuel_types):
+            columns[f"{fuel}_produced"] = self.fuel_produced[f]
+        for f, fuel in enumerate(self.model.fuel_types):
+            columns[f"{fuel}_energy"] = self.fuel_energy_output[f]
+        columns["total_energy_output"] = self.total_energy_output
+        columns["net_energy_balance"] = self.net_energy_balance
+        columns["conversion_efficiency"] = self.conversion_efficiency
+        return columns
+    
+    def to_pandas(self):
+        """
+        Results as a DataFrame with the same columns as pipeline.batch_to_frame.
+        
+        Numeric columns share memory with these arrays; waste types and methods
+        become categoricals over the integer codes.
+        
+        Returns:
+            pandas.DataFrame: One row per result
+        """
+        import pandas as pd
+        columns = self.columns()
+        data = {
+            "waste_type": pd.Categorical.from_codes(self.waste_code, categories=self.model.waste_types),
+            "mass": columns.pop("mass"),
+            "conversion_method": pd.Categorical.from_codes(self.method_code, categories=self.model.conversion_methods),
+            **columns
+        }
+        return pd.DataFrame(data, copy=False)
+    
+    def to_arrow(self):
+        """
+        Results as a pyarrow Table.
+        
+        Contiguous numeric columns are wrapped without copying; waste types and
+        methods become dictionary-encoded columns over the integer codes.
+        
+        Returns:
+            pyarrow.Table: One row per result
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("Arrow output requires pyarrow: pip install pyarrow") from e
+        columns = {name: pa.array(values) for name, values in self.columns().items()}
+        return pa.table({
+            "waste_type": pa.DictionaryArray.from_arrays(self.waste_code, self.model.waste_types),
+            "mass": columns.pop("mass"),
+            "conversion_method": pa.DictionaryArray.from_arrays(self.method_code, self.model.conversion_methods),
+            **columns
+        })
@@ -0,0 +1,393 @@
+"""
+Global sensitivity analysis for the PROMETHEUS Waste-to-Fuel Simulator.
+This module ranks the model table entries that drive the net energy balance
+of a waste type and conversion method, using Morris elementary effects for
+screening and Sobol first-order and total indices for variance decomposition.
+
+Each table entry used by the scenario is varied uniformly within a relative
+range of its data.py value. Samples come from a scrambled Halton sequence
+(Sobol) or seeded Morris trajectories, are evaluated in vectorized chunks and
+folded into running sums, so memory is bounded by the chunk size and results
+do not depend on the number of workers.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from model import get_model
+from stats import RunningStats
+
+# Default relative half-width of the range each table entry is varied over
+DEFAULT_SPREAD = {
+    "EFFICIENCY": 0.1,
+    "FUEL_OUTPUT_FRACTIONS": 0.1,
+    "ENERGY_INPUT": 0.1,
+    "ENERGY_CONTENT": 0.1
+}
+
+
+def _primes(count):
+    """
+    The first count prime numbers, used as Halton bases.
+    """
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def halton(start, stop, dims, seed=None):
+    """
+    Points start to stop - 1 of a Halton sequence in [0, 1)^dims.
+    
+    Point 0 (the origin) is skipped. With a seed the digits of each dimension
+    are randomly permuted (0 stays 0), which breaks up the correlation between
+    high dimensions. The same seed always gives the same sequence, so any range
+    of points can be generated on its own.
+    
+    Args:
+        start (int): First point
+        stop (int): Point after the last
+        dims (int): Number of dimensions
+        seed (int or None): Seed for the digit scrambling, None for the plain sequence
+    
+    Returns:
+        numpy.ndarray: Points, shape (stop - start, dims)
+    """
+    bases = _primes(dims)
+    rng = np.random.default_rng(seed) if seed is not None else None
+    points = np.zeros((stop - start, dims))
+    for d, base in enumerate(bases):
+        permutation = np.arange(base)
+        if rng is not None:
+            permutation[1:] = rng.permutation(np.arange(1, base))
+        index = np.arange(start + 1, stop + 1, dtype=np.int64)
+        column = points[:, d]
+        scale = 1.0 / base
+        while index.any():
+            column += permutation[index % base] * scale
+            index //= base
+            scale /= base
+    return points
+
+
+def parameters(waste_type, conversion_method, spread=None, model=None):
+    """
+    Table entries used by a scenario and the ranges they are varied over.
+    
+    Args:
+        waste_type (str): Type of waste
+        conversion_method (str): Method of conversion
+        spread (float or dict): Relative half-width for every table, or per table
+            name as in DEFAULT_SPREAD. Missing tables use the default.
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        list: One dict per parameter with ``name``, ``table``, ``nominal``, ``low`` and ``high``
+    """
+    model = model or get_model()
+    if waste_type not in model.waste_index:
+        raise ValueError(f"Unknown waste type: {waste_type}")
+    if conversion_method not in model.method_index:
+        raise ValueError(f"Unknown conversion method: {conversion_method}")
+    if isinstance(spread, (int, float)):
+        spread = {table: spread for table in DEFAULT_SPREAD}
+    spread = {**DEFAULT_SPREAD, **(spread or {})}
+    for table, value in spread.items():
+        if table not in DEFAULT_SPREAD:
+            raise ValueError(f"Unknown table: {table}")
+        if not 0 <= value <= 1:
+            raise ValueError(f"Spread for {table} must be between 0 and 1.")
+    
+    i = model.waste_index[waste_type]
+    j = model.method_index[conversion_method]
+    fuels = [model.fuel_types[f] for f in model.fuel_order[i, j] if f < len(model.fuel_types)]
+    entries = [("EFFICIENCY", "efficiency", model.efficiency[i, j]),
+               ("ENERGY_INPUT", "energy_input", model.energy_input[i, j])]
+    entries += [("FUEL_OUTPUT_FRACTIONS", f"fraction.{fuel}", model.fractions[i, j, model.fuel_index[fuel]])
+                for fuel in fuels]
+    entries += [("ENERGY_CONTENT", f"energy_content.{fuel}", model.energy_content[model.fuel_index[fuel]])
+                for fuel in fuels]
+    
+    result = []
+    for table, name, nominal in entries:
+        nominal = float(nominal)
+        half_width = abs(nominal) * spread[table]
+        result.append({"name": name, "table": table, "nominal": nominal,
+                       "low": nominal - half_width, "high": nominal + half_width})
+    return result
+
+
+def _evaluate(bounds, units, mass):
+    """
+    Net energy balance for points of the unit cube.
+    
+    Uses the same rules as uncertainty.run_monte_carlo: efficiency is kept
+    within 0-1 and fractions that add up to more than 1 are scaled down.
+    
+    Args:
+        bounds (numpy.ndarray): (low, high) per parameter, in parameters() order
+        units (numpy.ndarray): Points in [0, 1], shape (n, parameters)
+        mass (float): Mass of waste in kg
+    
+    Returns:
+        numpy.ndarray: Net energy balance per point
+    """
+    values = bounds[:, 0] + units * (bounds[:, 1] - bounds[:, 0])
+    n_fuels = (values.shape[1] - 2) // 2
+    efficiency = np.clip(values[:, 0], 0.0, 1.0)
+    energy_input = values[:, 1]
+    fractions = values[:, 2:2 + n_fuels]
+    energy_content = values[:, 2 + n_fuels:]
+    
+    fraction_total = fractions.sum(axis=1)
+    scale = np.where(fraction_total > 1, 1.0 / np.maximum(fraction_total, 1e-300), 1.0)
+    energy_output = efficiency * scale * (fractions * energy_content).sum(axis=1)
+    return mass * (energy_output - energy_input)
+
+
+def _sobol_chunk(task):
+    """
+    Evaluate one chunk of Saltelli samples.
+    
+    Runs in worker processes and returns running sums rather than samples.
+    
+    Args:
+        task (tuple): (bounds, mass, start, stop, seed)
+    
+    Returns:
+        tuple: (RunningStats of f(A) and f(B), sums for the first-order
+            estimator, its squares, sums for the total estimator, its squares)
+    """
+    bounds, mass, start, stop, seed = task
+    k = len(bounds)
+    points = halton(start, stop, 2 * k, seed)
+    a, b = points[:, :k], points[:, k:]
+    
+    # AB[i] is A with column i taken from B
+    ab = np.repeat(a[None], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b.T
+    
+    f_a = _evaluate(bounds, a, mass)
+    f_b = _evaluate(bounds, b, mass)
+    f_ab = _evaluate(bounds, ab.reshape(-1, k), mass).reshape(k, -1)
+    
+    output_stats = RunningStats()
+    output_stats.update(f_a)
+    output_stats.update(f_b)
+    # Saltelli (2010) first-order and Jansen total-effect terms. f(B) is
+    # centred on the nominal output, which leaves the estimate unbiased (f(AB)
+    # and f(A) have the same mean) but makes it far less noisy.
+    nominal = _evaluate(bounds, np.full((1, k), 0.5), mass)[0]
+    first = (f_b - nominal) * (f_ab - f_a)
+    total = 0.5 * (f_a - f_ab) ** 2
+    return output_stats, first.sum(axis=1), (first ** 2).sum(axis=1), total.sum(axis=1), (total ** 2).sum(axis=1)
+
+
+def _run_chunks(function, tasks, n_chunks, workers):
+    """
+    Map a chunk function over tasks, in order, in this process or a process pool.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_chunks == 1:
+        yield from map(function, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(function, tasks)
+
+
+def sobol_indices(waste_type, conversion_method, samples=65536, spread=None, mass=1.0, seed=None,
+                  chunk_size=16384, workers=None, model=None):
+    """
+    Sobol first-order and total sensitivity indices of the net energy balance.
+    
+    Uses 2k-dimensional Halton points split into matrices A and B, and
+    evaluates the model at A, B and each A with one column from B, which costs
+    samples * (k + 2) evaluations for k parameters.
+    
+    Args:
+        waste_type (str): Type of waste
+        conversion_method (str): Method of conversion
+        samples (int): Base sample size
+        spread (float or dict): Relative range of each table, see parameters()
+        mass (float): Mass of waste in kg (scales the output, not the indices)
+        seed (int or None): Seed for the Halton scrambling, None for the plain sequence
+        chunk_size (int): Base samples evaluated per chunk
+        workers (int or None): Worker processes, defaults to the number of CPUs.
+            Use 1 to run in the current process.
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: ``first_order`` and ``total`` indices per parameter name, their
+            standard errors, the output mean and variance, and the parameters
+            ranked by total index
+    """
+    if samples <= 0:
+        raise ValueError("Number of samples must be greater than zero.")
+    params = parameters(waste_type, conversion_method, spread, model)
+    bounds = np.array([(p["low"], p["high"]) for p in params])
+    k = len(params)
+    
+    n_chunks = math.ceil(samples / chunk_size)
+    tasks = ((bounds, mass, start, min(start + chunk_size, samples), seed)
+             for start in range(0, samples, chunk_size))
+    
+    output_stats = RunningStats()
+    first_sum, first_sq, total_sum, total_sq = np.zeros(k), np.zeros(k), np.zeros(k), np.zeros(k)
+    for chunk_stats, chunk_first, chunk_first_sq, chunk_total, chunk_total_sq in _run_chunks(
+            _sobol_chunk, tasks, n_chunks, workers):
+        output_stats.merge(chunk_stats)
+        first_sum += chunk_first
+        first_sq += chunk_first_sq
+        total_sum += chunk_total
+        total_sq += chunk_total_sq
+    
+    variance = output_stats.variance
+    if variance > 0:
+        first_order = first_sum / samples / variance
+        total = total_sum / samples / variance
+        # Standard errors of the sample means, ignoring the error in the variance
+        first_se = np.sqrt(np.maximum(first_sq / samples - (first_sum / samples) ** 2, 0) / samples) / variance
+        total_se = np.sqrt(np.maximum(total_sq / samples - (total_sum / samples) ** 2, 0) / samples) / variance
+    else:
+        first_order = total = first_se = total_se = np.zeros(k)
+    
+    names = [p["name"] for p in params]
+    return {
+        "waste_type": waste_type,
+        "conversion_method": conversion_method,
+        "samples": samples,
+        "evaluations": samples * (k + 2),
+        "parameters": params,
+        "mean": output_stats.mean,
+        "variance": variance,
+        "first_order": dict(zip(names, first_order.tolist())),
+        "total": dict(zip(names, total.tolist())),
+        "first_order_se": dict(zip(names, first_se.tolist())),
+        "total_se": dict(zip(names, total_se.tolist())),
+        "ranking": [names[p] for p in np.argsort(-total, kind="stable")]
+    }
+
+
+def _morris_chunk(task):
+    """
+    Evaluate one chunk of Morris trajectories.
+    
+    Args:
+        task (tuple): (bounds, mass, trajectories, levels, entropy, index)
+    
+    Returns:
+        tuple: Per parameter sums of the elementary effects, their absolute
+            values and their squares
+    """
+    bounds, mass, trajectories, levels, entropy, index = task
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+    k = len(bounds)
+    delta = levels / (2 * (levels - 1))
+    rows = np.arange(trajectories)[:, None]
+    
+    # Start on the level grid and step each parameter once, in random order,
+    # by +delta or -delta (whichever stays inside the unit interval)
+    start = rng.integers(0, levels, (trajectories, k)) / (levels - 1)
+    step = np.where(start + delta <= 1 + 1e-12, delta, -delta)
+    order = rng.permuted(np.tile(np.arange(k), (trajectories, 1)), axis=1)
+    
+    moves = np.zeros((trajectories, k, k))
+    moves[rows, np.arange(k), order] = step[rows, order]
+    points = np.empty((trajectories, k + 1, k))
+    points[:, 0] = start
+    points[:, 1:] = start[:, None, :] + np.cumsum(moves, axis=1)
+    
+    outputs = _evaluate(bounds, points.reshape(-1, k), mass).reshape(trajectories, k + 1)
+    effects = np.empty((trajectories, k))
+    effects[rows, order] = np.diff(outputs, axis=1) / step[rows, order]
+    return effects.sum(axis=0), np.abs(effects).sum(axis=0), (effects ** 2).sum(axis=0)
+
+
+def morris_effects(waste_type, conversion_method, trajectories=10000, levels=4, spread=None, mass=1.0,
+                   seed=None, chunk_size=8192, workers=None, model=None):
+    """
+    Morris elementary effects of the net energy balance.
+    
+    Each trajectory changes one parameter at a time on a grid of levels, which
+    costs trajectories * (k + 1) evaluations for k parameters. Effects are per
+    full parameter range, so they can be compared across parameters.
+    
+    Args:
+        waste_type (str): Type of waste
+        conversion_method (str): Method of conversion
+        trajectories (int): Number of trajectories
+        levels (int): Grid levels per parameter (even, at least 2)
+        spread (float or dict): Relative range of each table, see parameters()
+        mass (float): Mass of waste in kg
+        seed (int or None): Seed for reproducible results
+        chunk_size (int): Trajectories evaluated per chunk
+        workers (int or None): Worker processes, defaults to the number of CPUs.
+            Use 1 to run in the current process.
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: ``mu``, ``mu_star`` (mean absolute effect) and ``sigma`` per
+            parameter name, and the parameters ranked by mu_star
+    """
+    if trajectories <= 1:
+        raise ValueError("At least two trajectories are required.")
+    if levels < 2 or levels % 2:
+        raise ValueError("Levels must be an even number of at least 2.")
+    params = parameters(waste_type, conversion_method, spread, model)
+    bounds = np.array([(p["low"], p["high"]) for p in params])
+    k = len(params)
+    
+    # Chunk i always uses the same child seed, whatever the number of workers
+    entropy = np.random.SeedSequence(seed).entropy
+    n_chunks = math.ceil(trajectories / chunk_size)
+    tasks = ((bounds, mass, min(chunk_size, trajectories - start), levels, entropy, index)
+             for index, start in enumerate(range(0, trajectories, chunk_size)))
+    
+    effect_sum, abs_sum, square_sum = np.zeros(k), np.zeros(k), np.zeros(k)
+    for chunk_sum, chunk_abs, chunk_square in _run_chunks(_morris_chunk, tasks, n_chunks, workers):
+        effect_sum += chunk_sum
+        abs_sum += chunk_abs
+        square_sum += chunk_square
+    
+    mu = effect_sum / trajectories
+    mu_star = abs_sum / trajectories
+    sigma = np.sqrt(np.maximum(square_sum - trajectories * mu ** 2, 0) / (trajectories - 1))
+    
+    names = [p["name"] for p in params]
+    return {
+        "waste_type": waste_type,
+        "conversion_method": conversion_method,
+        "trajectories": trajectories,
+        "evaluations": trajectories * (k + 1),
+        "parameters": params,
+        "mu": dict(zip(names, mu.tolist())),
+        "mu_star": dict(zip(names, mu_star.tolist())),
+        "sigma": dict(zip(names, sigma.tolist())),
+        "ranking": [names[p] for p in np.argsort(-mu_star, kind="stable")]
+    }
+
+
+def analyze_all(method="sobol", model=None, **kwargs):
+    """
+    Run a sensitivity analysis for every waste type and conversion method pair.
+    
+    Args:
+        method (str): "sobol" or "morris"
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+        **kwargs: Passed on to sobol_indices or morris_effects
+    
+    Returns:
+        dict: (waste type, conversion method) to the analysis result
+    """
+    analyses = {"sobol": sobol_indices, "morris": morris_effects}
+    if method not in analyses:
+        raise ValueError("method must be 'sobol' or 'morris'.")
+    model = model or get_model()
+    return {(w, m): analyses[method](w, m, model=model, **kwargs)
+            for w in model.waste_types for m in model.conversion_methods}
@@ -0,0 +1,431 @@
+"""
+Local HTTP/JSON service for the PROMETHEUS Waste-to-Fuel Simulator.
+This module serves the Python conversion and time simulation over HTTP so
+other front-ends can use the same model instead of a copy of it. Conversion
+requests that arrive within a short window are evaluated together as one
+vectorized batch, and repeated requests are answered from an LRU cache.
+
+Endpoints:
+    POST /convert   {"waste_type": ..., "mass": ..., "conversion_method": ...}
+                    or a list of such objects; returns calculate_conversion results
+    POST /simulate  {"waste_type": ..., "daily_mass": ..., "conversion_method": ...,
+                     "days": 1000, "seed": null, "include_days": true}
+    GET  /health    status, batch and cache statistics
+
+Usage:
+    python service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+
+from converter import batch_to_records, calculate_conversion_batch, simulate_over_time
+from model import get_model
+
+# Longest time simulation a request may ask for
+MAX_SIMULATION_DAYS = 1000000
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Total size of the cached responses, in bytes
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """
+    A request that can't be served, with the HTTP status to answer with.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LRUCache:
+    """
+    Bounded mapping of encoded responses that drops the least recently used
+    entries when it holds too many of them or too many bytes.
+    """
+    def __init__(self, max_entries=10000, max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            max_entries (int): Most entries kept
+            max_bytes (int): Most bytes kept over all values
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """
+        Look up a key and mark it as recently used.
+        
+        Returns:
+            The stored value, or None
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        """
+        Store a value, evicting the oldest entries while over either limit.
+        
+        A value larger than max_bytes on its own is not stored.
+        """
+        if len(value) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self.entries[key] = value
+        self.bytes += len(value)
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+    
+    def stats(self):
+        return {"entries": len(self.entries), "max_entries": self.max_entries, "bytes": self.bytes,
+                "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+class ConversionBatcher:
+    """
+    Collects conversion requests and evaluates them together.
+    
+    The first request starts a short timer; everything submitted before it
+    fires (or until max_batch requests are waiting) is computed with a single
+    calculate_conversion_batch call.
+    """
+    def __init__(self, model, window=0.002, max_batch=4096):
+        """
+        Args:
+            model (CompiledModel): Compiled tables
+            window (float): Seconds to wait for more requests after the first
+            max_batch (int): Requests that trigger an immediate evaluation
+        """
+        self.model = model
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+        self.batches = 0
+        self.rows = 0
+    
+    def submit(self, waste_type, mass, conversion_method):
+        """
+        Queue one conversion.
+        
+        Returns:
+            asyncio.Future: Resolves to the calculate_conversion-style result dict
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((waste_type, mass, conversion_method, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return future
+    
+    def flush(self):
+        """
+        Evaluate every queued conversion and resolve their futures.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        waste_types, masses, methods, futures = zip(*pending)
+        try:
+            batch = calculate_conversion_batch(list(waste_types), list(masses), list(methods), model=self.model)
+            records = batch_to_records(batch, self.model)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(records)
+        for future, record in zip(futures, records):
+            if not future.done():
+                future.set_result(record)
+    
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0}
+
+
+class ConversionService:
+    """
+    Request handling for the HTTP service, independent of the transport.
+    """
+    def __init__(self, model=None, window=0.002, max_batch=4096, cache_size=10000, cache_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            model (CompiledModel): Compiled tables, defaults to the data.py model
+            window (float): Micro-batching window in seconds
+            max_batch (int): Largest conversion batch
+            cache_size (int): Responses kept in the LRU cache
+            cache_bytes (int): Total size of the responses kept in the LRU cache
+        """
+        self.model = model or get_model()
+        self.batcher = ConversionBatcher(self.model, window, max_batch)
+        self.cache = LRUCache(cache_size, cache_bytes)
+        self.requests = 0
+        self.started = time.time()
+    
+    async def handle(self, method, path, body):
+        """
+        Answer one request.
+        
+        Args:
+            method (str): HTTP method
+            path (str): Request path
+            body (bytes): Request body
+        
+        Returns:
+            tuple: (status code, JSON response bytes)
+        """
+        self.requests += 1
+        routes = {"/convert": ("POST", self.convert), "/simulate": ("POST", self.simulate),
+                  "/health": ("GET", self.health)}
+        try:
+            route = routes.get(path.split("?", 1)[0])
+            if route is None:
+                raise RequestError(404, f"Unknown path: {path}")
+            if method != route[0]:
+                raise RequestError(405, f"{path} expects {route[0]}")
+            return 200, await route[1](body)
+        except RequestError as e:
+            return e.status, _dumps({"error": str(e)})
+        except Exception as e:
+            return 500, _dumps({"error": f"Internal error: {e}"})
+    
+    def _parse(self, body):
+        try:
+            return json.loads(body)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise RequestError(400, f"Invalid JSON: {e}") from e
+    
+    def _validate(self, item, mass_key="mass"):
+        """
+        Check a conversion request and return its (waste_type, mass, method).
+        """
+        if not isinstance(item, dict):
+            raise RequestError(400, "Each request must be a JSON object.")
+        waste_type = item.get("waste_type")
+        conversion_method = item.get("conversion_method")
+        mass = item.get(mass_key)
+        if not isinstance(waste_type, str) or waste_type not in self.model.waste_index:
+            raise RequestError(400, f"Unknown waste type: {waste_type}")
+        if not isinstance(conversion_method, str) or conversion_method not in self.model.method_index:
+            raise RequestError(400, f"Unknown conversion method: {conversion_method}")
+        if isinstance(mass, bool) or not isinstance(mass, (int, float)) or not math.isfinite(mass) or mass <= 0:
+            raise RequestError(400, f"{mass_key} must be a number greater than zero.")
+        return waste_type, float(mass), conversion_method
+    
+    async def convert(self, body):
+        """
+        POST /convert: one request object or a list of them.
+        """
+        payload = self._parse(body)
+        items = payload if isinstance(payload, list) else [payload]
+        requests = [self._validate(item) for item in items]
+        
+        # Cached responses are stored already encoded
+        parts = [self.cache.get(("convert",) + request) for request in requests]
+        missing = [i for i, part in enumerate(parts) if part is None]
+        if missing:
+            futures = [self.batcher.submit(*requests[i]) for i in missing]
+            for i, record in zip(missing, await asyncio.gather(*futures)):
+                parts[i] = _dumps(record)
+                self.cache.put(("convert",) + requests[i], parts[i])
+        
+        if isinstance(payload, list):
+            return b"[" + b",".join(parts) + b"]"
+        return parts[0]
+    
+    async def simulate(self, body):
+        """
+        POST /simulate: day-by-day simulation with totals.
+        """
+        payload = self._parse(body)
+        waste_type, daily_mass, conversion_method = self._validate(payload, "daily_mass")
+        days = payload.get("days", 1000)
+        seed = payload.get("seed")
+        include_days = payload.get("include_days", True)
+        if isinstance(days, bool) or not isinstance(days, int) or not 0 < days <= MAX_SIMULATION_DAYS:
+            raise RequestError(400, f"days must be a whole number from 1 to {MAX_SIMULATION_DAYS}.")
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            raise RequestError(400, "seed must be a whole number of zero or more, or null.")
+        
+        # Only seeded runs are repeatable, so only those are cached
+        key = ("simulate", waste_type, daily_mass, conversion_method, days, seed, bool(include_days))
+        if seed is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Simulate and encode in a thread so conversions keep being served meanwhile
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, _simulation_response, waste_type, daily_mass,
+                                              conversion_method, days, seed, bool(include_days))
+        if seed is not None:
+            self.cache.put(key, response)
+        return response
+    
+    async def health(self, body):
+        """
+        GET /health: service statistics.
+        """
+        return _dumps({
+            "status": "ok",
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.requests,
+            "batching": self.batcher.stats(),
+            "cache": self.cache.stats()
+        })
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _simulation_response(waste_type, daily_mass, conversion_method, days, seed, include_days):
+    """
+    Run a time simulation and encode the /simulate response. Called in a worker thread.
+    
+    Returns:
+        bytes: JSON response
+    """
+    frame = simulate_over_time(waste_type, daily_mass, conversion_method, days, seed)
+    result = {
+        "waste_type": waste_type,
+        "daily_mass": daily_mass,
+        "conversion_method": conversion_method,
+        "days": days,
+        "totals": {column: float(frame[column].sum())
+                   for column in ("energy_required", "energy_output", "net_balance")}
+    }
+    if include_days:
+        result["daily"] = {column: frame[column].tolist() for column in frame.columns}
+    return _dumps(result)
+
+
+async def _handle_connection(service, reader, writer):
+    """
+    Serve HTTP/1.1 requests on one connection until it closes.
+    """
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, path, version = lines[0].split(" ", 2)
+            except ValueError:
+                break
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                if name:
+                    headers[name.strip().lower()] = value.strip()
+            
+            keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close") or \
+                headers.get("connection", "").lower() == "keep-alive"
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                status, response = 400, _dumps({"error": "Invalid Content-Length."})
+                keep_alive = False
+            elif length > MAX_BODY_BYTES:
+                status, response = 413, _dumps({"error": "Request body is too large."})
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length) if length else b""
+                if method == "OPTIONS":
+                    # CORS preflight from browser front-ends
+                    status, response = 204, b""
+                else:
+                    status, response = await service.handle(method, path, body)
+            
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(response)}\r\n"
+                f"Access-Control-Allow-Origin: *\r\n"
+                f"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+                f"Access-Control-Allow-Headers: Content-Type\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + response
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, window=0.002, max_batch=4096, cache_size=10000, model=None,
+                cache_bytes=DEFAULT_CACHE_BYTES):
+    """
+    Run the service until cancelled.
+    
+    Args:
+        host (str): Address to listen on
+        port (int): Port to listen on (0 picks a free one)
+        window (float): Micro-batching window in seconds
+        max_batch (int): Largest conversion batch
+        cache_size (int): Responses kept in the LRU cache
+        model (CompiledModel): Compiled tables, defaults to the data.py model
+        cache_bytes (int): Total size of the responses kept in the LRU cache
+    """
+    service = ConversionService(model, window, max_batch, cache_size, cache_bytes)
+    server = await asyncio.start_server(lambda r, w: _handle_connection(service, r, w), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the waste-to-fuel model over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("--window", type=float, default=2.0, help="micro-batching window in ms (default: 2)")
+    parser.add_argument("--max-batch", type=int, default=4096, help="largest conversion batch (default: 4096)")
+    parser.add_argument("--cache-size", type=int, default=10000, help="responses kept in the cache (default: 10000)")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 2**20,
+                        help="total size of the cached responses in MB (default: 256)")
+    args = parser.parse_args()
+    
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, args.window / 1000, args.max_batch, args.cache_size,
+                          cache_bytes=int(args.cache_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
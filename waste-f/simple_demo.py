@@ -4,16 +4,18 @@ This version doesn't require external libraries and demonstrates core functional
 
 from data import WASTE_TYPES, CONVERSION_METHODS, EFFICIENCY, FUEL_OUTPUT_FRACTIONS, ENERGY_INPUT, ENERGY_CONTENT
 
-def calculate_conversion(waste_type, mass, conversion_method):
-    """Calculate the waste-to-fuel conversion results."""
+def calculate_conversion(waste_type, mass, conversion_method, tables=None):
+    """Calculate the waste-to-fuel conversion results, using tables (e.g. from config.load_tables) if given."""
+    energy_content = tables["ENERGY_CONTENT"] if tables else ENERGY_CONTENT
+    
     # Get efficiency for the given waste type and conversion method
-    efficiency = EFFICIENCY[waste_type][conversion_method]
+    efficiency = (tables["EFFICIENCY"] if tables else EFFICIENCY)[waste_type][conversion_method]
     
     # Get fuel output fractions
-    fuel_fractions = FUEL_OUTPUT_FRACTIONS[waste_type][conversion_method]
+    fuel_fractions = (tables["FUEL_OUTPUT_FRACTIONS"] if tables else FUEL_OUTPUT_FRACTIONS)[waste_type][conversion_method]
     
     # Get energy input cost
-    energy_input_cost = ENERGY_INPUT[waste_type][conversion_method]
+    energy_input_cost = (tables["ENERGY_INPUT"] if tables else ENERGY_INPUT)[waste_type][conversion_method]
     
     # Calculate energy required
     energy_required = mass * energy_input_cost
@@ -26,7 +28,7 @@ def calculate_conversion(waste_type, mass, conversion_method):
     # Calculate energy output for each fuel type
     fuel_energy_output = {}
     for fuel_type, fuel_mass in fuel_produced.items():
-        fuel_energy_output[fuel_type] = fuel_mass * ENERGY_CONTENT[fuel_type]
+        fuel_energy_output[fuel_type] = fuel_mass * energy_content[fuel_type]
     
     # Calculate total energy output
     total_energy_output = sum(fuel_energy_output.values())
@@ -0,0 +1,340 @@
+"""
+Streaming statistics for the PROMETHEUS Waste-to-Fuel Simulator.
+This module provides mergeable summaries that take values in chunks, so large
+sample sets can be described without keeping every value in memory.
+"""
+
+import math
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Running count, sum, mean, variance, extremes and negative count.
+    
+    Chunks are folded in with Welford/Chan updates, and two summaries built
+    from different chunks can be merged.
+    """
+    def __init__(self):
+        """
+        Create an empty summary.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.negatives = 0
+    
+    def update(self, values):
+        """
+        Add a chunk of values.
+        
+        Args:
+            values (array-like): Values to add
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        
+        chunk = RunningStats()
+        chunk.count = values.size
+        chunk.total = float(values.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        chunk.negatives = int(np.count_nonzero(values < 0))
+        self.merge(chunk)
+    
+    def merge(self, other):
+        """
+        Merge another summary into this one.
+        
+        Args:
+            other (RunningStats): Summary of a different set of values
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.negatives += other.negatives
+    
+    @property
+    def variance(self):
+        """
+        Sample variance of the values seen so far (0 for fewer than two values).
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    def summary(self):
+        """
+        Return the statistics as a dictionary.
+        
+        Returns:
+            dict: count, total, mean, variance, std, min, max and negatives
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": math.sqrt(self.variance),
+            "min": self.min,
+            "max": self.max,
+            "negatives": self.negatives
+        }
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch with bounded relative error.
+    
+    Values are counted in logarithmically sized buckets (as in DDSketch), so
+    every reported quantile is within ``relative_accuracy`` of a true value and
+    memory depends only on the range of magnitudes, not on the number of values.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        """
+        Create an empty sketch.
+        
+        Args:
+            relative_accuracy (float): Maximum relative error of reported quantiles
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def _add_buckets(self, buckets, magnitudes):
+        """
+        Count positive magnitudes into a bucket dictionary.
+        """
+        indexes = np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+        keys, counts = np.unique(indexes, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+    
+    def update(self, values):
+        """
+        Add a chunk of values.
+        
+        Args:
+            values (array-like): Values to add
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        tiny = np.finfo(float).tiny
+        positive = values[values > tiny]
+        negative = -values[values < -tiny]
+        if positive.size:
+            self._add_buckets(self.positive, positive)
+        if negative.size:
+            self._add_buckets(self.negative, negative)
+        self.zero_count += values.size - positive.size - negative.size
+        self.count += values.size
+    
+    def merge(self, other):
+        """
+        Merge another sketch with the same relative accuracy into this one.
+        
+        Args:
+            other (QuantileSketch): Sketch of a different set of values
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+    
+    def quantile(self, q):
+        """
+        Return an approximate quantile.
+        
+        Args:
+            q (float): Quantile between 0 and 1
+        
+        Returns:
+            float: Approximate value at the quantile (nan if the sketch is empty)
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        if self.count == 0:
+            return math.nan
+        
+        rank = q * (self.count - 1)
+        seen = 0
+        
+        # Most negative values first, then zeros, then positive values
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive))
+    
+    def _bucket_value(self, key):
+        """
+        Representative magnitude of a bucket.
+        """
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+
+class SimulationSummary:
+    """
+    Aggregates of a time simulation, built from its chunks in day order.
+    
+    Keeps RunningStats for each energy column, a QuantileSketch of the net
+    balance, and the cumulative net balance with its lowest point (the deepest
+    energy deficit reached), so a run of any length is described in constant
+    memory.
+    """
+    COLUMNS = ("energy_required", "energy_output", "net_balance")
+    
+    def __init__(self, quantile_columns=("net_balance",), relative_accuracy=0.001):
+        """
+        Create an empty summary.
+        
+        Args:
+            quantile_columns (tuple): Columns to keep quantile sketches for
+            relative_accuracy (float): Relative error bound of the quantiles
+        """
+        unknown = [c for c in quantile_columns if c not in self.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown column: {', '.join(unknown)}. Choose from {', '.join(self.COLUMNS)}.")
+        self.days = 0
+        self.stats = {column: RunningStats() for column in self.COLUMNS}
+        self.sketches = {column: QuantileSketch(relative_accuracy) for column in quantile_columns}
+        self.cumulative = 0.0
+        self.min_cumulative = math.inf
+        self.min_cumulative_day = 0
+        self.max_cumulative = -math.inf
+        self.max_cumulative_day = 0
+    
+    def __repr__(self):
+        return (f"<SimulationSummary: {self.days:,} days, net {self.cumulative:,.1f} kWh, "
+                f"{self.negative_days:,} negative days>")
+    
+    def update(self, chunk):
+        """
+        Add the next chunk of days.
+        
+        Args:
+            chunk (dict): Arrays for 'energy_required', 'energy_output' and
+                'net_balance', as yielded by iter_simulation_chunks
+        """
+        net_balance = np.asarray(chunk["net_balance"], dtype=float)
+        if net_balance.size == 0:
+            return
+        for column, stats in self.stats.items():
+            stats.update(chunk[column])
+        for column, sketch in self.sketches.items():
+            sketch.update(chunk[column])
+        
+        # Extremes of the running balance within the chunk, then the chunk total
+        # (summed pairwise, so rounding does not build up over long runs)
+        running = np.cumsum(net_balance)
+        low, high = int(running.argmin()), int(running.argmax())
+        if self.cumulative + running[low] < self.min_cumulative:
+            self.min_cumulative = self.cumulative + float(running[low])
+            self.min_cumulative_day = self.days + low + 1
+        if self.cumulative + running[high] > self.max_cumulative:
+            self.max_cumulative = self.cumulative + float(running[high])
+            self.max_cumulative_day = self.days + high + 1
+        self.cumulative += float(net_balance.sum())
+        self.days += net_balance.size
+    
+    def merge(self, other):
+        """
+        Append the summary of the days that follow this one's.
+        
+        Args:
+            other (SimulationSummary): Summary of the next run of days
+        """
+        if other.sketches.keys() != self.sketches.keys():
+            raise ValueError("Cannot merge summaries with different quantile columns.")
+        for column, stats in self.stats.items():
+            stats.merge(other.stats[column])
+        for column, sketch in self.sketches.items():
+            sketch.merge(other.sketches[column])
+        if other.days:
+            if self.cumulative + other.min_cumulative < self.min_cumulative:
+                self.min_cumulative = self.cumulative + other.min_cumulative
+                self.min_cumulative_day = self.days + other.min_cumulative_day
+            if self.cumulative + other.max_cumulative > self.max_cumulative:
+                self.max_cumulative = self.cumulative + other.max_cumulative
+                self.max_cumulative_day = self.days + other.max_cumulative_day
+        self.cumulative += other.cumulative
+        self.days += other.days
+    
+    @property
+    def negative_days(self):
+        """
+        Number of days with a negative net balance.
+        """
+        return self.stats["net_balance"].negatives
+    
+    def quantile(self, q, column="net_balance"):
+        """
+        Approximate quantile of a daily column.
+        
+        Args:
+            q (float): Quantile between 0 and 1
+            column (str): Column with a sketch
+        
+        Returns:
+            float: Value within the relative accuracy of the true quantile
+        """
+        if column not in self.sketches:
+            raise ValueError(f"No quantile sketch for {column}.")
+        return self.sketches[column].quantile(q)
+    
+    def to_dict(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """
+        Return the summary as a dictionary.
+        
+        Args:
+            quantiles (tuple): Quantiles to report for each sketched column
+        
+        Returns:
+            dict: days, RunningStats.summary() per column, quantiles per
+                sketched column, negative_days and the cumulative net balance
+                with its lowest and highest points
+        """
+        return {
+            "days": self.days,
+            **{column: stats.summary() for column, stats in self.stats.items()},
+            "quantiles": {column: {q: sketch.quantile(q) for q in quantiles}
+                          for column, sketch in self.sketches.items()},
+            "negative_days": self.negative_days,
+            "cumulative_net_balance": self.cumulative,
+            "min_cumulative_net_balance": self.min_cumulative if self.days else 0.0,
+            "min_cumulative_day": self.min_cumulative_day,
+            "max_cumulative_net_balance": self.max_cumulative if self.days else 0.0,
+            "max_cumulative_day": self.max_cumulative_day
+        }
@@ -0,0 +1,209 @@
+"""
+On-disk storage of long time simulations for the PROMETHEUS Waste-to-Fuel Simulator.
+This module runs a time simulation chunk by chunk straight into memory-mapped
+.npy files, so the horizon is limited by disk space rather than RAM. A run
+that is interrupted can be resumed from the last completed chunk, and the
+results are read back lazily, one slice at a time.
+
+A store is a directory holding one .npy file per column and a meta.json file
+with the run settings, the number of completed days and the random generator
+state after the last completed chunk.
+"""
+
+import json
+import os
+
+import numpy as np
+from converter import iter_simulation_chunks
+from stats import RunningStats
+
+COLUMNS = ["day", "energy_required", "energy_output", "net_balance"]
+META_FILE = "meta.json"
+STORE_VERSION = 1
+
+
+def _column_path(path, column):
+    return os.path.join(path, f"{column}.npy")
+
+
+def _write_meta(path, meta):
+    """
+    Replace meta.json atomically, so an interruption never leaves it half written.
+    """
+    temp_path = os.path.join(path, META_FILE + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(temp_path, os.path.join(path, META_FILE))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def simulate_to_disk(path, waste_type, daily_mass, conversion_method, days=1000, seed=None,
+                     chunk_days=1000000, resume=True, progress=None):
+    """
+    Run a time simulation into a store on disk.
+    
+    Gives the same values as simulate_over_time with the same integer seed,
+    but only one chunk of days is held in memory at a time. After every chunk
+    the columns are flushed and meta.json records the progress and random
+    generator state, so calling this again with the same settings continues
+    where an interrupted run stopped.
+    
+    Args:
+        path (str): Store directory, created if needed
+        waste_type (str): Type of waste
+        daily_mass (float): Daily mass of waste in kg
+        conversion_method (str): Method of conversion
+        days (int): Number of days to simulate
+        seed (int or None): Seed for the daily variation
+        chunk_days (int): Days computed and written per chunk
+        resume (bool): Continue an unfinished run with the same settings. If
+            False, any existing store at path is overwritten.
+        progress (callable or None): Called with (completed days, total days) after each chunk
+    
+    Returns:
+        SimulationStore: Lazy view of the results
+    """
+    if days <= 0:
+        raise ValueError("Days must be greater than zero.")
+    os.makedirs(path, exist_ok=True)
+    settings = {"waste_type": waste_type, "daily_mass": float(daily_mass), "conversion_method": conversion_method,
+                "days": int(days), "seed": seed}
+    
+    meta = None
+    if resume and os.path.exists(os.path.join(path, META_FILE)):
+        meta = _read_meta(path)
+        stored = {key: meta.get(key) for key in settings}
+        if stored != settings:
+            raise ValueError(f"Store at {path} holds a different run: {stored}. Use resume=False to overwrite it.")
+    
+    if meta is None:
+        # The generator state is stored, so even an unseeded run resumes the same sequence
+        rng = np.random.default_rng(seed)
+        meta = {"version": STORE_VERSION, **settings, "completed_days": 0, "rng_state": rng.bit_generator.state}
+        for column in COLUMNS:
+            dtype = np.int64 if column == "day" else np.float64
+            np.lib.format.open_memmap(_column_path(path, column), mode="w+", dtype=dtype, shape=(days,)).flush()
+        _write_meta(path, meta)
+    else:
+        rng = np.random.default_rng()
+        rng.bit_generator.state = meta["rng_state"]
+    
+    start = offset = meta["completed_days"]
+    if start < days:
+        columns = {column: np.load(_column_path(path, column), mmap_mode="r+") for column in COLUMNS}
+        try:
+            for chunk in iter_simulation_chunks(waste_type, daily_mass, conversion_method, days - start,
+                                                seed=rng, chunk_days=chunk_days):
+                size = len(chunk["day"])
+                chunk["day"] = chunk["day"] + offset
+                for column in COLUMNS:
+                    columns[column][start:start + size] = chunk[column]
+                    columns[column].flush()
+                start += size
+                
+                # Record progress only once the chunk is safely on disk
+                meta["completed_days"] = start
+                meta["rng_state"] = rng.bit_generator.state
+                _write_meta(path, meta)
+                if progress:
+                    progress(start, days)
+        finally:
+            del columns
+    
+    return SimulationStore(path)
+
+
+class SimulationStore:
+    """
+    Lazy, read-only view of a simulation stored by simulate_to_disk.
+    
+    Columns are memory-mapped, so only the slices that are used are read from
+    disk. ``store["net_balance"]`` gives a column as an array, and a store can
+    be passed directly to TimeSeriesChart.update, which only draws the visible
+    range.
+    """
+    def __init__(self, path):
+        """
+        Open a store.
+        
+        Args:
+            path (str): Store directory
+        """
+        self.path = path
+        self.meta = _read_meta(path)
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported store version: {self.meta.get('version')}")
+        self._columns = {}
+    
+    def __len__(self):
+        return self.meta["completed_days"]
+    
+    def __getitem__(self, column):
+        return self.column(column)
+    
+    def __repr__(self):
+        return (f"<SimulationStore {self.path}: {self.meta['waste_type']}, {self.meta['conversion_method']}, "
+                f"{len(self)}/{self.days} days>")
+    
+    @property
+    def days(self):
+        """
+        Total days in the run, completed or not.
+        """
+        return self.meta["days"]
+    
+    @property
+    def complete(self):
+        return len(self) == self.days
+    
+    def column(self, name, start=0, stop=None):
+        """
+        Completed values of one column, as a read-only memory-mapped array.
+        
+        Args:
+            name (str): "day", "energy_required", "energy_output" or "net_balance"
+            start (int): First position (0 is day 1)
+            stop (int or None): Position after the last, defaults to the last completed day
+        
+        Returns:
+            numpy.ndarray: Values, read from disk as they are accessed
+        """
+        if name not in COLUMNS:
+            raise KeyError(f"Unknown column: {name}. Choose from {', '.join(COLUMNS)}.")
+        if name not in self._columns:
+            self._columns[name] = np.load(_column_path(self.path, name), mmap_mode="r")
+        return self._columns[name][:len(self)][start:stop]
+    
+    def to_pandas(self, start=0, stop=None):
+        """
+        A range of days as a DataFrame in the form simulate_over_time returns.
+        
+        Args:
+            start (int): First position (0 is day 1)
+            stop (int or None): Position after the last
+        
+        Returns:
+            pandas.DataFrame: One row per day in the range
+        """
+        import pandas as pd
+        return pd.DataFrame({column: np.array(self.column(column, start, stop)) for column in COLUMNS})
+    
+    def summary(self, chunk_days=1000000):
+        """
+        Statistics of every energy column, read one chunk at a time.
+        
+        Args:
+            chunk_days (int): Days read per chunk
+        
+        Returns:
+            dict: Column name to RunningStats.summary() for the completed days
+        """
+        stats = {column: RunningStats() for column in COLUMNS[1:]}
+        for start in range(0, len(self), chunk_days):
+            for column, column_stats in stats.items():
+                column_stats.update(self.column(column, start, start + chunk_days))
+        return {column: column_stats.summary() for column, column_stats in stats.items()}
@@ -0,0 +1,243 @@
+"""
+Parameter sweeps for the PROMETHEUS Waste-to-Fuel Simulator.
+This module evaluates grids of waste types, masses, conversion methods and
+model table variations, keeping every result in an on-disk cache so that
+re-running an overlapping grid only computes the cells it hasn't seen.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from converter import calculate_conversion_batch
+from model import CompiledModel, get_model
+from pipeline import batch_to_frame
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "prometheus", "sweep_cache.sqlite")
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Bump when the calculation changes so old cache entries stop matching
+RESULT_VERSION = 1
+
+
+class ResultCache:
+    """
+    On-disk key/value store for sweep results with size-based eviction.
+    
+    Entries are kept in a SQLite file. When the stored values grow past
+    ``max_bytes``, the least recently used entries are removed.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            path (str): SQLite file, or ":memory:" for a temporary cache
+            max_bytes (int): Size limit for the stored values
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.commit()
+    
+    def get_many(self, keys):
+        """
+        Look up several keys and mark the hits as recently used.
+        
+        Args:
+            keys (list): Cache keys
+        
+        Returns:
+            dict: Key to stored value for every key found
+        """
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            rows = self.connection.execute(f"SELECT key, value FROM results WHERE key IN ({placeholders})", part)
+            found.update((key, json.loads(value)) for key, value in rows)
+        if found:
+            now = time.time()
+            self.connection.executemany("UPDATE results SET last_used = ? WHERE key = ?", ((now, key) for key in found))
+            self.connection.commit()
+        return found
+    
+    def put_many(self, items):
+        """
+        Store several values, then evict old entries if over the size limit.
+        
+        Args:
+            items (dict): Key to JSON-serializable value
+        """
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            text = json.dumps(value)
+            rows.append((key, text, len(text), now))
+        self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+        self.connection.commit()
+        self.evict()
+    
+    def size_bytes(self):
+        """
+        Total size of the stored values in bytes.
+        """
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+    
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        stale = []
+        for key, size in self.connection.execute("SELECT key, size FROM results ORDER BY last_used, key"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.connection.executemany("DELETE FROM results WHERE key = ?", stale)
+        self.connection.commit()
+        return len(stale)
+    
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        self.connection.execute("DELETE FROM results")
+        self.connection.commit()
+    
+    def close(self):
+        """
+        Close the SQLite connection.
+        """
+        self.connection.close()
+    
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _cell_key(waste_type, mass, conversion_method, fingerprint):
+    """
+    Cache key for one grid cell.
+    
+    The key covers the inputs and only the table entries the cell depends on,
+    so changing an unrelated entry leaves the cell cached.
+    """
+    payload = json.dumps([RESULT_VERSION, waste_type, repr(float(mass)), conversion_method, fingerprint])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _evaluate_cells(task):
+    """
+    Compute results for a group of grid cells that share one set of tables.
+    
+    Args:
+        task (tuple): (tables, waste_types, masses, conversion_methods)
+    
+    Returns:
+        list: One result dict per cell
+    """
+    tables, waste_types, masses, conversion_methods = task
+    model = CompiledModel.from_tables(tables)
+    batch = calculate_conversion_batch(waste_types, masses, conversion_methods, model=model)
+    return batch_to_frame(batch).drop(columns=["waste_type", "mass", "conversion_method"]).to_dict("records")
+
+
+def run_sweep(waste_types=None, masses=(100.0,), conversion_methods=None, variations=None, cache=None,
+              workers=1, chunk_size=50000, model=None):
+    """
+    Evaluate every combination of the given parameters, reusing cached results.
+    
+    Args:
+        waste_types (list or None): Waste types to include, defaults to all
+        masses (list): Masses in kg
+        conversion_methods (list or None): Methods to include, defaults to all
+        variations (list or None): Table overrides to sweep over, each in the form
+            accepted by CompiledModel.with_overrides. None runs the base tables only.
+        cache (ResultCache or None): Result cache, defaults to one at DEFAULT_CACHE_PATH
+        workers (int): Worker processes for the cells that need computing
+        chunk_size (int): Cells per task when computing in parallel
+        model (CompiledModel): Base tables, defaults to the data.py model
+    
+    Returns:
+        pandas.DataFrame: One row per cell with a ``variation`` index column.
+            ``attrs["cache_hits"]`` and ``attrs["computed"]`` give the cell counts.
+    """
+    model = model or get_model()
+    waste_types = list(waste_types or model.waste_types)
+    conversion_methods = list(conversion_methods or model.conversion_methods)
+    variations = list(variations or [{}])
+    own_cache = cache is None
+    if own_cache:
+        cache = ResultCache()
+    
+    try:
+        # Expand the grid and key each cell
+        cells, keys = [], []
+        variation_models = [model.with_overrides(v) if v else model for v in variations]
+        for v, variation_model in enumerate(variation_models):
+            fingerprints = {(w, m): variation_model.entry_fingerprint(w, m)
+                            for w in waste_types for m in conversion_methods}
+            for w, mass, m in itertools.product(waste_types, masses, conversion_methods):
+                cells.append((v, w, float(mass), m))
+                keys.append(_cell_key(w, mass, m, fingerprints[(w, m)]))
+        
+        results = cache.get_many(set(keys))
+        hits = sum(key in results for key in keys)
+        
+        # Compute the missing cells, grouped by variation
+        missing = [i for i, key in enumerate(keys) if key not in results]
+        tasks, task_cells = [], []
+        for v, group in itertools.groupby(missing, key=lambda i: cells[i][0]):
+            group = list(group)
+            for start in range(0, len(group), chunk_size):
+                part = group[start:start + chunk_size]
+                tasks.append((variation_models[v].tables, [cells[i][1] for i in part],
+                              [cells[i][2] for i in part], [cells[i][3] for i in part]))
+                task_cells.append(part)
+        
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                computed = list(executor.map(_evaluate_cells, tasks))
+        else:
+            computed = [_evaluate_cells(task) for task in tasks]
+        
+        new_results = {}
+        for part, rows in zip(task_cells, computed):
+            for i, row in zip(part, rows):
+                new_results[keys[i]] = row
+        if new_results:
+            cache.put_many(new_results)
+        results.update(new_results)
+    finally:
+        if own_cache:
+            cache.close()
+    
+    frame = pd.DataFrame(cells, columns=["variation", "waste_type", "mass", "conversion_method"])
+    frame = pd.concat([frame, pd.DataFrame([results[key] for key in keys])], axis=1)
+    frame.attrs["cache_hits"] = hits
+    frame.attrs["computed"] = len(missing)
+    return frame
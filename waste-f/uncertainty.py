@@ -0,0 +1,192 @@
+"""
+Monte Carlo uncertainty analysis for the PROMETHEUS Waste-to-Fuel Simulator.
+This module perturbs the model tables according to user-specified
+distributions and summarizes the resulting spread of the energy balance.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from model import get_model
+from stats import RunningStats, QuantileSketch
+
+# Default relative uncertainty per table: (distribution, scale)
+DEFAULT_UNCERTAINTY = {
+    "efficiency": ("normal", 0.05),
+    "fractions": ("normal", 0.05),
+    "energy_input": ("normal", 0.10),
+    "energy_content": ("normal", 0.05)
+}
+
+DISTRIBUTIONS = ["fixed", "normal", "uniform", "triangular", "lognormal"]
+
+
+def _draw_factors(rng, distribution, size):
+    """
+    Draw multiplicative perturbation factors.
+    
+    Args:
+        rng (numpy.random.Generator): Random number generator
+        distribution (tuple): (name, scale) where scale is a relative standard
+            deviation (normal), half-width (uniform, triangular) or log-space
+            standard deviation (lognormal)
+        size (tuple): Shape of the returned array
+    
+    Returns:
+        numpy.ndarray: Factors centred on 1
+    """
+    name, scale = distribution
+    if name == "fixed" or scale == 0:
+        return np.ones(size)
+    if name == "normal":
+        return rng.normal(1.0, scale, size)
+    if name == "uniform":
+        return rng.uniform(1.0 - scale, 1.0 + scale, size)
+    if name == "triangular":
+        return rng.triangular(1.0 - scale, 1.0, 1.0 + scale, size)
+    if name == "lognormal":
+        return rng.lognormal(0.0, scale, size)
+    raise ValueError(f"Unknown distribution: {name}. Choose from {', '.join(DISTRIBUTIONS)}.")
+
+
+def _simulate_chunk(task):
+    """
+    Evaluate one chunk of Monte Carlo samples.
+    
+    Runs in worker processes, so it only receives plain arrays and returns
+    mergeable summaries rather than the samples themselves.
+    
+    Args:
+        task (tuple): (nominal, uncertainty, size, seed_sequence, relative_accuracy)
+    
+    Returns:
+        tuple: (RunningStats, QuantileSketch, RunningStats) for net balance,
+            net balance quantiles and total energy output
+    """
+    nominal, uncertainty, size, seed_sequence, relative_accuracy = task
+    rng = np.random.default_rng(seed_sequence)
+    n_fuels = len(nominal["fractions"])
+    
+    # Perturbed parameters for every sample in the chunk
+    efficiency = np.clip(nominal["efficiency"] * _draw_factors(rng, uncertainty["efficiency"], size), 0.0, 1.0)
+    fractions = np.clip(nominal["fractions"] * _draw_factors(rng, uncertainty["fractions"], (size, n_fuels)), 0.0, None)
+    energy_input = np.clip(nominal["energy_input"] * _draw_factors(rng, uncertainty["energy_input"], size), 0.0, None)
+    energy_content = np.clip(nominal["energy_content"] * _draw_factors(rng, uncertainty["energy_content"], (size, n_fuels)), 0.0, None)
+    
+    # Fractions can't add up to more than the whole output
+    fraction_total = fractions.sum(axis=1)
+    over = fraction_total > 1
+    fractions[over] /= fraction_total[over, None]
+    
+    mass = nominal["mass"]
+    energy_required = mass * energy_input
+    energy_output = mass * efficiency * (fractions * energy_content).sum(axis=1)
+    net_balance = energy_output - energy_required
+    
+    net_stats = RunningStats()
+    net_stats.update(net_balance)
+    net_sketch = QuantileSketch(relative_accuracy)
+    net_sketch.update(net_balance)
+    output_stats = RunningStats()
+    output_stats.update(energy_output)
+    return net_stats, net_sketch, output_stats
+
+
+def run_monte_carlo(waste_type, mass, conversion_method, samples=1000000, uncertainty=None, seed=None,
+                    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), chunk_size=262144, workers=None,
+                    relative_accuracy=0.001, model=None):
+    """
+    Estimate the distribution of the net energy balance under parameter uncertainty.
+    
+    Samples are evaluated in vectorized chunks, each with its own child of the
+    seed, so results do not depend on the number of workers and memory stays
+    bounded by the chunk size.
+    
+    Args:
+        waste_type (str): Type of waste
+        mass (float): Mass of waste in kg
+        conversion_method (str): Method of conversion
+        samples (int): Number of Monte Carlo samples
+        uncertainty (dict): Distribution per table, as (name, scale) tuples. Missing
+            tables use DEFAULT_UNCERTAINTY; use ("fixed", 0) to hold a table constant.
+        seed (int or None): Seed for reproducible results
+        quantiles (tuple): Quantiles of the net balance to report
+        chunk_size (int): Samples evaluated per chunk
+        workers (int or None): Worker processes, defaults to the number of CPUs.
+            Use 1 to run in the current process.
+        relative_accuracy (float): Relative error bound of the reported quantiles
+        model (CompiledModel): Compiled tables to use, defaults to the data.py model
+    
+    Returns:
+        dict: Summary of the net energy balance distribution
+    """
+    if samples <= 0:
+        raise ValueError("Number of samples must be greater than zero.")
+    model = model or get_model()
+    uncertainty = {**DEFAULT_UNCERTAINTY, **(uncertainty or {})}
+    for table, distribution in uncertainty.items():
+        if table not in DEFAULT_UNCERTAINTY:
+            raise ValueError(f"Unknown table: {table}")
+        if distribution[0] not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution[0]}. Choose from {', '.join(DISTRIBUTIONS)}.")
+    
+    # Only the entries used by this scenario need to be perturbed
+    i = model.waste_index[waste_type]
+    j = model.method_index[conversion_method]
+    fuels = model.fuel_mask[i, j]
+    nominal = {
+        "mass": float(mass),
+        "efficiency": model.efficiency[i, j],
+        "fractions": model.fractions[i, j][fuels],
+        "energy_input": model.energy_input[i, j],
+        "energy_content": model.energy_content[fuels]
+    }
+    
+    # One task per chunk, each with an independent child seed
+    n_chunks = math.ceil(samples / chunk_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [chunk_size] * (n_chunks - 1) + [samples - chunk_size * (n_chunks - 1)]
+    tasks = ((nominal, uncertainty, size, seed_sequence, relative_accuracy)
+             for size, seed_sequence in zip(sizes, seed_sequences))
+    
+    net_stats = RunningStats()
+    net_sketch = QuantileSketch(relative_accuracy)
+    output_stats = RunningStats()
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or n_chunks == 1:
+        chunk_results = map(_simulate_chunk, tasks)
+        _merge_chunks(chunk_results, net_stats, net_sketch, output_stats)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = executor.map(_simulate_chunk, tasks)
+            _merge_chunks(chunk_results, net_stats, net_sketch, output_stats)
+    
+    summary = net_stats.summary()
+    return {
+        "waste_type": waste_type,
+        "mass": mass,
+        "conversion_method": conversion_method,
+        "samples": samples,
+        "nominal_net_balance": float(mass * model.net_per_kg[i, j]),
+        "mean": summary["mean"],
+        "variance": summary["variance"],
+        "std": summary["std"],
+        "min": summary["min"],
+        "max": summary["max"],
+        "quantiles": {q: net_sketch.quantile(q) for q in quantiles},
+        "prob_negative": summary["negatives"] / summary["count"],
+        "mean_energy_output": output_stats.mean
+    }
+
+
+def _merge_chunks(chunk_results, net_stats, net_sketch, output_stats):
+    """
+    Fold per-chunk summaries into the running totals, in chunk order.
+    """
+    for chunk_net, chunk_sketch, chunk_output in chunk_results:
+        net_stats.merge(chunk_net)
+        net_sketch.merge(chunk_sketch)
+        output_stats.merge(chunk_output)
@@ -2,6 +2,9 @@
 Helper functions for the PROMETHEUS Waste-to-Fuel Simulator.
 """
 
+from instrument import traced
+
+
 def format_number(value, precision=2):
     """
     Format a number with the specified precision and add thousand separators.
@@ -58,6 +61,7 @@ def format_percentage(value, precision=1):
     return f"{value:,.{precision}f}%"
 
 
+@traced("create_summary_text")
 def create_summary_text(results):
     """
     Create a formatted text summary of simulation results.
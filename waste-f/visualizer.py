@@ -3,134 +3,477 @@ Graph generation for the PROMETHEUS Waste-to-Fuel Simulator.
 This module handles all visualization of simulation results.
 """
 
-import matplotlib.pyplot as plt
+import matplotlib
 import numpy as np
-import pandas as pd
 from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from downsample import minmax_downsample, visible_slice
+from instrument import count, traced
 
 
-def create_energy_bar_chart(energy_required, energy_output):
+class EnergyBarChart:
     """
-    Create a bar chart comparing energy required vs energy output.
+    Bar chart comparing energy required vs energy output.
     
-    Args:
-        energy_required (float): Energy required for conversion (kWh)
-        energy_output (float): Energy output from produced fuels (kWh)
+    The figure, axes, bars and value labels are created once; update() changes
+    bar heights, colors and labels in place.
+    """
+    def __init__(self, frame=None):
+        """
+        Build the chart.
         
-    Returns:
-        matplotlib.figure.Figure: Figure object containing the bar chart
+        Args:
+            frame (tkinter.Frame or None): Frame to embed the chart in, if any
+        """
+        self.figure = Figure(figsize=(5, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        
+        # Create the bar chart with placeholder values
+        categories = ['Energy Required', 'Energy Output']
+        self.bars = self.ax.bar(categories, [0, 0], width=0.4)
+        
+        # Value labels on top of bars
+        self.labels = [self.ax.annotate('', xy=(bar.get_x() + bar.get_width() / 2, 0),
+                                        xytext=(0, 3),  # 3 points vertical offset
+                                        textcoords="offset points",
+                                        ha='center', va='bottom')
+                       for bar in self.bars]
+        
+        # Add labels and title
+        self.ax.set_ylabel('Energy (kWh)')
+        self.ax.set_title('Energy Balance')
+        self.ax.grid(axis='y', linestyle='--', alpha=0.7)
+        
+        # Adjust layout
+        self.figure.tight_layout()
+        
+        self.canvas = embed_figure_in_tkinter(self.figure, frame) if frame is not None else None
+    
+    @traced()
+    def update(self, energy_required, energy_output):
+        """
+        Show new energy values.
+        
+        Args:
+            energy_required (float): Energy required for conversion (kWh)
+            energy_output (float): Energy output from produced fuels (kWh)
+        """
+        values = [energy_required, energy_output]
+        
+        # Color bars based on energy balance
+        colors = ['#FF6B6B', '#4ECB71'] if energy_output > energy_required else ['#FF6B6B', '#FF9671']
+        
+        for bar, label, value, color in zip(self.bars, self.labels, values, colors):
+            bar.set_height(value)
+            bar.set_color(color)
+            label.xy = (bar.get_x() + bar.get_width() / 2, value)
+            label.set_text(f'{value:.1f} kWh')
+        
+        # Leave headroom for the value labels
+        self.ax.set_ylim(0, max(values) * 1.15 or 1)
+        
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+
+class FuelPieChart:
     """
-    fig = Figure(figsize=(5, 4), dpi=100)
-    ax = fig.add_subplot(111)
+    Pie chart showing distribution of fuel products.
     
-    # Data for the bar chart
-    categories = ['Energy Required', 'Energy Output']
-    values = [energy_required, energy_output]
+    When the set of fuels is unchanged, update() only moves the wedge angles
+    and labels; otherwise the pie is rebuilt in the same axes.
+    """
+    def __init__(self, frame=None):
+        """
+        Build the chart.
+        
+        Args:
+            frame (tkinter.Frame or None): Frame to embed the chart in, if any
+        """
+        self.figure = Figure(figsize=(5, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.fuel_names = None
+        self.wedges = []
+        self.texts = []
+        self.canvas = embed_figure_in_tkinter(self.figure, frame) if frame is not None else None
     
-    # Create bars with different colors based on energy balance
-    colors = ['#FF6B6B', '#4ECB71'] if energy_output > energy_required else ['#FF6B6B', '#FF9671']
+    @traced()
+    def update(self, fuel_produced):
+        """
+        Show a new fuel distribution.
+        
+        Args:
+            fuel_produced (dict): Dictionary with fuel types as keys and produced amounts as values
+        """
+        # Filter out fuels with zero production
+        fuel_produced = {k: v for k, v in fuel_produced.items() if v > 0}
+        
+        # Data for the pie chart
+        labels = list(fuel_produced.keys())
+        sizes = list(fuel_produced.values())
+        
+        # Calculate percentages for labels
+        total = sum(sizes)
+        percentages = [100 * s / total for s in sizes]
+        
+        # Create custom labels with percentages
+        custom_labels = [f'{l} ({p:.1f}%)' for l, p in zip(labels, percentages)]
+        
+        if labels == self.fuel_names:
+            # Same fuels: move the existing wedges and labels
+            theta = 90
+            for wedge, text, label, percentage in zip(self.wedges, self.texts, custom_labels, percentages):
+                wedge.set_theta1(theta)
+                theta += 360 * percentage / 100
+                wedge.set_theta2(theta)
+                
+                mid = np.deg2rad((wedge.theta1 + wedge.theta2) / 2)
+                x, y = 1.1 * np.cos(mid), 1.1 * np.sin(mid)
+                text.set_position((x, y))
+                text.set_horizontalalignment('left' if x > 0 else 'right')
+                text.set_text(label)
+        else:
+            self.ax.clear()
+            
+            # Create the pie chart with a colorful palette
+            colors = matplotlib.colormaps['Paired'](np.linspace(0, 1, len(labels)))
+            self.wedges, self.texts = self.ax.pie(sizes, labels=custom_labels, startangle=90, colors=colors)
+            
+            # Equal aspect ratio ensures that pie is drawn as a circle
+            self.ax.axis('equal')
+            
+            # Add title
+            self.ax.set_title('Fuel Product Distribution')
+            
+            # Adjust layout the first time only
+            if self.fuel_names is None:
+                self.figure.tight_layout()
+            self.fuel_names = labels
+        
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+
+
+class TimeSeriesChart:
+    """
+    Line graph showing energy balance over time.
+    
+    The three lines are created once and update() replaces their data. When
+    embedded and the new data fits the current axis limits, only the lines are
+    redrawn over a saved background (blitting).
+    
+    The full series is kept, but the lines only show a min/max envelope of the
+    visible range at about one bucket per pixel, recomputed whenever the view
+    is zoomed, panned or resized, so drawing time does not depend on the
+    number of days.
+    """
+    def __init__(self, frame=None):
+        """
+        Build the chart.
+        
+        Args:
+            frame (tkinter.Frame or None): Frame to embed the chart in, if any
+        """
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        
+        # Create the lines with no data yet
+        self.lines = [
+            self.ax.plot([], [], label='Energy Required', color='#FF6B6B')[0],
+            self.ax.plot([], [], label='Energy Output', color='#4ECB71')[0],
+            self.ax.plot([], [], label='Net Balance', color='#3A86FF', linestyle='--')[0]
+        ]
+        
+        # Add a horizontal line at y=0 for reference
+        self.ax.axhline(y=0, color='gray', linestyle='-', alpha=0.3)
+        
+        # Add labels and title
+        self.ax.set_xlabel('Day')
+        self.ax.set_ylabel('Energy (kWh)')
+        self.ax.set_title('Energy Balance Over Time')
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.ax.legend()
+        
+        # Adjust layout
+        self.figure.tight_layout()
+        
+        # Full resolution data, downsampled for display
+        self.days = None
+        self.series = None
+        self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+        
+        self.background = None
+        self.canvas = None
+        self.toolbar = None
+        if frame is not None:
+            # Lines are drawn separately so they can be blitted over the background
+            for line in self.lines:
+                line.set_animated(True)
+            self.canvas = embed_figure_in_tkinter(self.figure, frame)
+            self.canvas.mpl_connect('draw_event', self._on_draw)
+            self.canvas.mpl_connect('resize_event', self._on_resize)
+            
+            # Zoom and pan controls
+            self.toolbar = NavigationToolbar2Tk(self.canvas, frame, pack_toolbar=False)
+            self.toolbar.update()
+            self.toolbar.pack(side='bottom', fill='x')
+    
+    def _on_draw(self, event):
+        """
+        Save the background after a full redraw and draw the lines on top of it.
+        """
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
     
-    # Create the bar chart
-    bars = ax.bar(categories, values, color=colors, width=0.4)
+    def _draw_lines(self):
+        """
+        Draw the animated lines onto the current canvas.
+        """
+        for line in self.lines:
+            self.ax.draw_artist(line)
     
-    # Add values on top of bars
-    for bar in bars:
-        height = bar.get_height()
-        ax.annotate(f'{height:.1f} kWh',
-                    xy=(bar.get_x() + bar.get_width() / 2, height),
-                    xytext=(0, 3),  # 3 points vertical offset
-                    textcoords="offset points",
-                    ha='center', va='bottom')
+    def _on_xlim_changed(self, ax):
+        """
+        Re-sample the lines for a new x range after a zoom or pan.
+        """
+        self._resample()
     
-    # Add labels and title
-    ax.set_ylabel('Energy (kWh)')
-    ax.set_title('Energy Balance')
-    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    def _on_resize(self, event):
+        """
+        Re-sample the lines for a new plot width.
+        """
+        self._resample()
+    
+    @traced()
+    def _resample(self):
+        """
+        Set the line data to an envelope of the visible part of the full series.
+        """
+        if self.days is None:
+            return
+        window = visible_slice(self.days, *self.ax.get_xlim())
+        days = self.days[window]
+        buckets = max(int(self.ax.bbox.width), 1)
+        for line, values in zip(self.lines, self.series):
+            x, y = minmax_downsample(days, values[window], buckets)
+            line.set_data(x, y)
+            count("chart.points_drawn", len(x))
+    
+    @traced()
+    def update(self, time_data):
+        """
+        Show new time series data.
+        
+        Args:
+            time_data (pandas.DataFrame): DataFrame with columns 'day', 'energy_required', 'energy_output', 'net_balance'
+        """
+        self.days = np.asarray(time_data['day'])
+        self.series = [np.asarray(time_data[column])
+                       for column in ('energy_required', 'energy_output', 'net_balance')]
+        
+        # Axis limits with a 5% margin, always including the zero line
+        limits = self._data_limits(self.days, self.series)
+        
+        if self.background is not None and self._fits_view(limits):
+            # Current view still fits: restore the background and redraw only the lines
+            self._resample()
+            self.canvas.restore_region(self.background)
+            self._draw_lines()
+            self.canvas.blit(self.figure.bbox)
+            return
+        
+        self.ax.set_xlim(*limits[0], emit=False)
+        self.ax.set_ylim(*limits[1])
+        self._resample()
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+        if self.toolbar is not None:
+            # Make the new full view the toolbar's home view
+            self.toolbar.update()
     
-    # Adjust layout
-    fig.tight_layout()
+    def _fits_view(self, limits):
+        """
+        Whether data with the given limits can be shown in the current view,
+        which must contain it without being more than 25% larger.
+        """
+        for (low, high), (view_low, view_high) in zip(limits, (self.ax.get_xlim(), self.ax.get_ylim())):
+            if low < view_low or high > view_high or (view_high - view_low) > 1.25 * (high - low):
+                return False
+        return True
     
-    return fig
+    @staticmethod
+    def _data_limits(days, series):
+        """
+        Axis limits that fit the data with a small margin.
+        """
+        if len(days) == 0:
+            return (0.0, 1.0), (-1.0, 1.0)
+        x_min, x_max = float(days[0]), float(days[-1])
+        y_min = min(0.0, min(float(np.min(s)) for s in series))
+        y_max = max(0.0, max(float(np.max(s)) for s in series))
+        x_pad = (x_max - x_min) * 0.05 or 0.5
+        y_pad = (y_max - y_min) * 0.05 or 0.5
+        return (x_min - x_pad, x_max + x_pad), (y_min - y_pad, y_max + y_pad)
 
 
-def create_fuel_pie_chart(fuel_produced):
+class ParetoChart:
     """
-    Create a pie chart showing distribution of fuel products.
+    Scatter plot of plans on two objectives with the Pareto front highlighted.
     
-    Args:
-        fuel_produced (dict): Dictionary with fuel types as keys and produced amounts as values
-        
-    Returns:
-        matplotlib.figure.Figure: Figure object containing the pie chart
+    Dominated plans are drawn in grey, thinned to at most MAX_BACKGROUND_POINTS
+    so a million candidates still draw quickly; front plans are drawn in full
+    and colored by conversion method. Clicking a front plan shows its details.
     """
-    fig = Figure(figsize=(5, 4), dpi=100)
-    ax = fig.add_subplot(111)
+    MAX_BACKGROUND_POINTS = 20000
     
-    # Filter out fuels with zero production
-    fuel_produced = {k: v for k, v in fuel_produced.items() if v > 0}
-    
-    # Data for the pie chart
-    labels = list(fuel_produced.keys())
-    sizes = list(fuel_produced.values())
-    
-    # Calculate percentages for labels
-    total = sum(sizes)
-    percentages = [100 * s / total for s in sizes]
+    def __init__(self, frame=None):
+        """
+        Build the chart.
+        
+        Args:
+            frame (tkinter.Frame or None): Frame to embed the chart in, if any
+        """
+        self.figure = Figure(figsize=(7, 5), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.ax.set_title('Pareto Front')
+        
+        self.background_points = self.ax.scatter([], [], s=4, color='#c8c8c8', label='Dominated')
+        self.front_points = self.ax.scatter([], [], s=30, edgecolors='black', linewidths=0.5, picker=5,
+                                            zorder=3)
+        self.note = self.ax.annotate('', xy=(0, 0), xytext=(10, 10), textcoords='offset points',
+                                     bbox=dict(boxstyle='round', fc='white', alpha=0.9), zorder=4)
+        self.note.set_visible(False)
+        self.front = None
+        self.x = None
+        self.y = None
+        
+        self.canvas = None
+        self.toolbar = None
+        if frame is not None:
+            self.canvas = embed_figure_in_tkinter(self.figure, frame)
+            self.canvas.mpl_connect('pick_event', self._on_pick)
+            self.toolbar = NavigationToolbar2Tk(self.canvas, frame, pack_toolbar=False)
+            self.toolbar.update()
+            self.toolbar.pack(side='bottom', fill='x')
     
-    # Create custom labels with percentages
-    custom_labels = [f'{l} ({p:.1f}%)' for l, p in zip(labels, percentages)]
+    def _on_pick(self, event):
+        """
+        Show the details of a clicked front plan.
+        """
+        if event.artist is not self.front_points or self.front is None:
+            return
+        row = self.front.iloc[event.ind[0]]
+        self.note.xy = (row[self.x], row[self.y])
+        self.note.set_text(f"{row['plan']}, {row['mass']:g} kg\n{row['conversion_method']}\n"
+                           f"{self.x}: {row[self.x]:.4g}\n{self.y}: {row[self.y]:.4g}")
+        self.note.set_visible(True)
+        self.canvas.draw_idle()
     
-    # Create the pie chart with a colorful palette
-    colors = plt.cm.Paired(np.linspace(0, 1, len(labels)))
-    ax.pie(sizes, labels=custom_labels, autopct='', startangle=90, colors=colors)
+    @traced()
+    def update(self, plans, x, y):
+        """
+        Show plans on two of their objectives.
+        
+        Args:
+            plans (pandas.DataFrame): Plans from pareto.explore
+            x (str): Objective column for the x axis
+            y (str): Objective column for the y axis
+        """
+        on_front = plans['on_front'].to_numpy()
+        self.front = plans[on_front]
+        self.x, self.y = x, y
+        
+        others = plans.loc[~on_front, [x, y]].to_numpy()
+        if len(others) > self.MAX_BACKGROUND_POINTS:
+            others = others[::-(-len(others) // self.MAX_BACKGROUND_POINTS)]
+        self.background_points.set_offsets(others if len(others) else np.empty((0, 2)))
+        self.front_points.set_offsets(self.front[[x, y]].to_numpy())
+        
+        methods = sorted(plans['conversion_method'].unique())
+        colors = matplotlib.colormaps['tab10']
+        method_color = {method: colors(i % 10) for i, method in enumerate(methods)}
+        self.front_points.set_facecolors([method_color[m] for m in self.front['conversion_method']])
+        count("chart.points_drawn", len(others) + len(self.front))
+        
+        # Legend: one entry per method on the front
+        for handle in list(self.ax.lines):
+            handle.remove()
+        handles = [self.background_points] + [
+            self.ax.plot([], [], 'o', color=method_color[m], markeredgecolor='black', label=m)[0]
+            for m in methods if (self.front['conversion_method'] == m).any()]
+        self.ax.legend(handles=handles, loc='best', fontsize=8)
+        
+        senses = plans.attrs.get('objectives', {})
+        self.ax.set_xlabel(f"{x} ({senses.get(x, 'max')})")
+        self.ax.set_ylabel(f"{y} ({senses.get(y, 'max')})")
+        self.note.set_visible(False)
+        
+        # Fit the axes to every plan with a 5% margin
+        points = np.concatenate([others, self.front[[x, y]].to_numpy()]).reshape(-1, 2)
+        if len(points):
+            low, high = points.min(axis=0), points.max(axis=0)
+            pad = np.where(high > low, (high - low) * 0.05, 0.5)
+            self.ax.set_xlim(low[0] - pad[0], high[0] + pad[0])
+            self.ax.set_ylim(low[1] - pad[1], high[1] + pad[1])
+        self.figure.tight_layout()
+        
+        if self.canvas is not None:
+            self.canvas.draw_idle()
+        if self.toolbar is not None:
+            self.toolbar.update()
+
+
+@traced("create_energy_bar_chart")
+def create_energy_bar_chart(energy_required, energy_output):
+    """
+    Create a bar chart comparing energy required vs energy output.
     
-    # Equal aspect ratio ensures that pie is drawn as a circle
-    ax.axis('equal')
+    Args:
+        energy_required (float): Energy required for conversion (kWh)
+        energy_output (float): Energy output from produced fuels (kWh)
     
-    # Add title
-    ax.set_title('Fuel Product Distribution')
+    Returns:
+        matplotlib.figure.Figure: Figure object containing the bar chart
+    """
+    chart = EnergyBarChart()
+    chart.update(energy_required, energy_output)
+    return chart.figure
+
+
+@traced("create_fuel_pie_chart")
+def create_fuel_pie_chart(fuel_produced):
+    """
+    Create a pie chart showing distribution of fuel products.
     
-    # Adjust layout
-    fig.tight_layout()
+    Args:
+        fuel_produced (dict): Dictionary with fuel types as keys and produced amounts as values
     
-    return fig
+    Returns:
+        matplotlib.figure.Figure: Figure object containing the pie chart
+    """
+    chart = FuelPieChart()
+    chart.update(fuel_produced)
+    return chart.figure
 
 
+@traced("create_time_series_chart")
 def create_time_series_chart(time_data):
     """
     Create a line graph showing energy balance over time.
     
     Args:
         time_data (pandas.DataFrame): DataFrame with columns 'day', 'energy_required', 'energy_output', 'net_balance'
-        
+    
     Returns:
         matplotlib.figure.Figure: Figure object containing the line graph
     """
-    fig = Figure(figsize=(8, 4), dpi=100)
-    ax = fig.add_subplot(111)
-    
-    # Plot the data
-    ax.plot(time_data['day'], time_data['energy_required'], label='Energy Required', color='#FF6B6B')
-    ax.plot(time_data['day'], time_data['energy_output'], label='Energy Output', color='#4ECB71')
-    ax.plot(time_data['day'], time_data['net_balance'], label='Net Balance', color='#3A86FF', linestyle='--')
-    
-    # Add a horizontal line at y=0 for reference
-    ax.axhline(y=0, color='gray', linestyle='-', alpha=0.3)
-    
-    # Add labels and title
-    ax.set_xlabel('Day')
-    ax.set_ylabel('Energy (kWh)')
-    ax.set_title('Energy Balance Over Time')
-    ax.grid(True, linestyle='--', alpha=0.7)
-    ax.legend()
-    
-    # Adjust layout
-    fig.tight_layout()
-    
-    return fig
+    chart = TimeSeriesChart()
+    chart.update(time_data)
+    return chart.figure
 
 
+@traced("embed_figure_in_tkinter")
 def embed_figure_in_tkinter(figure, frame):
     """
     Embed a matplotlib figure in a tkinter frame.
@@ -138,7 +481,7 @@ def embed_figure_in_tkinter(figure, frame):
     Args:
         figure (matplotlib.figure.Figure): Figure to embed
         frame (tkinter.Frame): Frame to embed the figure in
-        
+    
     Returns:
         FigureCanvasTkAgg: Canvas containing the embedded figure
     """